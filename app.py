@@ -1,10 +1,16 @@
 import streamlit as st
 import os
 from typing import Optional
+from core.ai_engine import ReplacementChunk
 from core.conversation import ConversationManager
 from core.document_gen import DocumentGenerator
 from utils.export import DocumentExporter
-from config.settings import DEFAULT_LANGUAGE, SUPPORTED_LANGUAGES, STREAMLIT_THEME
+from config.settings import DEFAULT_LANGUAGE, SUPPORTED_LANGUAGES, STREAMLIT_THEME, METRICS_PORT, SESSION_PERSISTENCE_ENABLED, MAX_CONVERSATION_LENGTH
+from core.history import ConversationHistory
+from core.document_store import expand_document_references
+from core.session_store import SessionConflictError
+from core.session_registry import SessionRegistry
+from core.metrics import start_metrics_server
 from config.ui_translations import get_ui_text, get_page_config
 import logging
 from PIL import Image, ImageEnhance
@@ -19,6 +25,10 @@ logging.basicConfig(level=logging.INFO)
 # Constants
 NUMBER_OF_MESSAGES_TO_DISPLAY = 20
 
+# Expose /metrics for Prometheus; only the first rerun starts the server
+if METRICS_PORT:
+    start_metrics_server(METRICS_PORT)
+
 # Retrieve and validate API key (with Streamlit Cloud support)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY") or st.secrets.get("OPENAI_API_KEY")
 if not OPENAI_API_KEY or OPENAI_API_KEY == "your_openai_api_key_here":
@@ -96,18 +106,74 @@ def initialize_session_state():
     if "current_language" not in st.session_state:
         st.session_state.current_language = DEFAULT_LANGUAGE
     if "conversation_history" not in st.session_state:
-        st.session_state.conversation_history = []
-    if "generated_document" not in st.session_state:
-        st.session_state.generated_document = None
+        st.session_state.conversation_history = ConversationHistory()
+    if "visible_messages" not in st.session_state:
+        st.session_state.visible_messages = MAX_CONVERSATION_LENGTH
+    if "generated_document_ref" not in st.session_state:
+        st.session_state.generated_document_ref = None
+
+@st.cache_resource
+def get_session_registry() -> SessionRegistry:
+    """Get the registry of live conversations shared by all sessions of this worker."""
+    return SessionRegistry()
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def build_export(document_ref: str, document_type: str, export_format: str, language: str) -> Optional[bytes]:
+    """
+    Build the export file for a generated document.
+
+    The reference names a content-addressed document, so the result is
+    cached per (document, type, format, language) instead of being rebuilt
+    on every rerun.
+    """
+    if export_format == "txt":
+        return expand_document_references(document_ref).encode("utf-8")
+    return DocumentExporter(export_folder=None).export_bytes(document_ref, document_type, export_format, language)
+
+def restore_session():
+    """Resume the conversation named in the URL after a reconnect or restart."""
+    if not SESSION_PERSISTENCE_ENABLED or "session_id" in st.session_state:
+        return
+    session_id = st.experimental_get_query_params().get("session", [None])[0]
+    if not session_id:
+        return
+    
+    manager = get_session_registry().get(session_id, create=False)
+    if manager is None:
+        return
+    st.session_state.session_id = session_id
+    st.session_state.current_language = manager.language
+    history = ConversationHistory([{"role": "assistant", "content": initialize_conversation()}])
+    history.extend(manager.conversation_history)
+    st.session_state.conversation_history = history
+    if manager.generated_document_ref:
+        st.session_state.generated_document_ref = manager.generated_document_ref
+        st.session_state.document_type = manager.get_current_document_type()
+
+def get_session_id() -> str:
+    """Get the conversation id for this browser session, starting a conversation on first use."""
+    if "session_id" not in st.session_state:
+        manager = get_session_registry().create(st.session_state.current_language)
+        if SESSION_PERSISTENCE_ENABLED:
+            # Keep the session id in the URL so a reconnect can resume it
+            st.experimental_set_query_params(session=manager.session_id)
+        st.session_state.session_id = manager.session_id
+    return st.session_state.session_id
 
 def reset_conversation():
     """Reset conversation."""
-    st.session_state.conversation_history = []
-    st.session_state.generated_document = None
+    st.session_state.conversation_history = ConversationHistory()
+    st.session_state.visible_messages = MAX_CONVERSATION_LENGTH
+    st.session_state.generated_document_ref = None
+    session_id = st.session_state.pop("session_id", None)
+    if session_id:
+        get_session_registry().remove(session_id)
+    st.experimental_set_query_params()
 
 def main():
     """Main application function."""
     initialize_session_state()
+    restore_session()
     
     # Sidebar
     with st.sidebar:
@@ -152,15 +218,30 @@ def main():
             st.rerun()
         
         # Export options
-        if st.session_state.generated_document:
+        if st.session_state.generated_document_ref:
             export_format = st.selectbox(
                 "Export Format",
                 ["docx", "pdf", "txt"],
                 key="export_format_selector"
             )
             
-            if st.button("Export Document", key="export_button"):
-                st.success(f"Document exported as {export_format}")
+            document_type = st.session_state.get("document_type", "document")
+            export_data = build_export(
+                st.session_state.generated_document_ref,
+                document_type,
+                export_format,
+                st.session_state.current_language
+            )
+            
+            if export_data:
+                st.download_button(
+                    "Export Document",
+                    data=export_data,
+                    file_name=f"{document_type}.{export_format}",
+                    key="export_button"
+                )
+            else:
+                st.error(f"Could not export document as {export_format}")
     
     # Main content
     st.title("⚡ Legal Document AI")
@@ -171,11 +252,17 @@ def main():
         welcome_msg = initialize_conversation()
         st.session_state.conversation_history.append({"role": "assistant", "content": welcome_msg})
     
-    # Display conversation
-    for message in st.session_state.conversation_history:
+    # Display the most recent messages; earlier ones are loaded from disk on request
+    history = st.session_state.conversation_history
+    hidden = max(len(history) - st.session_state.visible_messages, 0)
+    if hidden and st.button(f"Show earlier messages ({hidden})", key="earlier_messages_button"):
+        st.session_state.visible_messages += MAX_CONVERSATION_LENGTH
+        st.rerun()
+    
+    for message in history.page(max(len(history) - st.session_state.visible_messages, 0), len(history)):
         if message["role"] == "assistant":
             with st.chat_message("assistant", avatar="assets/Agent_icon.png"):
-                st.write(message["content"])
+                st.write(expand_document_references(message["content"]))
         else:
             with st.chat_message("user", avatar="assets/stuser.png"):
                 st.write(message["content"])
@@ -196,10 +283,42 @@ def main():
         chat_input = st.chat_input("Tell me what document you need...", key="chat_input_doc_mode")
         if chat_input:
             st.session_state.conversation_history.append({"role": "user", "content": chat_input})
+            with st.chat_message("user", avatar="assets/stuser.png"):
+                st.write(chat_input)
+            
+            registry = get_session_registry()
+            session_id = get_session_id()
+            
+            # Render LLM output incrementally as it streams in
+            with st.chat_message("assistant", avatar="assets/Agent_icon.png"):
+                placeholder = st.empty()
+                streamed = []
+                
+                def render_chunk(chunk: str):
+                    if isinstance(chunk, ReplacementChunk):
+                        streamed.clear()
+                    streamed.append(chunk)
+                    placeholder.markdown("".join(streamed) + "▌")
+                
+                try:
+                    doc_response, is_complete = registry.process_user_message(
+                        session_id, chat_input, on_token=render_chunk, language=st.session_state.current_language
+                    )
+                except SessionConflictError:
+                    # The conversation was continued elsewhere, e.g. in another tab; reload it
+                    registry.remove(session_id)
+                    st.session_state.pop("session_id", None)
+                    st.session_state.conversation_history = ConversationHistory()
+                    restore_session()
+                    st.warning("This conversation was updated in another window and has been reloaded.")
+                    st.stop()
+                placeholder.markdown(expand_document_references(doc_response))
             
-            # Document generation response
-            doc_response = f"I'll help you create a document about: {chat_input}. This is a simplified response. For full functionality, please check the complete version."
             st.session_state.conversation_history.append({"role": "assistant", "content": doc_response})
+            if is_complete:
+                manager = registry.get(session_id)
+                st.session_state.generated_document_ref = manager.generated_document_ref
+                st.session_state.document_type = manager.get_current_document_type()
             st.rerun()
     
     # Action buttons
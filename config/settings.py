@@ -8,15 +8,68 @@ load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
 OPENAI_TEMPERATURE = float(os.getenv("OPENAI_TEMPERATURE", "0.7"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))  # process-wide in-flight LLM calls
+
+# LLM HTTP Connection Pool Settings
+LLM_POOL_MAX_CONNECTIONS = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "20"))
+LLM_POOL_MAX_KEEPALIVE = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "10"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))  # seconds an idle connection is kept
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))  # seconds
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "60"))  # seconds
+
+# LLM Response Cache Settings
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHEABLE_STATES = [s.strip() for s in os.getenv("LLM_CACHEABLE_STATES", "greeting,document_selection").split(",") if s.strip()]
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "3600"))  # seconds
+LLM_CACHE_DISK_PATH = os.getenv("LLM_CACHE_DISK_PATH", "")  # empty keeps the cache in memory only
 
 # Application Settings
 DEFAULT_LANGUAGE = os.getenv("DEFAULT_LANGUAGE", "EN")  # EN or DE
-MAX_CONVERSATION_LENGTH = int(os.getenv("MAX_CONVERSATION_LENGTH", "50"))
+MAX_CONVERSATION_LENGTH = int(os.getenv("MAX_CONVERSATION_LENGTH", "50"))  # messages kept in memory per conversation
+HISTORY_INLINE_MAX_CHARS = int(os.getenv("HISTORY_INLINE_MAX_CHARS", "4000"))  # longer messages are kept on disk only
+HISTORY_SPILL_PATH = os.getenv("HISTORY_SPILL_PATH", "sessions/history_spill.sqlite3")
+DOCUMENT_STORE_DIR = os.getenv("DOCUMENT_STORE_DIR", "sessions/documents")
+DOCUMENT_STORE_CACHE_SIZE = int(os.getenv("DOCUMENT_STORE_CACHE_SIZE", "16"))  # decoded documents kept in memory per process
+SESSION_PERSISTENCE_ENABLED = os.getenv("SESSION_PERSISTENCE_ENABLED", "true").lower() == "true"
+SESSION_STORE_BACKEND = os.getenv("SESSION_STORE_BACKEND", "sqlite")  # sqlite, redis or memory
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", "sessions/sessions.sqlite3")
+SESSION_REDIS_URL = os.getenv("SESSION_REDIS_URL", "redis://127.0.0.1:6379/0")
+SESSION_REDIS_PREFIX = os.getenv("SESSION_REDIS_PREFIX", "legal_doc_ai:session")
+SESSION_REGISTRY_MAX_SESSIONS = int(os.getenv("SESSION_REGISTRY_MAX_SESSIONS", "500"))  # live sessions per worker, 0 for no limit
+SESSION_IDLE_TIMEOUT = float(os.getenv("SESSION_IDLE_TIMEOUT", "1800"))  # seconds, 0 to keep idle sessions
+SESSION_MEMORY_LIMIT_MB = float(os.getenv("SESSION_MEMORY_LIMIT_MB", "256"))  # per worker, 0 for no limit
+DOC_CLASSIFIER_THRESHOLD = float(os.getenv("DOC_CLASSIFIER_THRESHOLD", "0.5"))  # at or below this the LLM asks for clarification
+DOC_CLASSIFIER_FAST_PATH_MIN_SCORE = float(os.getenv("DOC_CLASSIFIER_FAST_PATH_MIN_SCORE", "3"))  # keyword weight needed to skip the LLM on greeting
+DOC_CLASSIFIER_FAST_PATH_MIN_MARGIN = float(os.getenv("DOC_CLASSIFIER_FAST_PATH_MIN_MARGIN", "2"))  # lead over the runner-up document type
+
+# Prompt Context Settings (tokens)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+CONTEXT_MAX_MESSAGE_TOKENS = int(os.getenv("CONTEXT_MAX_MESSAGE_TOKENS", "400"))
+CONTEXT_SUMMARY_TOKENS = int(os.getenv("CONTEXT_SUMMARY_TOKENS", "150"))
 
 # Document Export Settings
 DEFAULT_EXPORT_FORMAT = os.getenv("DEFAULT_EXPORT_FORMAT", "docx")  # docx or pdf
 EXPORT_FOLDER = os.getenv("EXPORT_FOLDER", "exports")
 
+# Metrics Settings
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_NAMESPACE = os.getenv("METRICS_NAMESPACE", "legal_doc_ai")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # serve /metrics on this port; 0 disables the endpoint
+
+# Benchmark Settings
+BENCHMARK_BASELINE_PATH = os.getenv("BENCHMARK_BASELINE_PATH", "benchmarks/baseline.json")
+BENCHMARK_REGRESSION_THRESHOLD = float(os.getenv("BENCHMARK_REGRESSION_THRESHOLD", "0.2"))  # allowed slowdown fraction
+
+# Localization Research Settings
+RESEARCH_MAX_WORKERS = int(os.getenv("RESEARCH_MAX_WORKERS", "4"))
+RESEARCH_QUERY_TIMEOUT = float(os.getenv("RESEARCH_QUERY_TIMEOUT", "10"))
+RESEARCH_DATA_DIR = os.getenv("RESEARCH_DATA_DIR", "research_data")
+RESEARCH_CACHE_TTL = float(os.getenv("RESEARCH_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+RESEARCH_MAX_ENTRIES_PER_KEY = int(os.getenv("RESEARCH_MAX_ENTRIES_PER_KEY", "3"))
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "duckduckgo")  # duckduckgo, replay or stub
+SEARCH_FIXTURE_PATH = os.getenv("SEARCH_FIXTURE_PATH", "research_data/search_fixtures.json")
+
 # UI Settings
 STREAMLIT_THEME = {
     "primaryColor": "#3b82f6",  # Bright blue
@@ -1,22 +1,46 @@
 import os
-from typing import Dict, List, Any, Optional
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, SystemMessage
-from config.settings import OPENAI_API_KEY, OPENAI_MODEL, OPENAI_TEMPERATURE
+import time
+from typing import Dict, List, Any, Optional, Iterator, AsyncIterator
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from config.settings import OPENAI_API_KEY, OPENAI_MODEL, OPENAI_TEMPERATURE, LLM_CACHE_ENABLED, LLM_CACHEABLE_STATES
+from core.llm_clients import get_chat_model
+from core.context_builder import ContextBuilder, serialize_collected_data
+from core.llm_limiter import LLMConcurrencyLimiter, llm_limiter
+from core.metrics import metrics, span
+from core.response_cache import ResponseCache, make_cache_key, model_identity, response_cache as shared_response_cache
+from core.validation import validate_input
+
+class ReplacementChunk(str):
+    """Stream chunk that replaces everything streamed before it, e.g. an error after a partial response."""
 
 class AIEngine:
     """AI engine for handling LLM interactions."""
     
-    def __init__(self):
-        """Initialize the AI engine with OpenAI configuration."""
-        if not OPENAI_API_KEY:
-            raise ValueError("OPENAI_API_KEY is required. Please set it in your .env file.")
+    def __init__(self,
+                 context_builder: Optional[ContextBuilder] = None,
+                 llm: Optional[BaseChatModel] = None,
+                 limiter: Optional[LLMConcurrencyLimiter] = None,
+                 response_cache: Optional[ResponseCache] = None):
+        """
+        Initialize the AI engine with OpenAI configuration.
         
-        self.llm = ChatOpenAI(
-            model=OPENAI_MODEL,
-            temperature=OPENAI_TEMPERATURE,
-            api_key=OPENAI_API_KEY
-        )
+        Args:
+            context_builder: Builds token-budgeted prompts
+            llm: Chat model to use instead of the shared ChatOpenAI client, e.g. a local stub
+            limiter: Concurrency limiter for async calls, defaults to the process-wide one
+            response_cache: Cache for responses in cacheable states, defaults to the process-wide one
+        """
+        # Engines share pooled clients, so sessions reuse warm connections
+        self.llm = llm or get_chat_model(OPENAI_MODEL, OPENAI_TEMPERATURE, OPENAI_API_KEY)
+        self.limiter = limiter or llm_limiter
+        # Only states whose prompts are not personalized may be answered from the cache
+        self.cacheable_states = set(LLM_CACHEABLE_STATES)
+        self.response_cache = response_cache or (shared_response_cache if LLM_CACHE_ENABLED else None)
+        self.model_identity = model_identity(self.llm)
+        self.context_builder = context_builder or ContextBuilder()
+        self.last_context_stats: Dict[str, int] = {}
+        self.total_prompt_tokens = 0
         
         # System prompts for different conversation states
         self.system_prompts = {
@@ -63,6 +87,158 @@ class AIEngine:
         Returns:
             AI response string
         """
+        context_messages = self._build_context_messages(user_message, conversation_history, state, language, context)
+        cache_key = self._cache_key(state, language, context_messages)
+        cached = self._cached_response(cache_key, state)
+        if cached is not None:
+            return cached
+        
+        try:
+            # Get response from LLM
+            with span("llm_request", state=state):
+                response = self.llm.invoke(self._to_langchain_messages(context_messages))
+        except Exception as e:
+            return self._error_message(e, language)
+        
+        if cache_key:
+            self.response_cache.set(cache_key, response.content)
+        return response.content
+    
+    async def aget_response(self, 
+                            user_message: str, 
+                            conversation_history: List[Dict[str, str]], 
+                            state: str = "greeting",
+                            language: str = "EN",
+                            context: Optional[Dict[str, Any]] = None,
+                            session_id: Optional[str] = None) -> str:
+        """
+        Async variant of get_response.
+        
+        The upstream call waits for a slot from the process-wide concurrency
+        limiter, which admits sessions fairly.
+        
+        Args:
+            session_id: Conversation the request belongs to, used for fair queuing
+        
+        Returns:
+            AI response string
+        """
+        context_messages = self._build_context_messages(user_message, conversation_history, state, language, context)
+        cache_key = self._cache_key(state, language, context_messages)
+        cached = self._cached_response(cache_key, state)
+        if cached is not None:
+            return cached
+        
+        try:
+            async with self.limiter.slot(session_id):
+                with span("llm_request", state=state):
+                    response = await self.llm.ainvoke(self._to_langchain_messages(context_messages))
+        except Exception as e:
+            return self._error_message(e, language)
+        
+        if cache_key:
+            self.response_cache.set(cache_key, response.content)
+        return response.content
+    
+    def stream_response(self, 
+                        user_message: str, 
+                        conversation_history: List[Dict[str, str]], 
+                        state: str = "greeting",
+                        language: str = "EN",
+                        context: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """
+        Stream the AI response chunk by chunk as it arrives.
+        
+        Takes the same arguments as get_response. The time until the first
+        chunk is recorded in the llm_time_to_first_token_seconds histogram.
+        If the stream fails, a ReplacementChunk with the error message is
+        yielded and replaces the text streamed so far.
+        
+        Returns:
+            Iterator of response text chunks
+        """
+        context_messages = self._build_context_messages(user_message, conversation_history, state, language, context)
+        start = time.perf_counter()
+        
+        cache_key = self._cache_key(state, language, context_messages)
+        cached = self._cached_response(cache_key, state)
+        if cached is not None:
+            yield cached
+            return
+        
+        chunks = []
+        try:
+            with span("llm_request", state=state):
+                for chunk in self.llm.stream(self._to_langchain_messages(context_messages)):
+                    if not chunk.content:
+                        continue
+                    if not chunks:
+                        metrics.observe("llm_time_to_first_token_seconds", time.perf_counter() - start, state=state)
+                    chunks.append(chunk.content)
+                    yield chunk.content
+        except Exception as e:
+            yield ReplacementChunk(self._error_message(e, language))
+            return
+        
+        if cache_key:
+            self.response_cache.set(cache_key, "".join(chunks))
+    
+    async def astream_response(self, 
+                               user_message: str, 
+                               conversation_history: List[Dict[str, str]], 
+                               state: str = "greeting",
+                               language: str = "EN",
+                               context: Optional[Dict[str, Any]] = None,
+                               session_id: Optional[str] = None) -> AsyncIterator[str]:
+        """Async variant of stream_response, holding a limiter slot while streaming."""
+        context_messages = self._build_context_messages(user_message, conversation_history, state, language, context)
+        start = time.perf_counter()
+        
+        cache_key = self._cache_key(state, language, context_messages)
+        cached = self._cached_response(cache_key, state)
+        if cached is not None:
+            yield cached
+            return
+        
+        chunks = []
+        try:
+            async with self.limiter.slot(session_id):
+                with span("llm_request", state=state):
+                    async for chunk in self.llm.astream(self._to_langchain_messages(context_messages)):
+                        if not chunk.content:
+                            continue
+                        if not chunks:
+                            metrics.observe("llm_time_to_first_token_seconds", time.perf_counter() - start, state=state)
+                        chunks.append(chunk.content)
+                        yield chunk.content
+        except Exception as e:
+            yield ReplacementChunk(self._error_message(e, language))
+            return
+        
+        if cache_key:
+            self.response_cache.set(cache_key, "".join(chunks))
+    
+    def _cached_response(self, cache_key: Optional[str], state: str) -> Optional[str]:
+        """Look up a cached response and count the hit or miss."""
+        if not cache_key:
+            return None
+        cached = self.response_cache.get(cache_key)
+        metrics.inc("llm_cache_requests_total", state=state, result="hit" if cached is not None else "miss")
+        return cached
+    
+    def _cache_key(self, state: str, language: str, context_messages: List[Dict[str, str]]) -> Optional[str]:
+        """Get the response cache key, or None if responses for this state must stay live."""
+        if self.response_cache is None or state not in self.cacheable_states:
+            return None
+        return make_cache_key(state, language, context_messages, self.model_identity)
+    
+    def _build_context_messages(self,
+                                user_message: str,
+                                conversation_history: List[Dict[str, str]],
+                                state: str,
+                                language: str,
+                                context: Optional[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """Build the prompt for one request as {"role", "content"} dicts."""
         # Build system prompt
         system_prompt = self.system_prompts.get(state, self.system_prompts["greeting"]).get(language, self.system_prompts["greeting"]["EN"])
         
@@ -80,39 +256,36 @@ class AIEngine:
                 collected_data = context.get("collected_data", {})
                 system_prompt += f"\n\nCurrent question: {current_question}"
                 if collected_data:
-                    system_prompt += f"\nCollected information so far: {collected_data}"
+                    system_prompt += f"\nCollected information so far: {serialize_collected_data(collected_data)}"
                 system_prompt += "\nAsk the current question and wait for the user's response."
             
             elif state == "document_generation":
                 doc_type = context.get("document_type", "")
                 collected_data = context.get("collected_data", {})
                 system_prompt += f"\n\nDocument type: {doc_type}"
-                system_prompt += f"\nCollected data: {collected_data}"
+                system_prompt += f"\nCollected data: {serialize_collected_data(collected_data)}"
                 system_prompt += "\nGenerate a professional legal document using the provided template and data."
         
-        # Build messages
-        messages = [SystemMessage(content=system_prompt)]
-        
-        # Add conversation history
-        for msg in conversation_history[-10:]:  # Keep last 10 messages for context
-            if msg["role"] == "user":
-                messages.append(HumanMessage(content=msg["content"]))
-            else:
-                messages.append(SystemMessage(content=msg["content"]))
-        
-        # Add current user message
-        messages.append(HumanMessage(content=user_message))
-        
-        try:
-            # Get response from LLM
-            response = self.llm.invoke(messages)
-            return response.content
-        except Exception as e:
-            error_msg = {
-                "EN": f"I apologize, but I encountered an error: {str(e)}. Please try again.",
-                "DE": f"Entschuldigung, aber es ist ein Fehler aufgetreten: {str(e)}. Bitte versuchen Sie es erneut."
-            }
-            return error_msg.get(language, error_msg["EN"])
+        # Fit history into the token budget
+        context_messages, stats = self.context_builder.build(system_prompt, conversation_history, user_message)
+        self.last_context_stats = stats
+        self.total_prompt_tokens += stats["prompt_tokens"]
+        return context_messages
+    
+    @staticmethod
+    def _error_message(error: Exception, language: str) -> str:
+        """Get a user-facing message for a failed LLM call."""
+        error_msg = {
+            "EN": f"I apologize, but I encountered an error: {str(error)}. Please try again.",
+            "DE": f"Entschuldigung, aber es ist ein Fehler aufgetreten: {str(error)}. Bitte versuchen Sie es erneut."
+        }
+        return error_msg.get(language, error_msg["EN"])
+    
+    @staticmethod
+    def _to_langchain_messages(context_messages: List[Dict[str, str]]) -> List[Any]:
+        """Convert {"role", "content"} dicts into LangChain message objects."""
+        message_types = {"system": SystemMessage, "user": HumanMessage, "assistant": AIMessage}
+        return [message_types.get(m["role"], SystemMessage)(content=m["content"]) for m in context_messages]
     
     def validate_response(self, user_input: str, expected_type: str, language: str = "EN") -> tuple[bool, str]:
         """
@@ -126,33 +299,4 @@ class AIEngine:
         Returns:
             Tuple of (is_valid, error_message)
         """
-        if not user_input.strip():
-            return False, "Input cannot be empty."
-        
-        if expected_type == "number":
-            try:
-                float(user_input)
-                return True, ""
-            except ValueError:
-                return False, "Please enter a valid number."
-        
-        elif expected_type == "date":
-            # Simple date validation (YYYY-MM-DD format)
-            import re
-            date_pattern = r'^\d{4}-\d{2}-\d{2}$'
-            if not re.match(date_pattern, user_input):
-                return False, "Please enter date in YYYY-MM-DD format."
-            return True, ""
-        
-        elif expected_type == "boolean":
-            positive_responses = ["yes", "y", "ja", "j", "true", "1"] if language == "EN" else ["ja", "j", "yes", "y", "true", "1"]
-            negative_responses = ["no", "n", "nein", "false", "0"] if language == "EN" else ["nein", "n", "no", "false", "0"]
-            
-            user_input_lower = user_input.lower().strip()
-            if user_input_lower in positive_responses + negative_responses:
-                return True, ""
-            else:
-                return False, f"Please answer with {'yes/no' if language == 'EN' else 'ja/nein'}."
-        
-        # For text type, any non-empty input is valid
-        return True, ""
+        return validate_input(user_input, expected_type, language)
@@ -0,0 +1,123 @@
+import csv
+import json
+import os
+import re
+import time
+from typing import Any, Dict, Iterator, Optional, Set
+from core.document_gen import get_document_generator
+
+def read_records(input_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream records from a CSV or JSONL file.
+
+    CSV columns and JSONL object keys are the field ids from DOCUMENT_QUESTIONS.
+
+    Args:
+        input_path: Path to a .csv or .jsonl file
+
+    Returns:
+        Iterator of records
+    """
+    extension = os.path.splitext(input_path)[1].lower()
+
+    if extension == ".csv":
+        with open(input_path, 'r', encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                yield {key.strip(): (value or "").strip() for key, value in row.items() if key}
+    elif extension in (".jsonl", ".ndjson"):
+        with open(input_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        raise ValueError(f"Unsupported input format: {extension} (use .csv or .jsonl)")
+
+def output_record_id(result: Dict[str, Any], used: Set[str]) -> str:
+    """
+    Get a file-name-safe, unique id for a batch result.
+
+    Characters other than letters, digits, '_' and '-' in the record's id
+    are replaced, records without an id are numbered by position, and an id
+    seen before gets a numeric suffix.
+
+    Args:
+        result: Result from DocumentGenerator.generate_many
+        used: Ids returned so far; updated in place
+    """
+    record_id = re.sub(r"[^A-Za-z0-9_-]", "_", str(result["record"].get("id") or ""))
+    record_id = record_id or f"{result['index'] + 1:06d}"
+    candidate, suffix = record_id, 1
+    while candidate in used:
+        suffix += 1
+        candidate = f"{record_id}_{suffix}"
+    used.add(candidate)
+    return candidate
+
+def run_batch(input_path: str,
+              document_type: str,
+              output_dir: str,
+              language: str = "EN",
+              max_workers: Optional[int] = None,
+              errors_path: Optional[str] = None,
+              progress_every: int = 100) -> Dict[str, Any]:
+    """
+    Generate documents for every record in an input file.
+
+    Each document is written to output_dir as soon as it is rendered. Failed
+    records are reported individually and, if errors_path is set, appended
+    to that JSONL file.
+
+    Args:
+        input_path: CSV or JSONL file with one record per document
+        document_type: Type of document to generate
+        output_dir: Directory for generated documents
+        language: Language for document
+        max_workers: Worker processes for rendering
+        errors_path: Optional JSONL file for per-record errors
+        progress_every: Print progress after this many records
+
+    Returns:
+        Summary with total, succeeded, failed, elapsed seconds and records per second
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    generator = get_document_generator()
+    errors_file = open(errors_path, 'w', encoding='utf-8') if errors_path else None
+
+    total = succeeded = failed = 0
+    used_ids: Set[str] = set()
+    start = time.monotonic()
+
+    try:
+        results = generator.generate_many(read_records(input_path), document_type, language, max_workers)
+        for result in results:
+            total += 1
+            record_id = output_record_id(result, used_ids)
+
+            if result["errors"]:
+                failed += 1
+                print(f"❌ Record {record_id}: {'; '.join(result['errors'])}")
+                if errors_file:
+                    errors_file.write(json.dumps({"index": result["index"], "id": record_id, "errors": result["errors"]}, ensure_ascii=False) + "\n")
+            else:
+                succeeded += 1
+                filename = f"{document_type}_{language}_{record_id}.txt"
+                with open(os.path.join(output_dir, filename), 'w', encoding='utf-8') as f:
+                    f.write(result["document"])
+
+            if progress_every and total % progress_every == 0:
+                elapsed = time.monotonic() - start
+                print(f"   {total} records, {total / elapsed:.1f} records/s")
+    finally:
+        if errors_file:
+            errors_file.close()
+
+    elapsed = time.monotonic() - start
+    summary = {
+        "total": total,
+        "succeeded": succeeded,
+        "failed": failed,
+        "elapsed_seconds": round(elapsed, 3),
+        "records_per_second": round(total / elapsed, 1) if elapsed > 0 else 0.0
+    }
+    print(f"✅ Batch complete: {succeeded}/{total} documents generated, {failed} failed ({summary['records_per_second']} records/s)")
+    return summary
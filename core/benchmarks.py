@@ -0,0 +1,219 @@
+import json
+import os
+import platform
+import random
+import statistics
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+from config.settings import BENCHMARK_BASELINE_PATH, BENCHMARK_REGRESSION_THRESHOLD
+from data.document_types import DOCUMENT_QUESTIONS, get_all_document_types, get_document_questions
+from core.loadtest import isolated_stores, sample_answer
+from core.search_backends import StubSearchBackend
+
+# Target wall time for one timed repeat; the number of calls is calibrated to reach it
+MIN_REPEAT_SECONDS = 0.2
+SYNTHETIC_RESULT_COUNT = 500
+
+def sample_record(document_type: str) -> Dict[str, str]:
+    """Build a complete, valid record for a document type."""
+    return {question["id"]: sample_answer(question) for question in get_document_questions(document_type)}
+
+def synthetic_search_results(count: int = SYNTHETIC_RESULT_COUNT, seed: int = 7) -> List[Dict]:
+    """Build a large, repeatable set of search results for the extractors."""
+    backend = StubSearchBackend()
+    rng = random.Random(seed)
+    results = []
+    for i in range(count):
+        results.extend(backend.search(f"benchmark query {rng.random():.6f} {i}", max_results=1))
+    return results
+
+def templated_document_types(generator) -> List[str]:
+    """Document types that have a template; the others only render a 'template not found' message."""
+    return [document_type for document_type in DOCUMENT_QUESTIONS if generator.get_template(document_type, "EN") is not None]
+
+def build_benchmarks(export_folder: str) -> Dict[str, Callable[[], Any]]:
+    """
+    Build the benchmark cases. Setup happens here, so only the calls are timed.
+
+    Args:
+        export_folder: Scratch directory for exporter output
+
+    Returns:
+        Mapping of benchmark name to a zero-argument callable
+    """
+    # Imported here so `run.py bench --help` stays fast
+    from core.ai_engine import AIEngine
+    from core.conversation import ConversationManager
+    from core.document_gen import get_document_generator
+    from core.localization_research import LocalizationResearchEngine
+    from core.research_store import ResearchStore
+    from core.stub_llm import StubChatModel
+    from utils.export import DocumentExporter
+
+    generator = get_document_generator()
+    benchmarks: Dict[str, Callable[[], Any]] = {}
+
+    for document_type in templated_document_types(generator):
+        record = sample_record(document_type)
+        benchmarks[f"generate_document[{document_type}]"] = (
+            lambda document_type=document_type, record=record:
+                generator.generate_document(document_type, dict(record), "EN")
+        )
+
+    lease_record = sample_record("residential_lease")
+    benchmarks["process_data_for_template"] = lambda: generator._process_data_for_template(lease_record, "residential_lease", "EN")
+
+    document = generator.generate_document("residential_lease", dict(lease_record), "EN")
+    exporter = DocumentExporter(export_folder)
+
+    def export_and_remove(export: Callable[..., Optional[str]]) -> Callable[[], None]:
+        def run():
+            path = export(document, "residential_lease", "EN")
+            if path:
+                os.remove(path)
+        return run
+
+    benchmarks["export_to_docx"] = export_and_remove(exporter.export_to_docx)
+    benchmarks["export_to_pdf"] = export_and_remove(exporter.export_to_pdf)
+
+    research_engine = LocalizationResearchEngine(
+        store=ResearchStore(os.path.join(export_folder, "research")),
+        search_backend=StubSearchBackend()
+    )
+    results = synthetic_search_results()
+    for method in ("_extract_legal_requirements", "_extract_template_structure",
+                   "_extract_key_clauses", "_extract_compliance_notes"):
+        benchmarks[method] = lambda extract=getattr(research_engine, method): extract(results)
+
+    manager = ConversationManager(ai_engine=AIEngine(llm=StubChatModel()))
+    names = [info["name"] for info in get_all_document_types().values()]
+    messages = [f"I need a {name.lower()} for my company" for name in names] + [
+        "Ich brauche einen Arbeitsvertrag", "Necesito un contrato de alquiler", "hello, what can you do?"
+    ]
+    benchmarks["identify_document_type"] = lambda: [manager._identify_document_type(m) for m in messages]
+
+    inputs = [("Jane Doe", "text"), ("2025-01-15", "date"), ("15.01.2025", "date"),
+              ("yes", "boolean"), ("maybe", "boolean"), ("1500.50", "number")]
+    engine = manager.ai_engine
+    benchmarks["validate_response"] = lambda: [engine.validate_response(value, kind, "EN") for value, kind in inputs]
+
+    return benchmarks
+
+def time_call(func: Callable[[], Any], repeat: int = 5, min_time: float = MIN_REPEAT_SECONDS) -> Dict[str, float]:
+    """
+    Time a callable.
+
+    The number of calls per repeat is doubled until one repeat takes at least
+    min_time; each repeat is then timed and reported per call.
+
+    Returns:
+        Timing summary in microseconds per call
+    """
+    func()  # warm caches and lazy initialization
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number * 1e6)
+
+    return {
+        "calls_per_repeat": number,
+        "min_us": round(min(samples), 3),
+        "median_us": round(statistics.median(samples), 3),
+        "stdev_us": round(statistics.stdev(samples), 3) if len(samples) > 1 else 0.0
+    }
+
+def run_benchmarks(pattern: Optional[str] = None, repeat: int = 5, min_time: float = MIN_REPEAT_SECONDS) -> Dict[str, Any]:
+    """
+    Run the benchmark suite offline.
+
+    Args:
+        pattern: Only run benchmarks whose name contains this text
+        repeat: Timed repeats per benchmark
+        min_time: Minimum seconds per repeat
+
+    Returns:
+        Results with environment info and per-benchmark timings
+    """
+    from core.document_gen import get_document_generator
+
+    # Research lookups during generation and stored documents stay in the scratch directory
+    with tempfile.TemporaryDirectory() as export_folder, isolated_stores(export_folder):
+        benchmarks = build_benchmarks(export_folder)
+        timings = {}
+        for name, func in benchmarks.items():
+            if pattern and pattern not in name:
+                continue
+            timings[name] = time_call(func, repeat, min_time)
+            print(f"   {name:<45}{timings[name]['median_us']:>14.1f} µs")
+
+    templated = set(templated_document_types(get_document_generator()))
+    skipped = {f"generate_document[{document_type}]": "no template"
+               for document_type in DOCUMENT_QUESTIONS if document_type not in templated}
+    skipped = {name: reason for name, reason in skipped.items() if not pattern or pattern in name}
+    for name, reason in skipped.items():
+        print(f"   {name:<45}{'skipped':>14} ({reason})")
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "benchmarks": timings,
+        "skipped": skipped
+    }
+
+def load_baseline(path: str = BENCHMARK_BASELINE_PATH) -> Optional[Dict[str, Any]]:
+    """Load stored baseline results, or None if there are none."""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_results(results: Dict[str, Any], path: str):
+    """Write results as JSON, e.g. to store them as the new baseline."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+def compare_to_baseline(results: Dict[str, Any],
+                        baseline: Dict[str, Any],
+                        threshold: float = BENCHMARK_REGRESSION_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Compare results against a baseline.
+
+    Args:
+        results: Results from run_benchmarks
+        baseline: Stored baseline results
+        threshold: Allowed slowdown as a fraction, e.g. 0.2 for 20%
+
+    Returns:
+        One entry per benchmark present in both, with the ratio and whether it regressed
+    """
+    comparison = []
+    for name, timing in results["benchmarks"].items():
+        reference = baseline.get("benchmarks", {}).get(name)
+        if not reference or not reference.get("median_us"):
+            continue
+        ratio = timing["median_us"] / reference["median_us"]
+        comparison.append({
+            "name": name,
+            "baseline_us": reference["median_us"],
+            "current_us": timing["median_us"],
+            "ratio": round(ratio, 3),
+            "regressed": ratio > 1 + threshold
+        })
+    return comparison
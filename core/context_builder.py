@@ -0,0 +1,136 @@
+import json
+import math
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from config.settings import CONTEXT_TOKEN_BUDGET, CONTEXT_MAX_MESSAGE_TOKENS, CONTEXT_SUMMARY_TOKENS
+from core.document_store import abbreviate_document_references
+
+# Fixed per-message overhead of the chat format (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+TRUNCATION_MARKER = " …[truncated]"
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate the number of tokens in a text without a tokenizer.
+
+    ASCII text averages about four characters per token; other scripts
+    (Cyrillic, Arabic, accented Latin) tokenize closer to two.
+    """
+    if not text:
+        return 0
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return math.ceil((len(text) - non_ascii) / 4 + non_ascii / 2)
+
+def serialize_collected_data(collected_data: Dict[str, Any]) -> str:
+    """Serialize collected answers compactly for inclusion in a prompt."""
+    return json.dumps(collected_data, ensure_ascii=False, separators=(",", ":"), default=str)
+
+class ContextBuilder:
+    """
+    Fits the system prompt, conversation history and current message into a
+    token budget.
+
+    The most recent turns are kept, each capped at max_message_tokens. Turns
+    that no longer fit are replaced by a short summary message.
+    """
+
+    def __init__(self,
+                 max_tokens: int = CONTEXT_TOKEN_BUDGET,
+                 max_message_tokens: int = CONTEXT_MAX_MESSAGE_TOKENS,
+                 summary_tokens: int = CONTEXT_SUMMARY_TOKENS,
+                 count_tokens: Optional[Callable[[str], int]] = None):
+        """
+        Initialize the context builder.
+
+        Args:
+            max_tokens: Token budget for the whole prompt
+            max_message_tokens: Cap for any single history message
+            summary_tokens: Budget for the summary of dropped turns
+            count_tokens: Token counter, defaults to the local estimate_tokens approximation
+        """
+        self.max_tokens = max_tokens
+        self.max_message_tokens = max_message_tokens
+        self.summary_tokens = summary_tokens
+        self.count_tokens = count_tokens or estimate_tokens
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Shorten text to roughly max_tokens, marking the cut."""
+        if self.count_tokens(text) <= max_tokens:
+            return text
+        # Shrink proportionally, then trim until it fits
+        cut = int(len(text) * max_tokens / max(self.count_tokens(text), 1))
+        while cut > 0 and self.count_tokens(text[:cut]) + self.count_tokens(TRUNCATION_MARKER) > max_tokens:
+            cut = int(cut * 0.9)
+        return text[:cut].rstrip() + TRUNCATION_MARKER
+
+    def build(self,
+              system_prompt: str,
+              conversation_history: List[Dict[str, str]],
+              user_message: str) -> Tuple[List[Dict[str, str]], Dict[str, int]]:
+        """
+        Build the message list for one LLM request.
+
+        Args:
+            system_prompt: System prompt including any context
+            conversation_history: Previous messages as {"role", "content"} dicts
+            user_message: Current user message
+
+        Returns:
+            Tuple of (messages as {"role", "content"} dicts, stats) where stats holds
+            prompt_tokens, history_messages and dropped_messages
+        """
+        history = list(conversation_history)
+        # The caller may already have appended the current message to the history
+        if history and history[-1].get("role") == "user" and history[-1].get("content") == user_message:
+            history.pop()
+
+        system_tokens = self.count_tokens(system_prompt) + MESSAGE_OVERHEAD_TOKENS
+        user_tokens = self.count_tokens(user_message) + MESSAGE_OVERHEAD_TOKENS
+        remaining = self.max_tokens - system_tokens - user_tokens - self.summary_tokens
+
+        kept: List[Dict[str, str]] = []
+        for message in reversed(history):
+            # Generated documents are never resent; the reference becomes a short note
+            content = self.truncate(abbreviate_document_references(message["content"]), self.max_message_tokens)
+            tokens = self.count_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+            if tokens > remaining:
+                break
+            kept.append({"role": message["role"], "content": content})
+            remaining -= tokens
+        kept.reverse()
+
+        dropped = history[:len(history) - len(kept)]
+        messages = [{"role": "system", "content": system_prompt}]
+        summary_used = 0
+        if dropped:
+            summary = self.summarize(dropped)
+            summary_used = self.count_tokens(summary) + MESSAGE_OVERHEAD_TOKENS
+            messages.append({"role": "system", "content": summary})
+        messages.extend(kept)
+        messages.append({"role": "user", "content": user_message})
+
+        prompt_tokens = system_tokens + user_tokens + summary_used + sum(
+            self.count_tokens(m["content"]) + MESSAGE_OVERHEAD_TOKENS for m in kept
+        )
+        stats = {
+            "prompt_tokens": prompt_tokens,
+            "history_messages": len(kept),
+            "dropped_messages": len(dropped)
+        }
+        return messages, stats
+
+    def summarize(self, messages: List[Dict[str, str]]) -> str:
+        """Summarize dropped turns locally, keeping the start of the latest user messages."""
+        summary = f"Summary of {len(messages)} earlier messages:"
+        budget = self.summary_tokens - MESSAGE_OVERHEAD_TOKENS - self.count_tokens(summary)
+        points: List[str] = []
+        for message in reversed(messages):
+            if message.get("role") != "user":
+                continue
+            first_line = message["content"].split("\n", 1)[0][:120]
+            point = f"\n- user: {first_line}"
+            tokens = self.count_tokens(point)
+            if tokens > budget:
+                break
+            points.append(point)
+            budget -= tokens
+        return summary + "".join(reversed(points))
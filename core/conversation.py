@@ -1,7 +1,15 @@
-from typing import Dict, List, Any, Optional
+import asyncio
+import uuid
+from typing import Dict, Any, Optional, Callable
 from enum import Enum
+from config.settings import DOC_CLASSIFIER_FAST_PATH_MIN_MARGIN, DOC_CLASSIFIER_FAST_PATH_MIN_SCORE, MAX_CONVERSATION_LENGTH
 from data.document_types import get_document_questions, get_all_document_types
-from core.ai_engine import AIEngine
+from core.ai_engine import AIEngine, ReplacementChunk
+from core.doc_classifier import get_document_classifier
+from core.history import ConversationHistory
+from core.metrics import span
+from core.session_store import SNAPSHOT_VERSION, SUPPORTED_SNAPSHOT_VERSIONS, SessionConflictError, SessionStore
+from core.document_store import document_reference, get_document_store
 
 class ConversationState(Enum):
     """Enumeration of conversation states."""
@@ -15,16 +23,33 @@ class ConversationState(Enum):
 class ConversationManager:
     """Manages conversation flow and state for document generation."""
     
-    def __init__(self, language: str = "EN"):
-        """Initialize conversation manager."""
+    def __init__(self,
+                 language: str = "EN",
+                 ai_engine: Optional[AIEngine] = None,
+                 session_store: Optional[SessionStore] = None,
+                 session_id: Optional[str] = None):
+        """
+        Initialize conversation manager.
+        
+        Args:
+            language: Conversation language
+            ai_engine: AI engine to use, e.g. one backed by a stub chat model
+            session_store: Store the conversation is saved to after every turn
+            session_id: Identifier of the conversation, generated if omitted
+        """
         self.language = language
-        self.ai_engine = AIEngine()
+        self.session_id = session_id or uuid.uuid4().hex
+        self.ai_engine = ai_engine or AIEngine()
+        self.session_store = session_store
+        self.revision = 0
         self.state = ConversationState.GREETING
-        self.conversation_history = []
+        self.conversation_history = ConversationHistory()
         self.current_document_type = None
         self.collected_data = {}
         self.current_question_index = 0
         self.document_questions = []
+        self.generated_document_id = None
+        self._on_token: Optional[Callable[[str], None]] = None
         
         # Greeting messages
         self.greetings = {
@@ -36,16 +61,27 @@ class ConversationManager:
         """Get the initial greeting message."""
         return self.greetings.get(self.language, self.greetings["EN"])
     
-    def process_user_message(self, user_message: str) -> tuple[str, bool]:
+    def process_user_message(self, user_message: str, on_token: Optional[Callable[[str], None]] = None) -> tuple[str, bool]:
         """
         Process user message and return AI response.
         
         Args:
             user_message: User's input message
+            on_token: Optional callback receiving LLM response chunks as they stream in
             
         Returns:
             Tuple of (AI response, is_conversation_complete)
         """
+        self._on_token = on_token
+        try:
+            with span("conversation_turn", state=self.state.value):
+                return self._dispatch_user_message(user_message)
+        finally:
+            self._on_token = None
+            self.save_session()
+    
+    def _dispatch_user_message(self, user_message: str) -> tuple[str, bool]:
+        """Route a user message to the handler for the current state."""
         # Add user message to history
         self.conversation_history.append({"role": "user", "content": user_message})
         
@@ -67,61 +103,145 @@ class ConversationManager:
         else:
             return "I'm not sure how to proceed. Let me start over.", False
     
+    async def aprocess_user_message(self, user_message: str) -> tuple[str, bool]:
+        """
+        Async variant of process_user_message.
+        
+        LLM calls are awaited under the process-wide concurrency limiter, and
+        blocking research and generation steps run off the event loop.
+        
+        Args:
+            user_message: User's input message
+            
+        Returns:
+            Tuple of (AI response, is_conversation_complete)
+        """
+        try:
+            with span("conversation_turn", state=self.state.value):
+                return await self._adispatch_user_message(user_message)
+        finally:
+            if self.session_store is not None:
+                await asyncio.to_thread(self.save_session)
+    
+    async def _adispatch_user_message(self, user_message: str) -> tuple[str, bool]:
+        """Async variant of _dispatch_user_message."""
+        self.conversation_history.append({"role": "user", "content": user_message})
+        
+        if self.state == ConversationState.GREETING:
+            return await self._ahandle_greeting_state(user_message)
+        
+        elif self.state == ConversationState.DOCUMENT_SELECTION:
+            return await self._ahandle_document_selection_state(user_message)
+        
+        elif self.state == ConversationState.INFORMATION_GATHERING:
+            return await asyncio.to_thread(self._handle_information_gathering_state, user_message)
+        
+        elif self.state == ConversationState.LOCALIZATION_RESEARCH:
+            return await asyncio.to_thread(self._handle_localization_research_state, user_message)
+        elif self.state == ConversationState.DOCUMENT_GENERATION:
+            return await asyncio.to_thread(self._handle_document_generation_state, user_message)
+        
+        else:
+            return "I'm not sure how to proceed. Let me start over.", False
+    
+    async def _aask_llm(self, user_message: str, state: str, context: Optional[Dict[str, Any]] = None) -> str:
+        """Get an LLM response asynchronously, queued fairly with other sessions."""
+        return await self.ai_engine.aget_response(
+            user_message, self.conversation_history.recent(), state, self.language, context, session_id=self.session_id
+        )
+    
+    def _reply(self, response: str, is_complete: bool = False) -> tuple[str, bool]:
+        """Record an assistant response in the history and return it."""
+        self.conversation_history.append({"role": "assistant", "content": response})
+        return response, is_complete
+    
+    def _ask_llm(self, user_message: str, state: str, context: Optional[Dict[str, Any]] = None) -> str:
+        """Get an LLM response, streaming chunks to the on_token callback if one is set."""
+        if self._on_token is None:
+            return self.ai_engine.get_response(user_message, self.conversation_history.recent(), state, self.language, context)
+        
+        chunks = []
+        for chunk in self.ai_engine.stream_response(user_message, self.conversation_history.recent(), state, self.language, context):
+            if isinstance(chunk, ReplacementChunk):
+                chunks.clear()
+            chunks.append(chunk)
+            self._on_token(chunk)
+        return "".join(chunks)
+    
     def _handle_greeting_state(self, user_message: str) -> tuple[str, bool]:
         """Handle greeting state - transition to document selection."""
+        # Fast path: the first message clearly names a document type
+        response = self._select_document_type(user_message, strict=True)
+        if response is not None:
+            return self._reply(response)
+        
+        context = self._begin_document_selection()
+        return self._reply(self._ask_llm(user_message, "document_selection", context))
+    
+    async def _ahandle_greeting_state(self, user_message: str) -> tuple[str, bool]:
+        """Async variant of _handle_greeting_state."""
+        response = self._select_document_type(user_message, strict=True)
+        if response is not None:
+            return self._reply(response)
+        
+        context = self._begin_document_selection()
+        return self._reply(await self._aask_llm(user_message, "document_selection", context))
+    
+    def _begin_document_selection(self) -> Dict[str, Any]:
+        """Move to document selection and get the LLM context listing document types."""
         self.state = ConversationState.DOCUMENT_SELECTION
         
         # Get available document types
         doc_types = get_all_document_types(self.language)
-        
-        # Generate AI response for document selection
-        context = {"document_types": doc_types}
-        ai_response = self.ai_engine.get_response(
-            user_message, 
-            self.conversation_history, 
-            "document_selection", 
-            self.language, 
-            context
-        )
-        
-        self.conversation_history.append({"role": "assistant", "content": ai_response})
-        return ai_response, False
+        return {"document_types": doc_types}
     
     def _handle_document_selection_state(self, user_message: str) -> tuple[str, bool]:
         """Handle document selection state."""
-        # Try to identify document type from user message
-        doc_type = self._identify_document_type(user_message)
-        
-        if doc_type:
-            self.current_document_type = doc_type
-            self.document_questions = get_document_questions(doc_type, self.language)
-            self.state = ConversationState.INFORMATION_GATHERING
-            self.current_question_index = 0
-            
-            # Get first question
-            if self.document_questions:
-                first_question = self.document_questions[0]["question"]
-                response = f"🎯 **Perfect!** I'll help you create a {self._get_document_name(doc_type)}.\n\nI need to gather some essential information to generate your document. Let me ask you a few questions:\n\n**{first_question}**"
-            else:
-                response = f"Great! I'll help you create a {self._get_document_name(doc_type)}. Let me generate the document for you."
-                self.state = ConversationState.DOCUMENT_GENERATION
-            
-            self.conversation_history.append({"role": "assistant", "content": response})
-            return response, False
-        else:
-            # Ask for clarification
-            doc_types = get_all_document_types(self.language)
-            context = {"document_types": doc_types}
-            ai_response = self.ai_engine.get_response(
-                user_message, 
-                self.conversation_history, 
-                "document_selection", 
-                self.language, 
-                context
-            )
-            
-            self.conversation_history.append({"role": "assistant", "content": ai_response})
-            return ai_response, False
+        response = self._select_document_type(user_message)
+        if response is not None:
+            return self._reply(response)
+        
+        # Ask for clarification
+        context = {"document_types": get_all_document_types(self.language)}
+        return self._reply(self._ask_llm(user_message, "document_selection", context))
+    
+    async def _ahandle_document_selection_state(self, user_message: str) -> tuple[str, bool]:
+        """Async variant of _handle_document_selection_state."""
+        response = self._select_document_type(user_message)
+        if response is not None:
+            return self._reply(response)
+        
+        # Ask for clarification
+        context = {"document_types": get_all_document_types(self.language)}
+        return self._reply(await self._aask_llm(user_message, "document_selection", context))
+    
+    def _select_document_type(self, user_message: str, strict: bool = False) -> Optional[str]:
+        """
+        Try to identify the document type and start information gathering.
+        
+        Args:
+            user_message: User's message
+            strict: Require a strong, unambiguous match, as when skipping the LLM on greeting
+        
+        Returns:
+            Response announcing the first question, or None if no document type was identified
+        """
+        doc_type = self._identify_document_type(user_message, strict)
+        if not doc_type:
+            return None
+        
+        self.current_document_type = doc_type
+        self.document_questions = get_document_questions(doc_type, self.language)
+        self.state = ConversationState.INFORMATION_GATHERING
+        self.current_question_index = 0
+        
+        # Get first question
+        if self.document_questions:
+            first_question = self.document_questions[0]["question"]
+            return f"🎯 **Perfect!** I'll help you create a {self._get_document_name(doc_type)}.\n\nI need to gather some essential information to generate your document. Let me ask you a few questions:\n\n**{first_question}**"
+        
+        self.state = ConversationState.DOCUMENT_GENERATION
+        return f"Great! I'll help you create a {self._get_document_name(doc_type)}. Let me generate the document for you."
     
     def _handle_information_gathering_state(self, user_message: str) -> tuple[str, bool]:
         """Handle information gathering state."""
@@ -161,7 +281,7 @@ class ConversationManager:
     
     def _handle_localization_research_state(self, user_message: str) -> tuple[str, bool]:
         """Handle localization research state."""
-        from core.localization_research import LocalizationResearchEngine
+        from core.localization_research import LocalizationResearchEngine, ResearchSession
         
         # Get target country from collected data
         target_country = self.collected_data.get("target_country", "")
@@ -177,18 +297,14 @@ class ConversationManager:
         research_engine = LocalizationResearchEngine()
         
         try:
-            # Get localization guidance
-            guidance = research_engine.get_localized_document_guidance(
+            # Research once, then derive guidance and saved results from the same findings
+            research_session = ResearchSession(
+                research_engine,
                 self.current_document_type, 
                 target_country
             )
-            
-            # Save research results
-            research_results = research_engine.research_country_requirements(
-                self.current_document_type, 
-                target_country
-            )
-            research_engine.save_research_results(research_results)
+            guidance = research_session.get_guidance()
+            research_session.save()
             
             # Move to document generation with localization context
             self.state = ConversationState.DOCUMENT_GENERATION
@@ -206,49 +322,37 @@ class ConversationManager:
     def _handle_document_generation_state(self, user_message: str) -> tuple[str, bool]:
         """Handle document generation state."""
         # Generate the document
-        from core.document_gen import DocumentGenerator
+        from core.document_gen import get_document_generator
         
-        doc_generator = DocumentGenerator()
+        doc_generator = get_document_generator()
         generated_document = doc_generator.generate_document(
             self.current_document_type,
             self.collected_data,
             self.language
         )
         
-        response = f"✅ **Document Generation Complete!**\n\nHere's your generated {self._get_document_name(self.current_document_type)}:\n\n{generated_document}\n\n🎯 **Next Steps:**\nYou can now export this document as a PDF or DOCX file using the export options in the sidebar."
+        self.generated_document = generated_document
+        # The history holds a reference; the UI and exporters expand it when needed
+        response = f"✅ **Document Generation Complete!**\n\nHere's your generated {self._get_document_name(self.current_document_type)}:\n\n{self.generated_document_ref}\n\n🎯 **Next Steps:**\nYou can now export this document as a PDF or DOCX file using the export options in the sidebar."
         
         self.conversation_history.append({"role": "assistant", "content": response})
         self.state = ConversationState.COMPLETED
         
         return response, True
     
-    def _identify_document_type(self, user_message: str) -> Optional[str]:
-        """Identify document type from user message."""
-        user_message_lower = user_message.lower()
-        doc_types = get_all_document_types(self.language)
-        
-        # Create mapping of keywords to document types
-        keyword_mapping = {
-            "residential_lease": ["lease", "rent", "rental", "mietvertrag", "miete", "wohnung"],
-            "nda": ["nda", "non-disclosure", "confidentiality", "geheimhaltung", "vertraulich"],
-            "b2b_contract": ["b2b", "business", "contract", "service", "vertrag", "dienstleistung"],
-            "power_of_attorney": ["power of attorney", "vollmacht", "attorney", "authorization"],
-            "employment_contract": ["employment", "work", "job", "arbeitsvertrag", "arbeit"],
-            "meeting_minutes": ["minutes", "meeting", "resolution", "protokoll", "beschluss"]
-        }
-        
-        # Check for keyword matches
-        for doc_type, keywords in keyword_mapping.items():
-            if any(keyword in user_message_lower for keyword in keywords):
-                return doc_type
-        
-        # Check for exact document type names
-        for doc_type, doc_info in doc_types.items():
-            doc_name_lower = doc_info["name"].lower()
-            if doc_name_lower in user_message_lower:
-                return doc_type
+    def _identify_document_type(self, user_message: str, strict: bool = False) -> Optional[str]:
+        """
+        Identify document type from user message.
         
-        return None
+        Uses the local keyword classifier; returns None when its confidence is
+        not above the threshold so the caller can ask the LLM for clarification.
+        In strict mode the best match must also reach a minimum keyword weight
+        and lead the runner-up, so greetings with a generic word still reach the LLM.
+        """
+        classifier = get_document_classifier()
+        if strict:
+            return classifier.predict(user_message, DOC_CLASSIFIER_FAST_PATH_MIN_SCORE, DOC_CLASSIFIER_FAST_PATH_MIN_MARGIN)
+        return classifier.predict(user_message)
     
     def _get_document_name(self, doc_type: str) -> str:
         """Get document name in current language."""
@@ -258,11 +362,169 @@ class ConversationManager:
     def reset_conversation(self):
         """Reset conversation to initial state."""
         self.state = ConversationState.GREETING
-        self.conversation_history = []
+        self.conversation_history.clear()
         self.current_document_type = None
         self.collected_data = {}
         self.current_question_index = 0
         self.document_questions = []
+        self.generated_document_id = None
+        self.save_session()
+    
+    @property
+    def generated_document(self) -> Optional[str]:
+        """Text of the generated document, loaded from the document store."""
+        if self.generated_document_id is None:
+            return None
+        return get_document_store().get(self.generated_document_id)
+    
+    @generated_document.setter
+    def generated_document(self, text: Optional[str]):
+        self.generated_document_id = get_document_store().put(text) if text is not None else None
+    
+    @property
+    def generated_document_ref(self) -> Optional[str]:
+        """Reference to the generated document for use in messages, or None."""
+        if self.generated_document_id is None:
+            return None
+        return document_reference(self.generated_document_id)
+    
+    def to_snapshot(self, materialize: bool = True) -> Dict[str, Any]:
+        """
+        Capture the conversation state as a versioned, JSON-serializable dict.
+        
+        Document questions are not included; they are looked up again from
+        the document type on restore.
+        
+        Args:
+            materialize: Copy the history into a list; if False the snapshot
+                references the live history, so a session store can write
+                only the new messages without loading spilled ones
+        """
+        return {
+            "version": SNAPSHOT_VERSION,
+            "session_id": self.session_id,
+            "revision": self.revision,
+            "language": self.language,
+            "state": self.state.value,
+            "current_document_type": self.current_document_type,
+            "current_question_index": self.current_question_index,
+            "collected_data": dict(self.collected_data),
+            "generated_document_id": self.generated_document_id,
+            "conversation_history": list(self.conversation_history) if materialize else self.conversation_history
+        }
+    
+    @classmethod
+    def from_snapshot(cls,
+                      snapshot: Dict[str, Any],
+                      ai_engine: Optional[AIEngine] = None,
+                      session_store: Optional[SessionStore] = None) -> "ConversationManager":
+        """
+        Rebuild a conversation manager from a snapshot without any LLM calls.
+        
+        Args:
+            snapshot: Snapshot from to_snapshot(), or a partial one from
+                SessionStore.load(..., recent=n); the older messages of a
+                partial snapshot are paged in from session_store on demand
+            ai_engine: AI engine for the restored conversation
+            session_store: Store to keep saving the conversation to
+            
+        Returns:
+            Conversation manager positioned where the snapshot was taken
+        """
+        if snapshot.get("version") not in SUPPORTED_SNAPSHOT_VERSIONS:
+            raise ValueError(f"Unsupported conversation snapshot version: {snapshot.get('version')}")
+        
+        manager = cls(snapshot["language"], ai_engine, session_store, snapshot["session_id"])
+        manager.state = ConversationState(snapshot["state"])
+        manager.current_document_type = snapshot["current_document_type"]
+        manager.current_question_index = snapshot["current_question_index"]
+        manager.collected_data = dict(snapshot["collected_data"])
+        manager.generated_document_id = snapshot.get("generated_document_id")
+        if snapshot.get("generated_document"):
+            manager.generated_document = snapshot["generated_document"]
+        history = snapshot["conversation_history"]
+        length = snapshot.get("message_count", len(history))
+        if length > len(history):
+            if session_store is None:
+                raise ValueError("A partial conversation snapshot needs the session store it was loaded from")
+            session_id = snapshot["session_id"]
+            manager.conversation_history = ConversationHistory.from_pager(
+                history, length, lambda start, stop: session_store.load_messages(session_id, start, stop)
+            )
+        else:
+            manager.conversation_history = ConversationHistory(history)
+        manager.revision = snapshot.get("revision", 0)
+        if manager.current_document_type:
+            manager.document_questions = get_document_questions(manager.current_document_type, manager.language)
+        return manager
+    
+    @classmethod
+    def resume(cls,
+               session_id: str,
+               session_store: SessionStore,
+               ai_engine: Optional[AIEngine] = None) -> Optional["ConversationManager"]:
+        """
+        Restore a saved conversation, or None if the store has no such session.
+        
+        Only the recent messages are loaded; older ones are read from the
+        store when the history is paged back.
+        """
+        snapshot = session_store.load(session_id, recent=MAX_CONVERSATION_LENGTH)
+        if snapshot is None:
+            return None
+        return cls.from_snapshot(snapshot, ai_engine, session_store)
+    
+    @classmethod
+    def process_turn(cls,
+                     session_id: str,
+                     user_message: str,
+                     session_store: SessionStore,
+                     ai_engine: Optional[AIEngine] = None,
+                     language: str = "EN",
+                     max_attempts: int = 3) -> tuple[str, bool]:
+        """
+        Serve one turn of a stored conversation on any worker.
+        
+        Loads the session (starting it if it does not exist), processes the
+        message and writes the session back. If another worker saved the
+        session in the meantime, the turn is replayed on the newer state.
+        
+        Args:
+            session_id: Conversation to continue
+            user_message: User's message
+            session_store: Store shared by all workers
+            ai_engine: AI engine to use
+            language: Language for a new conversation
+            max_attempts: Attempts before the conflict is raised
+            
+        Returns:
+            Tuple of (AI response, is_conversation_complete)
+        """
+        for attempt in range(max_attempts):
+            manager = cls.resume(session_id, session_store, ai_engine)
+            if manager is None:
+                manager = cls(language, ai_engine, session_store, session_id)
+            try:
+                return manager.process_user_message(user_message)
+            except SessionConflictError:
+                if attempt == max_attempts - 1:
+                    raise
+    
+    def save_session(self):
+        """
+        Save the conversation to the session store, if one is configured.
+        
+        Raises:
+            SessionConflictError: If another worker saved the session since it was loaded
+        """
+        if self.session_store is None:
+            return
+        try:
+            self.revision = self.session_store.save(self.to_snapshot(materialize=False))
+        except SessionConflictError:
+            raise
+        except Exception as e:
+            print(f"Session save error: {e}")
     
     def get_current_state(self) -> ConversationState:
         """Get current conversation state."""
@@ -0,0 +1,229 @@
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from config.settings import DOCUMENT_TYPES, DOC_CLASSIFIER_THRESHOLD
+
+# Weighted keywords per document type, covering every supported language.
+# Multi-word phrases match whole-word sequences; a trailing "*" matches any
+# word starting with that prefix (for inflections and German compounds).
+DOCUMENT_KEYWORDS = {
+    "residential_lease": {
+        "EN": {"lease": 2, "leasing": 2, "rent": 2, "rental": 2, "rental agreement": 3, "lease agreement": 3,
+               "tenancy": 3, "landlord": 2, "tenant": 2, "apartment": 1, "flat": 1},
+        "DE": {"mietvertr*": 3, "miete": 2, "mieter": 2, "vermieter": 2, "mietwohnung": 3, "wohnung": 1},
+        "ES": {"arrendamiento": 3, "alquiler": 3, "contrato de alquiler": 3, "inquilino": 2, "arrendador": 2,
+               "vivienda": 1, "piso": 1},
+        "PT": {"arrendamento": 3, "aluguel": 3, "aluguer": 3, "locação": 3, "inquilino": 2, "senhorio": 2,
+               "locatário": 2},
+        "PL": {"najm*": 3, "najem": 3, "umowa najmu": 3, "wynaj*": 3, "najemca": 2, "mieszkanie": 1},
+        "UK": {"оренд*": 3, "договір оренди": 3, "орендар*": 2, "квартир*": 1},
+        "AR": {"إيجار": 3, "عقد إيجار": 3, "مستأجر": 2, "مؤجر": 2, "شقة": 1},
+        "TR": {"kira*": 3, "kira sözleşmesi": 3, "kiracı": 2, "ev sahibi": 2, "daire": 1}
+    },
+    "nda": {
+        "EN": {"nda": 3, "non disclosure": 3, "nondisclosure": 3, "confidentiality": 3, "confidential": 2,
+               "secrecy": 2},
+        "DE": {"geheimhalt*": 3, "verschwiegenheit*": 3, "vertraulich*": 2},
+        "ES": {"confidencialidad": 3, "acuerdo de confidencialidad": 3, "confidencial": 2},
+        "PT": {"confidencialidade": 3, "sigilo": 3, "confidencial": 2},
+        "PL": {"poufn*": 3, "umowa o zachowaniu poufności": 3},
+        "UK": {"нерозголош*": 3, "конфіденційн*": 3},
+        "AR": {"سرية": 3, "عدم الإفصاح": 3},
+        "TR": {"gizlilik": 3, "gizlilik sözleşmesi": 3}
+    },
+    "b2b_contract": {
+        "EN": {"b2b": 3, "business contract": 3, "business to business": 3, "service agreement": 3,
+               "services agreement": 3, "service contract": 3, "business": 1, "service": 1, "services": 1,
+               "contract": 1, "partnership": 2, "supplier": 2, "vendor": 2},
+        "DE": {"dienstleist*": 2, "dienstvertrag": 3, "vertrag": 1, "lieferant*": 2, "geschäft*": 1},
+        "ES": {"contrato de servicios": 3, "servicios": 1, "proveedor": 2, "contrato": 1, "empresa": 1},
+        "PT": {"prestação de serviços": 3, "serviços": 1, "fornecedor": 2, "contrato": 1, "empresa": 1},
+        "PL": {"umowa o świadczenie usług": 3, "usług*": 1, "dostawc*": 2, "umow*": 1},
+        "UK": {"договір про надання послуг": 3, "послуг*": 1, "постачальник*": 2, "договір": 1},
+        "AR": {"عقد خدمات": 3, "خدمات": 1, "مورد": 2, "عقد": 1},
+        "TR": {"hizmet sözleşmesi": 3, "hizmet": 1, "tedarikçi": 2, "sözleşme*": 1}
+    },
+    "power_of_attorney": {
+        "EN": {"power of attorney": 4, "attorney": 2, "authorization": 2, "authorisation": 2, "proxy": 2},
+        "DE": {"vollmacht*": 4, "bevollmächtig*": 3},
+        "ES": {"poder notarial": 4, "apoderado": 3, "poder": 1},
+        "PT": {"procuração": 4, "procurador": 3},
+        "PL": {"pełnomocnictw*": 4, "pełnomocnik*": 3},
+        "UK": {"довірен*": 4},
+        "AR": {"توكيل": 4, "وكالة": 3},
+        "TR": {"vekaletname": 4, "vekalet": 3}
+    },
+    "employment_contract": {
+        "EN": {"employment": 3, "employment contract": 4, "employment agreement": 4, "employee": 2,
+               "employer": 2, "job": 2, "work": 1, "hire": 2, "hiring": 2, "salary": 2},
+        "DE": {"arbeitsvertr*": 4, "arbeit*": 2, "arbeitnehmer": 3, "arbeitgeber": 3, "anstellung*": 3,
+               "gehalt": 2},
+        "ES": {"contrato de trabajo": 4, "contrato laboral": 4, "empleo": 3, "trabajo": 2, "empleado": 2,
+               "empleador": 2, "salario": 2},
+        "PT": {"contrato de trabalho": 4, "emprego": 3, "trabalho": 2, "empregado": 2, "empregador": 2,
+               "salário": 2},
+        "PL": {"umowa o pracę": 4, "prac*": 2, "wynagrodzeni*": 2},
+        "UK": {"трудовий договір": 4, "трудов*": 3, "робот*": 2, "працівник*": 2, "роботодав*": 3},
+        "AR": {"عقد عمل": 4, "توظيف": 3, "عمل": 2, "موظف": 2, "راتب": 2},
+        "TR": {"iş sözleşmesi": 4, "iş": 2, "işçi": 2, "işveren": 3, "maaş": 2, "istihdam": 3}
+    },
+    "meeting_minutes": {
+        "EN": {"minutes": 3, "meeting minutes": 4, "meeting": 2, "resolution": 3, "resolutions": 3,
+               "board": 1, "shareholders": 1, "agm": 3},
+        "DE": {"protokoll*": 3, "beschl*": 3, "sitzung*": 2, "versammlung*": 2},
+        "ES": {"acta": 3, "actas": 3, "reunión": 2, "resolución": 2, "junta": 2},
+        "PT": {"ata": 3, "atas": 3, "reunião": 2, "deliberação": 3, "assembleia": 2},
+        "PL": {"protok*": 3, "uchwał*": 3, "zebrani*": 2, "posiedzeni*": 2},
+        "UK": {"протокол*": 3, "рішення": 2, "засідання": 2, "збори": 2},
+        "AR": {"محضر": 3, "اجتماع": 2, "قرار": 2},
+        "TR": {"tutanak": 3, "toplantı": 2, "karar": 2}
+    }
+}
+
+# Weight of a document type's full name appearing in the message
+DOCUMENT_NAME_WEIGHT = 4
+
+TOKEN_PATTERN = re.compile(r"\w+")
+ARABIC_ARTICLE = "ال"
+
+def normalize_text(text: str) -> str:
+    """Normalize Unicode form and case, dropping the combining dot left by Turkish 'İ'."""
+    return unicodedata.normalize("NFKC", text).casefold().replace("̇", "")
+
+def tokenize(text: str) -> List[str]:
+    """Split normalized text into word tokens."""
+    tokens = TOKEN_PATTERN.findall(normalize_text(text))
+    # Arabic attaches the definite article to the noun
+    return [t[len(ARABIC_ARTICLE):] if t.startswith(ARABIC_ARTICLE) and len(t) > 4 else t for t in tokens]
+
+class DocumentTypeClassifier:
+    """
+    Scores a message against every document type using weighted keyword features.
+
+    Keywords are compiled once into a feature vocabulary of whole-word n-grams
+    and word prefixes with a NumPy weight matrix, so classifying a message is
+    a few dictionary lookups and one vector sum.
+    """
+
+    def __init__(self,
+                 keywords: Optional[Dict[str, Dict[str, Dict[str, float]]]] = None,
+                 threshold: float = DOC_CLASSIFIER_THRESHOLD):
+        """
+        Initialize and compile the classifier.
+
+        Args:
+            keywords: Mapping of document type to language to {keyword: weight}
+            threshold: Confidence a classification must exceed to be accepted
+        """
+        keywords = keywords or DOCUMENT_KEYWORDS
+        self.threshold = threshold
+        self.labels: List[str] = list(keywords)
+        self._phrases: Dict[Tuple[str, ...], int] = {}
+        self._prefixes: Dict[str, int] = {}
+        rows: List[np.ndarray] = []
+
+        def add_feature(keyword: str, label_index: int, weight: float):
+            if keyword.endswith("*"):
+                key = tokenize(keyword[:-1])[0]
+                table = self._prefixes
+            else:
+                key = tuple(tokenize(keyword))
+                table = self._phrases
+            if key not in table:
+                table[key] = len(rows)
+                rows.append(np.zeros(len(self.labels)))
+            row = rows[table[key]]
+            row[label_index] = max(row[label_index], weight)
+
+        for label_index, label in enumerate(self.labels):
+            for language_keywords in keywords[label].values():
+                for keyword, weight in language_keywords.items():
+                    add_feature(keyword, label_index, weight)
+            name = DOCUMENT_TYPES.get(label, {}).get("name")
+            if name:
+                add_feature(name, label_index, DOCUMENT_NAME_WEIGHT)
+
+        self.weights = np.vstack(rows) if rows else np.zeros((0, len(self.labels)))
+        self.max_ngram = max((len(p) for p in self._phrases), default=1)
+        self._prefix_lengths = sorted({len(p) for p in self._prefixes})
+
+    def _features(self, tokens: List[str]) -> List[int]:
+        """Get the indices of all features present in a token sequence."""
+        found = set()
+        for i, token in enumerate(tokens):
+            for n in range(1, self.max_ngram + 1):
+                if i + n > len(tokens):
+                    break
+                index = self._phrases.get(tuple(tokens[i:i + n]))
+                if index is not None:
+                    found.add(index)
+            for length in self._prefix_lengths:
+                if length > len(token):
+                    break
+                index = self._prefixes.get(token[:length])
+                if index is not None:
+                    found.add(index)
+        return sorted(found)
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Get the raw score of every document type for a message."""
+        features = self._features(tokenize(text))
+        totals = self.weights[features].sum(axis=0) if features else np.zeros(len(self.labels))
+        return dict(zip(self.labels, totals.tolist()))
+
+    def _totals(self, text: str) -> Optional[np.ndarray]:
+        """Get the summed feature weights per document type, or None if no feature matched."""
+        features = self._features(tokenize(text))
+        return self.weights[features].sum(axis=0) if features else None
+
+    def classify(self, text: str) -> Tuple[Optional[str], float]:
+        """
+        Classify a message.
+
+        Confidence is the best score's share of all scores plus one unit of
+        "no document" mass. A single weight-1 keyword therefore scores exactly
+        0.5, which predict() rejects at the default threshold.
+
+        Returns:
+            Tuple of (document type or None, confidence in [0, 1])
+        """
+        totals = self._totals(text)
+        if totals is None:
+            return None, 0.0
+
+        best = int(np.argmax(totals))
+        confidence = float(totals[best] / (totals.sum() + 1.0))
+        return self.labels[best], confidence
+
+    def predict(self, text: str, min_score: float = 0.0, min_margin: float = 0.0) -> Optional[str]:
+        """
+        Get the document type if the classification exceeds the confidence threshold.
+
+        Args:
+            text: Message to classify
+            min_score: Minimum raw score of the best document type
+            min_margin: Minimum lead of the best score over the runner-up
+
+        Returns:
+            Document type, or None if the classification is not confident enough
+        """
+        totals = self._totals(text)
+        if totals is None:
+            return None
+
+        best = int(np.argmax(totals))
+        runner_up = float(np.partition(totals, -2)[-2]) if len(totals) > 1 else 0.0
+        confidence = float(totals[best] / (totals.sum() + 1.0))
+        if confidence <= self.threshold or totals[best] < min_score or totals[best] - runner_up < min_margin:
+            return None
+        return self.labels[best]
+
+_classifier: Optional[DocumentTypeClassifier] = None
+
+def get_document_classifier() -> DocumentTypeClassifier:
+    """Get the process-wide document type classifier, compiling it on first use."""
+    global _classifier
+    if _classifier is None:
+        _classifier = DocumentTypeClassifier()
+    return _classifier
@@ -1,31 +1,129 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, Tuple, Iterable, Iterator
 from jinja2 import Environment, FileSystemLoader, Template
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import os
+import threading
+from core.metrics import metrics, span
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), '..', 'templates', 'document_templates')
+
+class TemplateNotFoundError(LookupError):
+    """Raised when no template exists for a document type."""
+
+class TemplateCache:
+    """
+    Process-wide cache of compiled document templates.
+    
+    Templates are compiled once per (document_type, language) and shared by
+    every DocumentGenerator. A template loaded from TEMPLATE_DIR is recompiled
+    only when its file's mtime or size changes; built-in templates are
+    compiled once for the lifetime of the process.
+    """
+    
+    def __init__(self, template_dir: str = TEMPLATE_DIR):
+        """Initialize the cache with a shared Jinja2 environment."""
+        self.template_dir = template_dir
+        # The loader resolves {% include %} and {% extends %} against the template directory
+        self.env = Environment(loader=FileSystemLoader(template_dir))
+        self._compiled: Dict[Tuple[str, str], Tuple[Optional[Tuple[int, int]], Template]] = {}
+        self._lock = threading.Lock()
+    
+    def _template_path(self, document_type: str, language: str) -> str:
+        """Get the template file path for a document type and language."""
+        return os.path.join(self.template_dir, f"{document_type}_{language.lower()}.j2")
+    
+    def get(self, document_type: str, language: str, fallback: Callable[[], str]) -> Optional[Template]:
+        """
+        Get a compiled template, compiling it only if it is missing or stale.
+        
+        Args:
+            document_type: Type of document
+            language: Template language
+            fallback: Returns the built-in template source if no template file exists
+            
+        Returns:
+            Compiled template or None if neither a file nor a built-in template exists
+        """
+        key = (document_type, language)
+        path = self._template_path(document_type, language)
+        try:
+            stat = os.stat(path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None
+        
+        cached = self._compiled.get(key)
+        if cached and cached[0] == signature:
+            metrics.inc("template_cache_requests_total", result="hit")
+            return cached[1]
+        
+        metrics.inc("template_cache_requests_total", result="miss")
+        with self._lock, span("template_load", document_type=document_type):
+            cached = self._compiled.get(key)
+            if cached and cached[0] == signature:
+                return cached[1]
+            
+            if signature is not None:
+                with open(path, 'r', encoding='utf-8') as f:
+                    source = f.read()
+            else:
+                source = fallback()
+                if not source:
+                    return None
+            
+            template = self.env.from_string(source)
+            self._compiled[key] = (signature, template)
+            return template
+    
+    def warm(self, generator: "DocumentGenerator", language: str = "EN"):
+        """Precompile the templates of every document type the generator knows."""
+        for document_type in generator.templates:
+            generator.get_template(document_type, language)
+    
+    def clear(self):
+        """Drop all compiled templates."""
+        with self._lock:
+            self._compiled.clear()
+
+template_cache = TemplateCache()
 
 class DocumentGenerator:
     """Generates legal documents using templates and collected data."""
     
+    _builtin_templates: Optional[Dict[str, Dict[str, str]]] = None
+    
     def __init__(self):
-        """Initialize document generator with template environment."""
-        # Set up Jinja2 environment
-        template_dir = os.path.join(os.path.dirname(__file__), '..', 'templates', 'document_templates')
-        self.env = Environment(loader=FileSystemLoader(template_dir))
+        """Initialize document generator with the shared template cache."""
+        self.template_cache = template_cache
+        self.env = template_cache.env
         
-        # Document templates (fallback if files don't exist)
-        self.templates = {
-            "residential_lease": {
-                "EN": self._get_residential_lease_template_en(),
-                "DE": self._get_residential_lease_template_de()
-            },
-            "nda": {
-                "EN": self._get_nda_template_en(),
-                "DE": self._get_nda_template_de()
-            },
-            "b2b_contract": {
-                "EN": self._get_b2b_contract_template_en(),
-                "DE": self._get_b2b_contract_template_de()
+        # Document templates (fallback if files don't exist), built once per process
+        if DocumentGenerator._builtin_templates is None:
+            DocumentGenerator._builtin_templates = {
+                "residential_lease": {
+                    "EN": self._get_residential_lease_template_en(),
+                    "DE": self._get_residential_lease_template_de()
+                },
+                "nda": {
+                    "EN": self._get_nda_template_en(),
+                    "DE": self._get_nda_template_de()
+                },
+                "b2b_contract": {
+                    "EN": self._get_b2b_contract_template_en(),
+                    "DE": self._get_b2b_contract_template_de()
+                }
             }
-        }
+        self.templates = DocumentGenerator._builtin_templates
+    
+    def get_template(self, document_type: str, language: str = "EN") -> Optional[Template]:
+        """Get the compiled template for a document type, or None if there is none."""
+        return self.template_cache.get(
+            document_type,
+            language,
+            lambda: self.templates.get(document_type, {}).get(language, "")
+        )
     
     def generate_document(self, document_type: str, data: Dict[str, Any], language: str = "EN") -> str:
         """
@@ -40,41 +138,120 @@ class DocumentGenerator:
             Generated document as string
         """
         try:
-            # Check if localization is needed
-            target_country = data.get("target_country", "").lower()
+            return self.render_document(document_type, data, language)
+        except TemplateNotFoundError as e:
+            return str(e)
+        except Exception as e:
+            return f"Error generating document: {str(e)}"
+    
+    def render_document(self, document_type: str, data: Dict[str, Any], language: str = "EN") -> str:
+        """
+        Render a document, raising on failure instead of returning an error message.
+        
+        Args:
+            document_type: Type of document to generate
+            data: Collected data for document generation
+            language: Language for document (EN or DE)
             
-            if target_country and target_country not in ["united states", "us", "usa", "america"]:
-                # Load localization research if available
-                localization_context = self._load_localization_context(document_type, target_country)
-                if localization_context:
-                    # Enhance data with localization insights
-                    data["localization_context"] = localization_context
-                    data["target_country"] = target_country.title()
+        Returns:
+            Generated document as string
+        """
+        # Check if localization is needed
+        target_country = data.get("target_country", "").lower()
+        
+        if target_country and target_country not in ["united states", "us", "usa", "america"]:
+            # Load localization research if available
+            localization_context = self._load_localization_context(document_type, target_country)
+            if localization_context:
+                # Enhance data with localization insights
+                data["localization_context"] = localization_context
+                data["target_country"] = target_country.title()
+        
+        # Always use English template for consistency (localization handled in content)
+        template = self.get_template(document_type, "EN")
+        if template is None:
+            raise TemplateNotFoundError(f"Template not found for document type: {document_type}")
+        
+        # Process data for template
+        processed_data = self._process_data_for_template(data, document_type, language)
+        
+        # Generate document
+        with span("document_render", document_type=document_type):
+            return template.render(**processed_data)
+    
+    def generate_many(self,
+                      records: Iterable[Dict[str, Any]],
+                      document_type: str,
+                      language: str = "EN",
+                      max_workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Validate and render many documents of one type.
+        
+        Records are consumed lazily and rendered on a process pool with a bounded
+        number of records in flight. Invalid or failing records are reported
+        individually and never abort the batch.
+        
+        Args:
+            records: Answers keyed by the field ids in DOCUMENT_QUESTIONS
+            document_type: Type of document to generate
+            language: Language for document and validation messages
+            max_workers: Worker processes; 0 renders in the calling process
             
-            # Always use English template for consistency (localization handled in content)
+        Returns:
+            Iterator of results in input order, each a dict with
+            index, record, document (None on failure) and errors
+        """
+        from data.document_types import get_document_questions
+        from core.validation import validate_record
+        
+        questions = get_document_questions(document_type, language)
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        
+        executor = ProcessPoolExecutor(max_workers=max_workers) if max_workers > 0 else None
+        pending = deque()
+        window = max(1, max_workers) * 4
+        
+        def submit(record: Dict[str, Any]) -> Future:
+            nonlocal executor
             try:
-                template_file = f"{document_type}_en.j2"
-                template = self.env.get_template(template_file)
-            except:
-                # Fallback to built-in template
-                template_content = self.templates.get(document_type, {}).get("EN", "")
-                if not template_content:
-                    return f"Template not found for document type: {document_type}"
+                return executor.submit(_render_record, document_type, dict(record), language)
+            except BrokenProcessPool:
+                # A worker died (e.g. killed for memory); records already in flight fail, later ones get a new pool
+                executor.shutdown(wait=False, cancel_futures=True)
+                executor = ProcessPoolExecutor(max_workers=max_workers)
+                return executor.submit(_render_record, document_type, dict(record), language)
+        
+        def collect(item) -> Dict[str, Any]:
+            index, record, outcome, errors = item
+            if not errors:
+                try:
+                    document, error = outcome.result() if isinstance(outcome, Future) else outcome
+                except BrokenProcessPool as e:
+                    document, error = None, f"Worker process failed: {e}"
+                errors = [error] if error else []
+            else:
+                document = None
+            return {"index": index, "record": record, "document": document, "errors": errors}
+        
+        try:
+            for index, record in enumerate(records):
+                errors = validate_record(record, questions, language)
+                if errors:
+                    pending.append((index, record, None, errors))
+                elif executor:
+                    pending.append((index, record, submit(record), None))
+                else:
+                    pending.append((index, record, _render_record(document_type, dict(record), language), None))
                 
-                template = Template(template_content)
-            
-            # Process data for template
-            processed_data = self._process_data_for_template(data, document_type, language)
+                while len(pending) >= window:
+                    yield collect(pending.popleft())
             
-            # Generate document
-            try:
-                document = template.render(**processed_data)
-                return document
-            except Exception as e:
-                return f"Error generating document: {str(e)}"
-                
-        except Exception as e:
-            return f"Error generating document: {str(e)}"
+            while pending:
+                yield collect(pending.popleft())
+        finally:
+            if executor:
+                executor.shutdown(wait=True, cancel_futures=True)
     
     def _process_data_for_template(self, data: Dict[str, Any], document_type: str, language: str) -> Dict[str, Any]:
         """Process and format data for template rendering."""
@@ -107,20 +284,12 @@ class DocumentGenerator:
     def _load_localization_context(self, document_type: str, country: str) -> Optional[Dict]:
         """Load localization research context for document generation."""
         try:
-            import glob
-            import json
+            from core.research_store import get_research_store
             
-            # Look for research files
-            pattern = f"research_data/localization_research_{document_type}_{country}_*.json"
-            files = glob.glob(pattern)
+            # Latest research for this document type and country, regardless of age
+            research_data = get_research_store().get(document_type, country)
             
-            if files:
-                # Get the most recent file
-                latest_file = max(files, key=lambda x: os.path.getctime(x))
-                
-                with open(latest_file, 'r', encoding='utf-8') as f:
-                    research_data = json.load(f)
-                
+            if research_data:
                 return {
                     "legal_requirements": research_data.get("legal_requirements", []),
                     "template_structure": research_data.get("template_structure", []),
@@ -423,3 +592,22 @@ Kunde: ___________________________ Datum: ________________
 
 Dienstleister: ___________________________ Datum: ________________
 """
+
+
+_document_generator: Optional[DocumentGenerator] = None
+
+def get_document_generator() -> DocumentGenerator:
+    """Get the process-wide DocumentGenerator, creating and warming it on first use."""
+    global _document_generator
+    if _document_generator is None:
+        generator = DocumentGenerator()
+        template_cache.warm(generator)
+        _document_generator = generator
+    return _document_generator
+
+def _render_record(document_type: str, record: Dict[str, Any], language: str) -> Tuple[Optional[str], Optional[str]]:
+    """Render one batch record, returning (document, error). Runs in pool workers."""
+    try:
+        return get_document_generator().render_document(document_type, record, language), None
+    except Exception as e:
+        return None, f"Error generating document: {str(e)}"
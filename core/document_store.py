@@ -0,0 +1,158 @@
+import gzip
+import hashlib
+import os
+import re
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional
+from config.settings import DOCUMENT_STORE_CACHE_SIZE, DOCUMENT_STORE_DIR
+
+# Placeholder for a stored document inside chat messages and exporter input
+DOCUMENT_REFERENCE_PATTERN = re.compile(r"\[\[document:([0-9a-f]{64})\]\]")
+
+class DocumentStore:
+    """
+    Content-addressed store for generated documents.
+
+    Documents are gzip files named by the SHA-256 of their text, so storing
+    the same document twice is free and a reference can never point at
+    changed content. A small LRU of decoded documents is shared by every
+    session in the process.
+    """
+
+    def __init__(self, directory: str = DOCUMENT_STORE_DIR, cache_size: int = DOCUMENT_STORE_CACHE_SIZE):
+        """
+        Initialize the document store.
+
+        Args:
+            directory: Directory holding the documents
+            cache_size: Number of decoded documents kept in memory
+        """
+        self.directory = directory
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, document_id: str) -> str:
+        return os.path.join(self.directory, document_id[:2], f"{document_id}.txt.gz")
+
+    def _remember(self, document_id: str, text: str):
+        with self._lock:
+            self._cache[document_id] = text
+            self._cache.move_to_end(document_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def put(self, text: str) -> str:
+        """
+        Store a document.
+
+        Returns:
+            The document id (hex SHA-256 of the text)
+        """
+        document_id = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        path = self._path(document_id)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file first so readers never see a partial document
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(gzip.compress(text.encode("utf-8")))
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        self._remember(document_id, text)
+        return document_id
+
+    def get(self, document_id: str) -> Optional[str]:
+        """Load a document, or None if it is not stored."""
+        with self._lock:
+            text = self._cache.get(document_id)
+            if text is not None:
+                self._cache.move_to_end(document_id)
+                return text
+        try:
+            with open(self._path(document_id), "rb") as f:
+                text = gzip.decompress(f.read()).decode("utf-8")
+        except FileNotFoundError:
+            return None
+        self._remember(document_id, text)
+        return text
+
+    def cached_bytes(self, document_id: str) -> int:
+        """Approximate memory held by a document in the in-process cache, 0 if not cached."""
+        text = self._cache.get(document_id)
+        return sys.getsizeof(text) if text is not None else 0
+
+    def exists(self, document_id: str) -> bool:
+        """Check whether a document is stored."""
+        return document_id in self._cache or os.path.exists(self._path(document_id))
+
+    def delete(self, document_id: str):
+        """Remove a document."""
+        with self._lock:
+            self._cache.pop(document_id, None)
+        try:
+            os.remove(self._path(document_id))
+        except FileNotFoundError:
+            pass
+
+_document_store: Optional[DocumentStore] = None
+_document_store_lock = threading.Lock()
+
+def get_document_store() -> DocumentStore:
+    """Get the process-wide document store, creating it on first use."""
+    global _document_store
+    if _document_store is None:
+        with _document_store_lock:
+            if _document_store is None:
+                _document_store = DocumentStore()
+    return _document_store
+
+def set_document_store(store: Optional[DocumentStore]) -> Optional[DocumentStore]:
+    """
+    Replace the process-wide document store, e.g. to keep a load test's documents in a temporary directory.
+
+    Returns:
+        The previous store, to restore afterwards
+    """
+    global _document_store
+    with _document_store_lock:
+        previous, _document_store = _document_store, store
+    return previous
+
+def document_reference(document_id: str) -> str:
+    """Get the placeholder that stands for a stored document in text."""
+    return f"[[document:{document_id}]]"
+
+def has_document_references(text: str) -> bool:
+    """Check whether text contains document references."""
+    return "[[document:" in text and DOCUMENT_REFERENCE_PATTERN.search(text) is not None
+
+def expand_document_references(text: str, store: Optional[DocumentStore] = None) -> str:
+    """
+    Replace document references with the documents' text, e.g. for display or export.
+
+    References to documents that are no longer stored are left as they are.
+    """
+    if not has_document_references(text):
+        return text
+    store = store or get_document_store()
+
+    def expand(match: re.Match) -> str:
+        document = store.get(match.group(1))
+        return document if document is not None else match.group(0)
+
+    return DOCUMENT_REFERENCE_PATTERN.sub(expand, text)
+
+def abbreviate_document_references(text: str) -> str:
+    """Replace document references with a short note, e.g. for prompts, without loading them."""
+    if not has_document_references(text):
+        return text
+    return DOCUMENT_REFERENCE_PATTERN.sub("[generated document omitted; it is shown to the user]", text)
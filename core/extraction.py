@@ -0,0 +1,102 @@
+import re
+from typing import Dict, Iterable, List, Optional
+
+# Indicator phrases for each research category, in priority order
+EXTRACTION_INDICATORS = {
+    "legal_requirements": [
+        'required', 'mandatory', 'must include', 'shall contain',
+        'legal requirement', 'obligatory', 'essential', 'necessary'
+    ],
+    "template_structure": [
+        'section', 'clause', 'paragraph', 'article', 'part',
+        'structure', 'format', 'template', 'outline', 'layout'
+    ],
+    "key_clauses": [
+        'clause', 'provision', 'term', 'condition', 'stipulation',
+        'agreement', 'obligation', 'right', 'duty', 'liability'
+    ],
+    "compliance_notes": [
+        'compliance', 'regulation', 'law', 'statute', 'code',
+        'legal standard', 'regulatory', 'statutory', 'legislation'
+    ]
+}
+
+SENTENCE_SPLIT = re.compile(r'[.!?]')
+MIN_SENTENCE_LENGTH = 20
+MAX_ITEMS_PER_CATEGORY = 10
+
+class SentenceExtractor:
+    """
+    Extracts indicator sentences for all research categories in one pass.
+
+    Each result body is split into sentences and lowercased once, and a single
+    precompiled alternation over every indicator finds the indicators in each
+    sentence. For every result, each indicator contributes the first
+    qualifying sentence that contains it, as the per-indicator scans did.
+
+    Indicators contained in a longer one (e.g. "fee" in "fees due") are
+    implied by its match. Matches do not overlap, so when two indicators
+    share letters inside one word (e.g. "part" and "article" in "particle")
+    only the leftmost is found.
+    """
+
+    def __init__(self, indicators: Optional[Dict[str, List[str]]] = None):
+        """
+        Initialize the extractor.
+
+        Args:
+            indicators: Mapping of category to indicator phrases in priority order
+        """
+        self.indicators = indicators or EXTRACTION_INDICATORS
+        unique = list(dict.fromkeys(ind for inds in self.indicators.values() for ind in inds))
+        # Longest first so an indicator is never shadowed by a shorter prefix
+        self._pattern = re.compile("|".join(re.escape(ind) for ind in sorted(unique, key=len, reverse=True)))
+        # Each indicator with the shorter indicators it contains
+        self._implied = {ind: [ind] + [other for other in unique if other != ind and other in ind] for ind in unique}
+
+    def extract(self, search_results: List[Dict], categories: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+        """
+        Extract sentences for the requested categories.
+
+        Args:
+            search_results: Search results with a 'body' field
+            categories: Categories to extract, defaults to all
+
+        Returns:
+            Mapping of category to deduplicated sentences, in first-seen order
+        """
+        categories = list(categories) if categories is not None else list(self.indicators)
+        collected: Dict[str, Dict[str, None]] = {category: {} for category in categories}
+
+        for result in search_results:
+            first_sentence = self._first_sentences(result.get('body', ''))
+            if not first_sentence:
+                continue
+
+            for category in categories:
+                bucket = collected[category]
+                for indicator in self.indicators[category]:
+                    sentence = first_sentence.get(indicator)
+                    if sentence is not None:
+                        bucket.setdefault(sentence, None)
+
+        return {category: list(bucket)[:MAX_ITEMS_PER_CATEGORY] for category, bucket in collected.items()}
+
+    def _first_sentences(self, body: str) -> Dict[str, str]:
+        """Map each indicator in a body to the first qualifying sentence containing it."""
+        first_sentence: Dict[str, str] = {}
+        if not body:
+            return first_sentence
+
+        for sentence in SENTENCE_SPLIT.split(body):
+            stripped = sentence.strip()
+            if len(stripped) <= MIN_SENTENCE_LENGTH:
+                continue
+            for match in self._pattern.findall(sentence.lower()):
+                for indicator in self._implied[match]:
+                    if indicator not in first_sentence:
+                        first_sentence[indicator] = stripped
+
+        return first_sentence
+
+default_extractor = SentenceExtractor()
@@ -0,0 +1,339 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import uuid
+import weakref
+import zlib
+from collections import deque
+from collections.abc import Sequence
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from config.settings import HISTORY_INLINE_MAX_CHARS, HISTORY_SPILL_PATH, MAX_CONVERSATION_LENGTH
+
+Message = Dict[str, str]
+
+# Loads messages [start, stop) from where a rehydrated history's older messages are kept
+MessagePager = Callable[[int, int], List[Message]]
+
+# Rough fixed cost of one resident message: its dict and ring entry
+MESSAGE_OVERHEAD_BYTES = sys.getsizeof({"role": "", "content": ""}) + 64
+
+def message_bytes(message: Optional[Message]) -> int:
+    """Approximate memory held by a resident message."""
+    if message is None:
+        return MESSAGE_OVERHEAD_BYTES
+    return MESSAGE_OVERHEAD_BYTES + sys.getsizeof(message["content"])
+
+class HistorySpillStore:
+    """
+    Compressed on-disk store for messages evicted from a ConversationHistory.
+
+    Messages are zlib-compressed JSON rows keyed by (history_id, seq) in a
+    SQLite database, so a single message or a page of them is one indexed
+    read.
+    """
+
+    def __init__(self, db_path: str = HISTORY_SPILL_PATH):
+        """
+        Initialize the spill store.
+
+        Args:
+            db_path: SQLite database file
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS spilled_messages (
+                    history_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    payload BLOB NOT NULL,
+                    PRIMARY KEY (history_id, seq)
+                ) WITHOUT ROWID
+            """)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection to the spill database, committing and closing it on exit."""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _encode(message: Message) -> bytes:
+        return zlib.compress(json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+    @staticmethod
+    def _decode(payload: bytes) -> Message:
+        return json.loads(zlib.decompress(payload).decode("utf-8"))
+
+    def put(self, history_id: str, messages: List[Tuple[int, Message]]):
+        """Store messages by sequence number, replacing any stored under the same number."""
+        if not messages:
+            return
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO spilled_messages (history_id, seq, payload) VALUES (?, ?, ?)",
+                [(history_id, seq, self._encode(message)) for seq, message in messages]
+            )
+
+    def get_range(self, history_id: str, start: int, stop: int) -> Dict[int, Message]:
+        """Load the stored messages with start <= seq < stop."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT seq, payload FROM spilled_messages WHERE history_id = ? AND seq >= ? AND seq < ?",
+                (history_id, start, stop)
+            ).fetchall()
+        return {seq: self._decode(payload) for seq, payload in rows}
+
+    def delete(self, history_id: str):
+        """Remove every message stored for a history."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM spilled_messages WHERE history_id = ?", (history_id,))
+
+_spill_store: Optional[HistorySpillStore] = None
+_spill_store_lock = threading.Lock()
+
+def get_history_spill_store() -> HistorySpillStore:
+    """Get the process-wide spill store, creating it on first use."""
+    global _spill_store
+    if _spill_store is None:
+        with _spill_store_lock:
+            if _spill_store is None:
+                _spill_store = HistorySpillStore()
+    return _spill_store
+
+def set_history_spill_store(store: Optional[HistorySpillStore]) -> Optional[HistorySpillStore]:
+    """
+    Replace the process-wide spill store.
+
+    Returns:
+        The previous store, to restore afterwards
+    """
+    global _spill_store
+    with _spill_store_lock:
+        previous, _spill_store = _spill_store, store
+    return previous
+
+def _discard_spilled(store: HistorySpillStore, history_id: str):
+    """Drop a history's spilled messages once the history is garbage collected."""
+    try:
+        store.delete(history_id)
+    except Exception as e:
+        print(f"History spill cleanup error: {e}")
+
+class ConversationHistory(Sequence):
+    """
+    Conversation history with bounded memory use.
+
+    Behaves like a list of {"role", "content"} dicts, but only the most
+    recent max_resident messages are held in memory. Older messages are
+    moved to a compressed spill store and loaded again when indexed,
+    sliced or iterated. Messages longer than inline_max_chars, such as
+    full generated documents, are written to the spill store as soon as
+    they are appended and only their position is kept in memory.
+
+    A history rehydrated with from_pager() reads its older messages back from
+    the store they were loaded from (e.g. the session store) instead of
+    copying them into the spill store.
+    """
+
+    def __init__(self,
+                 messages: Optional[Iterable[Message]] = None,
+                 max_resident: int = MAX_CONVERSATION_LENGTH,
+                 inline_max_chars: int = HISTORY_INLINE_MAX_CHARS,
+                 spill_store: Optional[HistorySpillStore] = None):
+        """
+        Initialize the history.
+
+        Args:
+            messages: Initial messages
+            max_resident: Number of recent messages kept in memory
+            inline_max_chars: Longer messages are kept on disk only
+            spill_store: Store for evicted messages, defaults to the process-wide one
+        """
+        self.max_resident = max(1, max_resident)
+        self.inline_max_chars = inline_max_chars
+        self.spill_store = spill_store
+        self.history_id = uuid.uuid4().hex
+        # Resident ring of (seq, message); message is None when only on disk
+        self._recent: deque = deque()
+        self._length = 0
+        self._resident_bytes = 0
+        self._finalizer = None
+        # Messages with seq < _paged_length are kept by _pager, not the spill store
+        self._pager: Optional[MessagePager] = None
+        self._paged_length = 0
+        if messages is not None:
+            self.extend(messages)
+
+    @classmethod
+    def from_pager(cls,
+                   recent: List[Message],
+                   length: int,
+                   pager: MessagePager,
+                   max_resident: int = MAX_CONVERSATION_LENGTH,
+                   inline_max_chars: int = HISTORY_INLINE_MAX_CHARS,
+                   spill_store: Optional[HistorySpillStore] = None) -> "ConversationHistory":
+        """
+        Rebuild a history whose messages are already stored elsewhere.
+
+        Only the most recent messages are held in memory; older ones are
+        loaded through the pager when accessed. Messages appended afterwards
+        are handled as usual.
+
+        Args:
+            recent: The last messages of the history
+            length: Total number of messages, including the recent ones
+            pager: Loads messages [start, stop) by position
+            max_resident: Number of recent messages kept in memory
+            inline_max_chars: Longer messages are loaded through the pager when needed
+            spill_store: Store for messages appended later and then evicted
+
+        Returns:
+            History of the given length
+        """
+        history = cls(max_resident=max_resident, inline_max_chars=inline_max_chars, spill_store=spill_store)
+        history._pager = pager
+        history._paged_length = history._length = length
+        recent = recent[-history.max_resident:]
+        for seq, message in enumerate(recent, start=length - len(recent)):
+            message = {"role": message["role"], "content": message["content"]}
+            if len(message["content"]) > inline_max_chars:
+                message = None
+            history._recent.append((seq, message))
+            history._resident_bytes += message_bytes(message)
+        return history
+
+    def _store(self) -> HistorySpillStore:
+        if self.spill_store is None:
+            self.spill_store = get_history_spill_store()
+        if self._finalizer is None:
+            self._finalizer = weakref.finalize(self, _discard_spilled, self.spill_store, self.history_id)
+        return self.spill_store
+
+    def append(self, message: Message):
+        """Add a message, spilling the oldest resident one if the ring is full."""
+        self.extend((message,))
+
+    def extend(self, messages: Iterable[Message]):
+        """Add several messages with one write to the spill store."""
+        to_spill: List[Tuple[int, Message]] = []
+        for message in messages:
+            message = {"role": message["role"], "content": message["content"]}
+            seq = self._length
+            self._length += 1
+            if len(message["content"]) > self.inline_max_chars:
+                to_spill.append((seq, message))
+                message = None
+            self._recent.append((seq, message))
+            self._resident_bytes += message_bytes(message)
+
+            if len(self._recent) > self.max_resident:
+                old_seq, old_message = self._recent.popleft()
+                self._resident_bytes -= message_bytes(old_message)
+                # Paged messages can be loaded again from the pager's store
+                if old_message is not None and old_seq >= self._paged_length:
+                    to_spill.append((old_seq, old_message))
+
+            if len(to_spill) >= self.max_resident:
+                self._store().put(self.history_id, to_spill)
+                to_spill = []
+        if to_spill:
+            self._store().put(self.history_id, to_spill)
+
+    def clear(self):
+        """Remove all messages, including those on disk."""
+        if self._finalizer is not None:
+            self._finalizer()
+            self._finalizer = None
+        self.history_id = uuid.uuid4().hex
+        self._recent.clear()
+        self._length = 0
+        self._resident_bytes = 0
+        self._pager = None
+        self._paged_length = 0
+
+    @property
+    def resident_bytes(self) -> int:
+        """Approximate memory held by the resident messages."""
+        return self._resident_bytes
+
+    @property
+    def resident_start(self) -> int:
+        """Index of the oldest message held in memory."""
+        return self._length - len(self._recent)
+
+    def _load(self, start: int, stop: int) -> List[Message]:
+        """Load the messages in [start, stop), reading spilled ones from disk in one query."""
+        if start >= stop:
+            return []
+        offset = self.resident_start
+        resident = {seq: message for seq, message in list(self._recent)[max(start - offset, 0):max(stop - offset, 0)]}
+        missing = [seq for seq in range(start, stop) if resident.get(seq) is None]
+        loaded: Dict[int, Message] = {}
+        paged = [seq for seq in missing if seq < self._paged_length]
+        if paged:
+            loaded.update(enumerate(self._pager(paged[0], paged[-1] + 1), start=paged[0]))
+        spilled = [seq for seq in missing if seq >= self._paged_length]
+        if spilled:
+            loaded.update(self._store().get_range(self.history_id, spilled[0], spilled[-1] + 1))
+        return [resident.get(seq) or loaded[seq] for seq in range(start, stop)]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Message, List[Message]]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return self._load(start, stop)
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("conversation history index out of range")
+        return self._load(index, index + 1)[0]
+
+    def __iter__(self) -> Iterator[Message]:
+        # Page through spilled messages so iteration never loads them all at once
+        for start in range(0, self._length, self.max_resident):
+            yield from self._load(start, min(start + self.max_resident, self._length))
+
+    def __reversed__(self) -> Iterator[Message]:
+        for stop in range(self._length, 0, -self.max_resident):
+            yield from reversed(self._load(max(stop - self.max_resident, 0), stop))
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (list, ConversationHistory)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ConversationHistory(length={self._length}, resident={len(self._recent)}, paged={self._paged_length})"
+
+    def recent(self, count: Optional[int] = None) -> List[Message]:
+        """
+        Get the most recent messages, e.g. for building a prompt.
+
+        Args:
+            count: Number of messages, defaults to the resident window
+
+        Returns:
+            Messages in order, oldest first
+        """
+        count = self.max_resident if count is None else count
+        return self._load(max(self._length - count, 0), self._length)
+
+    def page(self, start: int, stop: int) -> List[Message]:
+        """Get messages [start, stop), e.g. when the UI scrolls back."""
+        return self[start:stop]
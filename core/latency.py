@@ -0,0 +1,63 @@
+import random
+import threading
+from typing import Optional, Sequence
+
+DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+
+class LatencyDistribution:
+    """
+    Seeded random delay generator used by the offline stand-ins.
+
+    Specs are written as "<kind>:<params>", e.g. "0.2", "fixed:0.2",
+    "uniform:0.1,0.5", "normal:0.3,0.05", "lognormal:0.8,0.4" (median and
+    sigma) or "exponential:0.5" (mean). Samples are never negative.
+    """
+
+    def __init__(self, kind: str = "fixed", params: Sequence[float] = (0.0,), seed: Optional[int] = None):
+        """
+        Initialize the distribution.
+
+        Args:
+            kind: One of fixed, uniform, normal, lognormal, exponential
+            params: Parameters for the distribution, in seconds
+            seed: Seed for repeatable samples
+        """
+        if kind not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        expected = {"fixed": 1, "exponential": 1}.get(kind, 2)
+        if len(params) != expected:
+            raise ValueError(f"Latency distribution '{kind}' takes {expected} parameter(s)")
+
+        self.kind = kind
+        self.params = tuple(float(p) for p in params)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, spec: str, seed: Optional[int] = None) -> "LatencyDistribution":
+        """Create a distribution from a spec string such as 'lognormal:0.8,0.4'."""
+        kind, _, params = spec.strip().partition(":")
+        if not params:
+            # A bare number is a fixed delay
+            kind, params = "fixed", kind
+        return cls(kind, [float(p) for p in params.split(",")], seed)
+
+    def sample(self) -> float:
+        """Draw one delay in seconds."""
+        with self._lock:
+            if self.kind == "fixed":
+                value = self.params[0]
+            elif self.kind == "uniform":
+                value = self._random.uniform(*self.params)
+            elif self.kind == "normal":
+                value = self._random.gauss(*self.params)
+            elif self.kind == "lognormal":
+                median, sigma = self.params
+                value = median * self._random.lognormvariate(0.0, sigma) if median > 0 else 0.0
+            else:
+                mean = self.params[0]
+                value = self._random.expovariate(1.0 / mean) if mean > 0 else 0.0
+        return max(value, 0.0)
+
+    def __repr__(self) -> str:
+        return f"{self.kind}:{','.join(f'{p:g}' for p in self.params)}"
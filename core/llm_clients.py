@@ -0,0 +1,275 @@
+import asyncio
+import hashlib
+import threading
+import weakref
+from typing import Callable, Dict, Optional, Tuple
+import httpx
+from langchain_openai import ChatOpenAI
+from config.settings import (
+    OPENAI_API_KEY, OPENAI_MODEL, OPENAI_TEMPERATURE,
+    LLM_POOL_MAX_CONNECTIONS, LLM_POOL_MAX_KEEPALIVE, LLM_KEEPALIVE_EXPIRY,
+    LLM_CONNECT_TIMEOUT, LLM_REQUEST_TIMEOUT
+)
+
+# Called after every upstream request with (host, reused_connection)
+ConnectionHook = Callable[[str, bool], None]
+
+NEW_CONNECTION_EVENT = "connection.connect_tcp.started"
+
+class ConnectionMetrics:
+    """Counts upstream requests and how many of them reused a pooled connection."""
+
+    def __init__(self, hook: Optional[ConnectionHook] = None):
+        """
+        Initialize the counters.
+
+        Args:
+            hook: Optional callback invoked after every request
+        """
+        self.hook = hook
+        self.requests = 0
+        self.new_connections = 0
+        self._lock = threading.Lock()
+
+    def record(self, host: str, reused: bool):
+        """Record one completed request."""
+        with self._lock:
+            self.requests += 1
+            if not reused:
+                self.new_connections += 1
+        if self.hook:
+            self.hook(host, reused)
+
+    def stats(self) -> Dict[str, float]:
+        """Get request and connection counters and the reuse ratio."""
+        with self._lock:
+            reused = self.requests - self.new_connections
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": reused,
+                "reuse_ratio": reused / self.requests if self.requests else 0.0
+            }
+
+class LoopBoundAsyncClient(httpx.AsyncClient):
+    """
+    Async HTTP client that sends each request through a pool owned by the running event loop.
+
+    httpx async pools cannot be shared across event loops, but a ChatOpenAI
+    client keeps the async client it was built with. This client stands in
+    for it and keeps one real client per loop, so the serving loop, scripts
+    using asyncio.run() and test loops each get their own keep-alive pool.
+    """
+
+    def __init__(self, factory: Callable[[], httpx.AsyncClient]):
+        """
+        Initialize the client.
+
+        Args:
+            factory: Creates the real client for a new event loop
+        """
+        super().__init__()
+        self._factory = factory
+        self._loop_clients: Dict[int, Tuple[weakref.ref, httpx.AsyncClient]] = {}
+        self._loop_lock = threading.Lock()
+
+    @property
+    def loop_count(self) -> int:
+        """Number of event loops holding a client."""
+        return len(self._loop_clients)
+
+    def for_running_loop(self) -> httpx.AsyncClient:
+        """Get the client of the running event loop, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        with self._loop_lock:
+            entry = self._loop_clients.get(id(loop))
+            if entry is not None and entry[0]() is loop:
+                return entry[1]
+
+            # Drop the clients of loops that were closed or collected; their ids can be reused
+            for key, (loop_ref, _) in list(self._loop_clients.items()):
+                other = loop_ref()
+                if other is None or other.is_closed():
+                    del self._loop_clients[key]
+
+            client = self._factory()
+            self._loop_clients[id(loop)] = (weakref.ref(loop), client)
+            return client
+
+    async def send(self, request: httpx.Request, **kwargs) -> httpx.Response:
+        return await self.for_running_loop().send(request, **kwargs)
+
+    async def aclose(self):
+        """Close the running loop's client."""
+        loop = asyncio.get_running_loop()
+        with self._loop_lock:
+            entry = self._loop_clients.pop(id(loop), None)
+        if entry is not None:
+            await entry[1].aclose()
+
+    def forget(self):
+        """Drop every loop's client without closing it, e.g. after the loops are gone."""
+        with self._loop_lock:
+            self._loop_clients.clear()
+
+class LLMClientRegistry:
+    """
+    Process-wide registry of chat model clients.
+
+    Clients are keyed by (model, temperature, API key) and all share one
+    keep-alive HTTP client per sync/async flavour, so sessions and resets
+    reuse warm TLS connections instead of building a new pool each time.
+    """
+
+    def __init__(self,
+                 max_connections: int = LLM_POOL_MAX_CONNECTIONS,
+                 max_keepalive: int = LLM_POOL_MAX_KEEPALIVE,
+                 keepalive_expiry: float = LLM_KEEPALIVE_EXPIRY,
+                 connect_timeout: float = LLM_CONNECT_TIMEOUT,
+                 request_timeout: float = LLM_REQUEST_TIMEOUT,
+                 metrics_hook: Optional[ConnectionHook] = None):
+        """
+        Initialize the registry. HTTP clients are created on first use.
+
+        Args:
+            max_connections: Maximum open connections in the shared pool
+            max_keepalive: Maximum idle connections kept alive
+            keepalive_expiry: Seconds an idle connection is kept
+            connect_timeout: Seconds to wait for a connection
+            request_timeout: Seconds to wait for a response
+            metrics_hook: Optional callback receiving (host, reused_connection) per request
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(request_timeout, connect=connect_timeout)
+        self.metrics = ConnectionMetrics(metrics_hook)
+        self._clients: Dict[Tuple[str, float, str], ChatOpenAI] = {}
+        self._http_client: Optional[httpx.Client] = None
+        self._http_async_client: Optional[LoopBoundAsyncClient] = None
+        self._lock = threading.Lock()
+
+    def set_metrics_hook(self, hook: Optional[ConnectionHook]):
+        """Set the callback receiving (host, reused_connection) per request."""
+        self.metrics.hook = hook
+
+    def _trace_request(self, request: httpx.Request):
+        """Mark whether the request opens a new connection."""
+        request.extensions["new_connection"] = False
+
+        def trace(event_name: str, info: dict):
+            if event_name == NEW_CONNECTION_EVENT:
+                request.extensions["new_connection"] = True
+
+        request.extensions["trace"] = trace
+
+    async def _atrace_request(self, request: httpx.Request):
+        """Async variant of _trace_request."""
+        request.extensions["new_connection"] = False
+
+        async def trace(event_name: str, info: dict):
+            if event_name == NEW_CONNECTION_EVENT:
+                request.extensions["new_connection"] = True
+
+        request.extensions["trace"] = trace
+
+    def _record_response(self, response: httpx.Response):
+        """Report connection reuse for a completed request."""
+        request = response.request
+        self.metrics.record(request.url.host, not request.extensions.get("new_connection", False))
+
+    async def _arecord_response(self, response: httpx.Response):
+        """Async variant of _record_response."""
+        self._record_response(response)
+
+    @property
+    def http_client(self) -> httpx.Client:
+        """Shared keep-alive HTTP client for sync calls."""
+        with self._lock:
+            if self._http_client is None:
+                self._http_client = httpx.Client(
+                    limits=self.limits,
+                    timeout=self.timeout,
+                    event_hooks={"request": [self._trace_request], "response": [self._record_response]}
+                )
+            return self._http_client
+
+    def _new_async_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            limits=self.limits,
+            timeout=self.timeout,
+            event_hooks={"request": [self._atrace_request], "response": [self._arecord_response]}
+        )
+
+    @property
+    def http_async_client(self) -> LoopBoundAsyncClient:
+        """Shared keep-alive HTTP client for async calls, with one pool per event loop."""
+        with self._lock:
+            if self._http_async_client is None:
+                self._http_async_client = LoopBoundAsyncClient(self._new_async_client)
+            return self._http_async_client
+
+    def get(self,
+            model: str = OPENAI_MODEL,
+            temperature: float = OPENAI_TEMPERATURE,
+            api_key: Optional[str] = OPENAI_API_KEY) -> ChatOpenAI:
+        """
+        Get the shared chat model client for a configuration, creating it on first use.
+
+        Args:
+            model: OpenAI model name
+            temperature: Sampling temperature
+            api_key: OpenAI API key
+
+        Returns:
+            ChatOpenAI client backed by the shared connection pool
+        """
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY is required. Please set it in your .env file.")
+
+        # Key on a digest so the registry never holds the raw key in its index
+        key = (model, temperature, hashlib.sha256(api_key.encode("utf-8")).hexdigest())
+        http_client = self.http_client
+        http_async_client = self.http_async_client
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = ChatOpenAI(
+                    model=model,
+                    temperature=temperature,
+                    api_key=api_key,
+                    timeout=self.timeout,
+                    http_client=http_client,
+                    http_async_client=http_async_client
+                )
+                self._clients[key] = client
+            return client
+
+    def connection_stats(self) -> Dict[str, float]:
+        """Get connection reuse counters for the shared pool."""
+        stats = self.metrics.stats()
+        stats["clients"] = len(self._clients)
+        stats["async_pools"] = self._http_async_client.loop_count if self._http_async_client else 0
+        return stats
+
+    def close(self):
+        """Close the shared sync HTTP client and forget all chat model clients."""
+        with self._lock:
+            if self._http_client is not None:
+                self._http_client.close()
+            self._http_client = None
+            # Async pools are bound to their event loops; drop them and let them be collected
+            if self._http_async_client is not None:
+                self._http_async_client.forget()
+            self._http_async_client = None
+            self._clients.clear()
+
+llm_clients = LLMClientRegistry()
+
+def get_chat_model(model: str = OPENAI_MODEL,
+                   temperature: float = OPENAI_TEMPERATURE,
+                   api_key: Optional[str] = OPENAI_API_KEY) -> ChatOpenAI:
+    """Get the shared chat model client from the process-wide registry."""
+    return llm_clients.get(model, temperature, api_key)
@@ -0,0 +1,104 @@
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional
+from config.settings import LLM_MAX_CONCURRENCY
+
+class LLMConcurrencyLimiter:
+    """
+    Bounds the number of in-flight LLM calls across all sessions.
+
+    Waiting requests are queued per session and admitted round-robin across
+    sessions, so one busy conversation cannot starve the others. Within a
+    session, requests are admitted in arrival order.
+    """
+
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY):
+        """
+        Initialize the limiter.
+
+        Args:
+            max_concurrency: Maximum number of concurrent upstream LLM calls
+        """
+        self.max_concurrency = max_concurrency
+        self.active = 0
+        self.peak_active = 0
+        self._queues: Dict[str, Deque[asyncio.Future]] = {}
+        self._ring: Deque[str] = deque()
+
+    @property
+    def waiting(self) -> int:
+        """Number of requests waiting for a slot."""
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def acquire(self, session_id: str = "default"):
+        """Wait until a slot is available for this session."""
+        if self.active < self.max_concurrency and not self._ring:
+            self._grant()
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(session_id, deque()).append(future)
+        if session_id not in self._ring:
+            self._ring.append(session_id)
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.cancelled():
+                self._discard(session_id, future)
+            else:
+                # The slot was granted just before cancellation; hand it on
+                self.release()
+            raise
+
+    def release(self):
+        """Free a slot and admit the next waiting request."""
+        self.active -= 1
+        self._wake()
+
+    def _grant(self):
+        """Count a newly admitted request."""
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+
+    def _discard(self, session_id: str, future: asyncio.Future):
+        """Remove a cancelled request from its session queue."""
+        queue = self._queues.get(session_id)
+        if queue is None:
+            return
+        try:
+            queue.remove(future)
+        except ValueError:
+            return
+        if not queue:
+            del self._queues[session_id]
+            self._ring.remove(session_id)
+
+    def _wake(self):
+        """Admit waiting requests round-robin across sessions while slots are free."""
+        while self.active < self.max_concurrency and self._ring:
+            session_id = self._ring.popleft()
+            queue = self._queues[session_id]
+            future = queue.popleft()
+            if queue:
+                self._ring.append(session_id)
+            else:
+                del self._queues[session_id]
+
+            # A waiter cancelled before its task ran the cleanup is still queued; skip it
+            if future.done():
+                continue
+            self._grant()
+            future.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, session_id: Optional[str] = None) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block."""
+        await self.acquire(session_id or "default")
+        try:
+            yield
+        finally:
+            self.release()
+
+llm_limiter = LLMConcurrencyLimiter()
@@ -0,0 +1,353 @@
+import asyncio
+import contextlib
+import json
+import math
+import multiprocessing
+import os
+import tempfile
+import uuid
+import time
+from collections import defaultdict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+from data.document_types import DOCUMENT_QUESTIONS, get_all_document_types, get_document_questions
+from core.ai_engine import AIEngine
+from core.conversation import ConversationManager, ConversationState
+from core.document_store import DocumentStore, set_document_store
+from core.history import HistorySpillStore, set_history_spill_store
+from core.latency import LatencyDistribution
+from core.llm_limiter import LLMConcurrencyLimiter
+from core.localization_research import LocalizationResearchEngine, ResearchSession
+from core.redis_standin import RedisStandIn
+from core.research_store import ResearchStore, set_research_store
+from core.response_cache import ResponseCache
+from core.search_backends import StubSearchBackend
+from core.session_store import InMemorySessionStore, RedisSessionStore, SessionStore, SQLiteSessionStore
+from core.stub_llm import StubChatModel
+
+LOADTEST_COUNTRIES = ["germany", "spain", "poland", "turkey", "ukraine", "portugal"]
+
+SAMPLE_ANSWERS = {
+    "date": "2025-01-15",
+    "boolean": "yes",
+    "number": "1000"
+}
+
+def sample_answer(question: Dict[str, Any]) -> str:
+    """Get a valid answer for a question definition."""
+    return SAMPLE_ANSWERS.get(question["type"], f"Sample {question['id'].replace('_', ' ')}")
+
+@contextlib.contextmanager
+def isolated_stores(data_dir: str):
+    """Point the process-wide document, research and history stores at data_dir for the duration of the block."""
+    previous = (
+        set_document_store(DocumentStore(os.path.join(data_dir, "documents"))),
+        set_research_store(ResearchStore(os.path.join(data_dir, "research"))),
+        set_history_spill_store(HistorySpillStore(os.path.join(data_dir, "history_spill.sqlite3")))
+    )
+    try:
+        yield
+    finally:
+        set_document_store(previous[0])
+        set_research_store(previous[1])
+        set_history_spill_store(previous[2])
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+def create_session_store(kind: str, location: str) -> SessionStore:
+    """Connect to a load test session store: a SQLite file path or a Redis URL."""
+    if kind == "sqlite":
+        return SQLiteSessionStore(location)
+    if kind == "redis":
+        return RedisSessionStore(location)
+    raise ValueError(f"Session store '{kind}' cannot be shared between worker processes")
+
+# Per-process state of a load test worker, set by _init_turn_worker
+_worker: Dict[str, Any] = {}
+
+def _init_turn_worker(data_dir: str, store_kind: str, store_location: str, llm_latency: str, seed: Optional[int]):
+    """Set up a worker process like an app worker: its own engine and cache, the shared session store."""
+    set_document_store(DocumentStore(os.path.join(data_dir, "documents")))
+    set_research_store(ResearchStore(os.path.join(data_dir, "research")))
+    set_history_spill_store(HistorySpillStore(os.path.join(data_dir, f"history_spill_{os.getpid()}.sqlite3")))
+    _worker["store"] = create_session_store(store_kind, store_location)
+    _worker["engine"] = AIEngine(llm=StubChatModel.from_spec(llm_latency, seed), response_cache=ResponseCache(disk_path=None))
+
+def _worker_pid() -> int:
+    """Report the worker's process id, used to start every worker before timing."""
+    time.sleep(0.05)
+    return os.getpid()
+
+def serve_turn(session_id: str, message: str) -> Dict[str, Any]:
+    """
+    Serve one turn in a worker process: load the session, process the message, save it.
+
+    Returns:
+        Turn result with the state before and after, the generated document id,
+        the turn's duration and the worker's LLM call and cache counters
+    """
+    store, engine = _worker["store"], _worker["engine"]
+    start = time.perf_counter()
+    manager = (ConversationManager.resume(session_id, store, engine)
+               or ConversationManager(ai_engine=engine, session_store=store, session_id=session_id))
+    state = manager.state
+    manager.process_user_message(message)
+    cache = engine.response_cache.stats()
+    return {
+        "state": state.value,
+        "next_state": manager.state.value,
+        "generated_document_id": manager.generated_document_id,
+        "seconds": time.perf_counter() - start,
+        "worker": os.getpid(),
+        "llm_calls": engine.llm.calls,
+        "cache_hits": cache["hits"],
+        "cache_misses": cache["misses"]
+    }
+
+async def simulate_user(user_index: int,
+                        document_type: str,
+                        engine: AIEngine,
+                        research_engine: Optional[LocalizationResearchEngine],
+                        timings: Dict[str, List[float]],
+                        session_store: Optional[SessionStore] = None,
+                        turn_pool: Optional[Executor] = None,
+                        served: Optional[List[Dict[str, Any]]] = None) -> bool:
+    """
+    Drive one simulated user through a full conversation.
+
+    Odd users open with a plain greeting so the document selection prompt is
+    exercised; even users name the document in their first message.
+
+    With a session store, no manager is kept between turns: every turn loads
+    the session, processes the message and saves it, as a stateless worker
+    behind a load balancer would. With a turn pool, each turn runs that way
+    in whichever worker process is free (see serve_turn), so consecutive
+    turns of one conversation land on different processes.
+
+    Args:
+        served: Collects the serve_turn results of pooled turns
+
+    Returns:
+        True if the conversation produced a document
+    """
+    session_id = uuid.uuid4().hex
+    manager = ConversationManager(ai_engine=engine, session_store=session_store, session_id=session_id)
+    document_name = get_all_document_types()[document_type]["name"]
+    status = {"state": manager.state.value, "generated_document_id": None}
+
+    async def send(message: str):
+        nonlocal manager
+        if turn_pool is not None:
+            turn = await asyncio.get_running_loop().run_in_executor(turn_pool, serve_turn, session_id, message)
+            timings[turn["state"]].append(turn["seconds"])
+            served.append(turn)
+            status.update(state=turn["next_state"], generated_document_id=turn["generated_document_id"])
+            return
+
+        start = time.perf_counter()
+        if session_store is not None:
+            manager = (await asyncio.to_thread(ConversationManager.resume, session_id, session_store, engine)
+                       or ConversationManager(ai_engine=engine, session_store=session_store, session_id=session_id))
+        state = manager.state
+        await manager.aprocess_user_message(message)
+        timings[state.value].append(time.perf_counter() - start)
+        status.update(state=manager.state.value, generated_document_id=manager.generated_document_id)
+
+    if user_index % 2:
+        await send("Hello")
+    await send(f"I need a {document_name}")
+
+    for question in get_document_questions(document_type):
+        if status["state"] != ConversationState.INFORMATION_GATHERING.value:
+            break
+        await send(sample_answer(question))
+
+    if status["state"] == ConversationState.DOCUMENT_GENERATION.value:
+        await send("Please generate the document")
+
+    if research_engine is not None:
+        country = LOADTEST_COUNTRIES[user_index % len(LOADTEST_COUNTRIES)]
+        session = ResearchSession(research_engine, document_type, country)
+        start = time.perf_counter()
+        await asyncio.to_thread(session.get_guidance)
+        timings[ConversationState.LOCALIZATION_RESEARCH.value].append(time.perf_counter() - start)
+
+    return status["generated_document_id"] is not None
+
+async def run_loadtest_async(users: int = 50,
+                             llm_latency: str = "lognormal:0.8,0.4",
+                             search_latency: str = "uniform:0.2,1.0",
+                             max_concurrency: int = 8,
+                             research: bool = True,
+                             seed: Optional[int] = 42,
+                             session_store: Optional[str] = None,
+                             workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Run simulated users concurrently against stub LLM and search backends.
+
+    Users are spread round-robin over every document type in DOCUMENT_QUESTIONS.
+
+    Args:
+        users: Number of simulated users
+        llm_latency: Latency spec for the stub chat model, e.g. 'lognormal:0.8,0.4'
+        search_latency: Latency spec for the stub search backend
+        max_concurrency: Concurrent LLM calls allowed by the limiter
+        research: Also run localization research for each user
+        seed: Seed for latency sampling
+        session_store: Keep conversations in a 'memory', 'sqlite' or 'redis'
+            (local stand-in server) session store instead of in process
+        workers: Serve turns in this many separate worker processes sharing
+            the 'sqlite' or 'redis' session store, like app workers behind a
+            load balancer; if None, turns run in this process
+
+    Returns:
+        Report with throughput and per-state latency percentiles
+    """
+    limiter = LLMConcurrencyLimiter(max_concurrency)
+    cache = ResponseCache()
+    engine = AIEngine(
+        llm=StubChatModel.from_spec(llm_latency, seed),
+        limiter=limiter,
+        response_cache=cache
+    )
+    document_types = list(DOCUMENT_QUESTIONS)
+    timings: Dict[str, List[float]] = defaultdict(list)
+
+    if workers and session_store not in ("sqlite", "redis"):
+        raise ValueError("Worker processes need a shared session store: use session_store='sqlite' or 'redis'")
+
+    standin = None
+    turn_pool = None
+    served: List[Dict[str, Any]] = []
+    # Keep documents, research and spilled history out of the app's data directories
+    with tempfile.TemporaryDirectory() as data_dir, isolated_stores(data_dir):
+        try:
+            store: Optional[SessionStore] = None
+            store_location = None
+            if session_store == "memory":
+                store = InMemorySessionStore()
+            elif session_store == "sqlite":
+                store_location = os.path.join(data_dir, "sessions.sqlite3")
+                store = SQLiteSessionStore(store_location)
+            elif session_store == "redis":
+                standin = RedisStandIn().start()
+                store_location = standin.url
+                store = RedisSessionStore(store_location)
+            elif session_store is not None:
+                raise ValueError(f"Unknown session store: {session_store}")
+
+            if workers:
+                turn_pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_turn_worker,
+                    initargs=(data_dir, session_store, store_location, llm_latency, seed)
+                )
+                # Start every worker before the clock runs
+                loop = asyncio.get_running_loop()
+                await asyncio.gather(*[loop.run_in_executor(turn_pool, _worker_pid) for _ in range(workers)])
+
+            research_engine = None
+            if research:
+                research_engine = LocalizationResearchEngine(
+                    search_backend=StubSearchBackend(LatencyDistribution.parse(search_latency, seed))
+                )
+
+            start = time.perf_counter()
+            outcomes = await asyncio.gather(
+                *[
+                    simulate_user(i, document_types[i % len(document_types)], engine, research_engine, timings,
+                                  store, turn_pool, served)
+                    for i in range(users)
+                ],
+                return_exceptions=True
+            )
+            elapsed = time.perf_counter() - start
+        finally:
+            if turn_pool is not None:
+                turn_pool.shutdown()
+            if standin is not None:
+                standin.stop()
+
+    errors = [repr(outcome) for outcome in outcomes if isinstance(outcome, BaseException)]
+    completed = sum(1 for outcome in outcomes if outcome is True)
+    turns = sum(len(values) for state, values in timings.items()
+                if state != ConversationState.LOCALIZATION_RESEARCH.value)
+
+    llm_calls, cache_stats = engine.llm.calls, cache.stats()
+    if turn_pool is not None:
+        # Each worker reports running totals; keep the last report per worker
+        latest = {}
+        for turn in served:
+            latest[turn["worker"]] = turn
+        llm_calls = sum(turn["llm_calls"] for turn in latest.values())
+        hits = sum(turn["cache_hits"] for turn in latest.values())
+        misses = sum(turn["cache_misses"] for turn in latest.values())
+        cache_stats = {"hits": hits, "misses": misses, "hit_ratio": hits / (hits + misses) if hits + misses else 0.0}
+
+    return {
+        "users": users,
+        "document_types": document_types,
+        "llm_latency": llm_latency,
+        "search_latency": search_latency if research else None,
+        "session_store": session_store,
+        "workers": workers,
+        "completed": completed,
+        "failed": users - completed,
+        "errors": errors[:10],
+        "elapsed_seconds": round(elapsed, 3),
+        "conversations_per_second": round(completed / elapsed, 2) if elapsed > 0 else 0.0,
+        "turns_per_second": round(turns / elapsed, 2) if elapsed > 0 else 0.0,
+        "worker_processes": len({turn["worker"] for turn in served}),
+        "llm_calls": llm_calls,
+        "llm_peak_concurrency": limiter.peak_active if turn_pool is None else None,
+        "cache": cache_stats,
+        "states": {
+            state: {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50) * 1000, 2),
+                "p95_ms": round(percentile(values, 95) * 1000, 2),
+                "p99_ms": round(percentile(values, 99) * 1000, 2),
+                "max_ms": round(max(values) * 1000, 2)
+            }
+            for state, values in timings.items()
+        }
+    }
+
+def print_report(report: Dict[str, Any]):
+    """Print a load test report as a table."""
+    print(f"✅ {report['completed']}/{report['users']} conversations completed in {report['elapsed_seconds']}s "
+          f"({report['conversations_per_second']} conversations/s, {report['turns_per_second']} turns/s)")
+    if report["workers"]:
+        print(f"   Turns served by {report['worker_processes']} worker processes sharing the {report['session_store']} session store")
+    print(f"   LLM calls: {report['llm_calls']}, peak concurrency: {report['llm_peak_concurrency']}, "
+          f"cache hit ratio: {report['cache']['hit_ratio']:.2f}")
+    print(f"   {'state':<24}{'count':>7}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}")
+    for state, stats in report["states"].items():
+        print(f"   {state:<24}{stats['count']:>7}{stats['p50_ms']:>11}{stats['p95_ms']:>11}{stats['p99_ms']:>11}")
+    for error in report["errors"]:
+        print(f"❌ {error}")
+
+def run_loadtest(output_path: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+    """
+    Run a load test, print the report and optionally write it as JSON.
+
+    Args:
+        output_path: Optional JSON file for the report
+        **kwargs: Options for run_loadtest_async
+
+    Returns:
+        Load test report
+    """
+    report = asyncio.run(run_loadtest_async(**kwargs))
+    print_report(report)
+    if output_path:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return report
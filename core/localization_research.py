@@ -1,10 +1,24 @@
-import requests
 from bs4 import BeautifulSoup
-from duckduckgo_search import DDGS
-import re
-from typing import Dict, List, Optional, Tuple
+import asyncio
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional
 import json
+import os
 import time
+from config.settings import RESEARCH_MAX_WORKERS, RESEARCH_QUERY_TIMEOUT, RESEARCH_DATA_DIR
+from core.research_store import ResearchStore, get_research_store
+from core.search_backends import SearchBackend, create_search_backend
+from core.extraction import SentenceExtractor, default_extractor
+from core.metrics import metrics, span
+
+# Research result field filled from each search query's results
+QUERY_CATEGORIES = {
+    "legal_requirements": "legal_requirements",
+    "template_structure": "template_structure",
+    "key_clauses": "key_clauses",
+    "compliance": "compliance_notes"
+}
 
 class LocalizationResearchEngine:
     """
@@ -12,12 +26,18 @@ class LocalizationResearchEngine:
     and templates from the internet.
     """
     
-    def __init__(self):
-        self.search_engine = DDGS()
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+    def __init__(self,
+                 max_workers: int = RESEARCH_MAX_WORKERS,
+                 query_timeout: float = RESEARCH_QUERY_TIMEOUT,
+                 store: Optional[ResearchStore] = None,
+                 search_backend: Optional[SearchBackend] = None,
+                 extractor: Optional[SentenceExtractor] = None):
+        self.extractor = extractor or default_extractor
+        self.search_backend = search_backend or create_search_backend()
+        self.store = store or get_research_store()
+        self.max_workers = max_workers
+        self.query_timeout = query_timeout
+        self.query_trace: List[str] = []
     
     def research_country_requirements(self, document_type: str, country: str) -> Dict[str, any]:
         """
@@ -30,6 +50,11 @@ class LocalizationResearchEngine:
         Returns:
             Dictionary containing research findings
         """
+        cached = self.store.get_fresh(document_type, country)
+        if cached:
+            print(f"📦 Using cached {document_type} research for {country}")
+            return cached
+        
         print(f"🔍 Researching {document_type} requirements for {country}...")
         
         research_results = {
@@ -45,20 +70,16 @@ class LocalizationResearchEngine:
         
         # Search queries for different aspects
         search_queries = self._generate_search_queries(document_type, country)
+        search_results = self._run_searches(search_queries)
         
-        for query_type, query in search_queries.items():
-            print(f"   Searching: {query}")
-            results = self._search_web(query)
+        # Merge in query order so the output does not depend on completion order
+        for query_type in search_queries:
+            results = search_results.get(query_type)
             
             if results:
-                if query_type == "legal_requirements":
-                    research_results["legal_requirements"] = self._extract_legal_requirements(results)
-                elif query_type == "template_structure":
-                    research_results["template_structure"] = self._extract_template_structure(results)
-                elif query_type == "key_clauses":
-                    research_results["key_clauses"] = self._extract_key_clauses(results)
-                elif query_type == "compliance":
-                    research_results["compliance_notes"] = self._extract_compliance_notes(results)
+                category = QUERY_CATEGORIES.get(query_type)
+                if category:
+                    research_results[category] = self.extractor.extract(results, [category])[category]
                 
                 # Add sources
                 for result in results[:3]:  # Top 3 sources
@@ -69,8 +90,70 @@ class LocalizationResearchEngine:
                             "snippet": result.get('body', '')[:200] + "..."
                         })
         
+        # Do not cache a result from searches that all failed; the next request searches again
+        if research_results["sources"]:
+            self.store.put(research_results)
+        else:
+            print(f"⚠️ No search results for {document_type} in {country}; research not cached")
         return research_results
     
+    async def aresearch_country_requirements(self, document_type: str, country: str) -> Dict[str, any]:
+        """Async variant of research_country_requirements that runs off the event loop."""
+        return await asyncio.to_thread(self.research_country_requirements, document_type, country)
+    
+    def _run_searches(self, search_queries: Dict[str, str]) -> Dict[str, List[Dict]]:
+        """
+        Run all search queries concurrently on a bounded thread pool.
+        
+        Each query gets its own timeout, measured from when it starts running.
+        A query that fails or times out yields an empty result list.
+        
+        Args:
+            search_queries: Mapping of query type to query string
+            
+        Returns:
+            Mapping of query type to search results
+        """
+        if not search_queries:
+            return {}
+        
+        workers = max(1, min(self.max_workers, len(search_queries)))
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="research")
+        started = {}
+        
+        def timed_search(query_type: str, query: str) -> List[Dict]:
+            started[query_type] = time.monotonic()
+            print(f"   Searching: {query}")
+            return self._search_web(query)
+        
+        futures = {
+            query_type: executor.submit(timed_search, query_type, query)
+            for query_type, query in search_queries.items()
+        }
+        
+        results = {}
+        try:
+            for query_type, future in futures.items():
+                while True:
+                    start = started.get(query_type)
+                    remaining = self.query_timeout if start is None else start + self.query_timeout - time.monotonic()
+                    try:
+                        results[query_type] = future.result(timeout=max(remaining, 0))
+                        break
+                    except FutureTimeoutError:
+                        # Queued queries have not started yet, so their clock is not running
+                        if query_type in started and started[query_type] + self.query_timeout <= time.monotonic():
+                            print(f"   Search timed out: {search_queries[query_type]}")
+                            metrics.inc("research_search_timeouts_total")
+                            future.cancel()
+                            results[query_type] = []
+                            break
+        finally:
+            # Do not block on searches that timed out
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        return results
+    
     def _generate_search_queries(self, document_type: str, country: str) -> Dict[str, str]:
         """Generate search queries for different research aspects."""
         
@@ -122,115 +205,34 @@ class LocalizationResearchEngine:
         })
     
     def _search_web(self, query: str, max_results: int = 5) -> List[Dict]:
-        """Search the web using DuckDuckGo."""
+        """Search the web using the configured search backend."""
+        self.query_trace.append(query)
         try:
-            results = []
-            search_results = self.search_engine.text(query, max_results=max_results)
-            
-            for result in search_results:
-                results.append({
-                    'title': result.get('title', ''),
-                    'body': result.get('body', ''),
-                    'link': result.get('link', '')
-                })
-            
-            return results
+            with span("research_search"):
+                return self.search_backend.search(query, max_results=max_results)
         except Exception as e:
             print(f"   Search error: {e}")
             return []
     
     def _extract_legal_requirements(self, search_results: List[Dict]) -> List[str]:
         """Extract legal requirements from search results."""
-        requirements = []
-        
-        for result in search_results:
-            text = result.get('body', '').lower()
-            
-            # Look for requirement indicators
-            requirement_indicators = [
-                'required', 'mandatory', 'must include', 'shall contain',
-                'legal requirement', 'obligatory', 'essential', 'necessary'
-            ]
-            
-            for indicator in requirement_indicators:
-                if indicator in text:
-                    # Extract sentences containing requirements
-                    sentences = re.split(r'[.!?]', result.get('body', ''))
-                    for sentence in sentences:
-                        if indicator in sentence.lower() and len(sentence.strip()) > 20:
-                            requirements.append(sentence.strip())
-                            break
-        
-        return list(set(requirements))[:10]  # Remove duplicates, limit to 10
+        return self.extractor.extract(search_results, ["legal_requirements"])["legal_requirements"]
     
     def _extract_template_structure(self, search_results: List[Dict]) -> List[str]:
         """Extract template structure information from search results."""
-        structure_info = []
-        
-        for result in search_results:
-            text = result.get('body', '').lower()
-            
-            # Look for structure indicators
-            structure_indicators = [
-                'section', 'clause', 'paragraph', 'article', 'part',
-                'structure', 'format', 'template', 'outline', 'layout'
-            ]
-            
-            for indicator in structure_indicators:
-                if indicator in text:
-                    sentences = re.split(r'[.!?]', result.get('body', ''))
-                    for sentence in sentences:
-                        if indicator in sentence.lower() and len(sentence.strip()) > 20:
-                            structure_info.append(sentence.strip())
-                            break
-        
-        return list(set(structure_info))[:10]
+        return self.extractor.extract(search_results, ["template_structure"])["template_structure"]
     
     def _extract_key_clauses(self, search_results: List[Dict]) -> List[str]:
         """Extract key clauses information from search results."""
-        clauses_info = []
-        
-        for result in search_results:
-            text = result.get('body', '').lower()
-            
-            # Look for clause indicators
-            clause_indicators = [
-                'clause', 'provision', 'term', 'condition', 'stipulation',
-                'agreement', 'obligation', 'right', 'duty', 'liability'
-            ]
-            
-            for indicator in clause_indicators:
-                if indicator in text:
-                    sentences = re.split(r'[.!?]', result.get('body', ''))
-                    for sentence in sentences:
-                        if indicator in sentence.lower() and len(sentence.strip()) > 20:
-                            clauses_info.append(sentence.strip())
-                            break
-        
-        return list(set(clauses_info))[:10]
+        return self.extractor.extract(search_results, ["key_clauses"])["key_clauses"]
     
     def _extract_compliance_notes(self, search_results: List[Dict]) -> List[str]:
         """Extract compliance information from search results."""
-        compliance_info = []
-        
-        for result in search_results:
-            text = result.get('body', '').lower()
-            
-            # Look for compliance indicators
-            compliance_indicators = [
-                'compliance', 'regulation', 'law', 'statute', 'code',
-                'legal standard', 'regulatory', 'statutory', 'legislation'
-            ]
-            
-            for indicator in compliance_indicators:
-                if indicator in text:
-                    sentences = re.split(r'[.!?]', result.get('body', ''))
-                    for sentence in sentences:
-                        if indicator in sentence.lower() and len(sentence.strip()) > 20:
-                            compliance_info.append(sentence.strip())
-                            break
-        
-        return list(set(compliance_info))[:10]
+        return self.extractor.extract(search_results, ["compliance_notes"])["compliance_notes"]
+    
+    def extract_all(self, search_results: List[Dict]) -> Dict[str, List[str]]:
+        """Extract all four research categories from search results in a single pass."""
+        return self.extractor.extract(search_results)
     
     def get_localized_document_guidance(self, document_type: str, country: str) -> str:
         """
@@ -244,6 +246,20 @@ class LocalizationResearchEngine:
             Formatted guidance string
         """
         research = self.research_country_requirements(document_type, country)
+        return self.format_localized_guidance(research)
+    
+    def format_localized_guidance(self, research: Dict) -> str:
+        """
+        Format research findings as guidance text without running any searches.
+        
+        Args:
+            research: Result of research_country_requirements
+            
+        Returns:
+            Formatted guidance string
+        """
+        country = research["country"]
+        document_type = research["document_type"]
         
         guidance = f"""
 🌍 **LOCALIZATION RESEARCH FOR {country.upper()} - {document_type.upper().replace('_', ' ').title()}**
@@ -291,12 +307,56 @@ class LocalizationResearchEngine:
         return guidance
     
     def save_research_results(self, research_results: Dict, filename: str = None):
-        """Save research results to a JSON file."""
-        if not filename:
-            timestamp = time.strftime("%Y%m%d_%H%M%S")
-            filename = f"localization_research_{research_results['document_type']}_{research_results['country']}_{timestamp}.json"
+        """
+        Save research results to the research store.
         
-        with open(f"research_data/{filename}", 'w', encoding='utf-8') as f:
-            json.dump(research_results, f, indent=2, ensure_ascii=False)
+        Results without any sources (every search failed) are not stored.
+        If a filename is given, the results are also exported to that JSON file.
+        """
+        if research_results["sources"]:
+            self.store.put(research_results)
         
-        print(f"💾 Research results saved to: {filename}")
+        if filename:
+            os.makedirs(RESEARCH_DATA_DIR, exist_ok=True)
+            with open(os.path.join(RESEARCH_DATA_DIR, filename), 'w', encoding='utf-8') as f:
+                json.dump(research_results, f, indent=2, ensure_ascii=False)
+            print(f"💾 Research results saved to: {filename}")
+        elif research_results["sources"]:
+            print(f"💾 Research results stored for {research_results['document_type']} / {research_results['country']}")
+
+class ResearchSession:
+    """
+    Runs localization research for one document type and country at most once
+    and derives both the guidance text and the saved JSON from that result.
+    """
+    
+    def __init__(self, engine: LocalizationResearchEngine, document_type: str, country: str):
+        self.engine = engine
+        self.document_type = document_type
+        self.country = country
+        self._results: Optional[Dict] = None
+        self._trace_start = len(engine.query_trace)
+    
+    @property
+    def results(self) -> Dict:
+        """Research findings, computed on first access."""
+        if self._results is None:
+            self._results = self.engine.research_country_requirements(self.document_type, self.country)
+        return self._results
+    
+    def get_guidance(self) -> str:
+        """Get formatted guidance for the researched document."""
+        return self.engine.format_localized_guidance(self.results)
+    
+    def save(self, filename: str = None):
+        """Save the research findings to disk."""
+        self.engine.save_research_results(self.results, filename)
+    
+    @property
+    def queries(self) -> List[str]:
+        """Search queries issued by this session, in order."""
+        return self.engine.query_trace[self._trace_start:]
+    
+    def query_counts(self) -> Dict[str, int]:
+        """Number of times each search query ran during this session."""
+        return dict(Counter(self.queries))
@@ -0,0 +1,333 @@
+import json
+import math
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from config.settings import METRICS_ENABLED, METRICS_NAMESPACE
+
+# Upper bounds in seconds; a final +Inf bucket is implicit
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def bucket_percentile(buckets: Sequence[float], counts: Sequence[int], pct: float) -> float:
+    """Estimate a percentile from histogram bucket counts by interpolating within its bucket."""
+    total = sum(counts)
+    if not total:
+        return 0.0
+
+    rank = pct / 100 * total
+    seen = 0
+    for index, bucket_count in enumerate(counts):
+        if bucket_count and seen + bucket_count >= rank:
+            lower = buckets[index - 1] if index > 0 else 0.0
+            if index == len(buckets):
+                # Values above the largest bucket are reported as its bound
+                return lower
+            upper = buckets[index]
+            return lower + (upper - lower) * (rank - seen) / bucket_count
+        seen += bucket_count
+    return buckets[-1]
+
+class Counter:
+    """Monotonically increasing count."""
+
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+class Gauge:
+    """Value that can go up and down, e.g. requests in flight."""
+
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+class Histogram:
+    """Fixed-bucket histogram of observed values."""
+
+    __slots__ = ("buckets", "counts", "sum", "count", "_lock")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def bucket_counts(self) -> List[int]:
+        """Get a consistent copy of the bucket counts."""
+        with self._lock:
+            return list(self.counts)
+
+    def percentile(self, pct: float) -> float:
+        """Estimate a percentile by interpolating within its bucket."""
+        return bucket_percentile(self.buckets, self.bucket_counts(), pct)
+
+class _Span:
+    """Times a block into a histogram and tracks in-flight and failed calls."""
+
+    __slots__ = ("registry", "name", "label_key", "in_flight", "start")
+
+    def __init__(self, registry: "MetricsRegistry", name: str, label_key: LabelKey):
+        self.registry = registry
+        self.name = name
+        self.label_key = label_key
+        self.in_flight = registry._lookup("gauge", Gauge, name + "_in_flight", label_key)
+        self.start = 0.0
+
+    def __enter__(self) -> "_Span":
+        self.in_flight.inc()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        elapsed = time.perf_counter() - self.start
+        registry = self.registry
+        self.in_flight.dec()
+        registry._lookup("histogram", Histogram, self.name + "_seconds", self.label_key).observe(elapsed)
+        # GeneratorExit and cancellation are not failures of the timed work
+        if exc_type is not None and issubclass(exc_type, Exception):
+            registry._lookup("counter", Counter, self.name + "_errors_total", self.label_key).inc()
+        return False
+
+class _NullSpan:
+    """Span used when metrics are disabled; does nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+NULL_SPAN = _NullSpan()
+
+class MetricsRegistry:
+    """
+    In-process registry of counters, gauges and histograms.
+
+    Metrics are identified by name plus keyword labels and created on first
+    use. Lookups of existing metrics take no registry-wide lock, so recording
+    is cheap enough to leave on; with enabled=False, spans and updates are
+    no-ops.
+    """
+
+    def __init__(self, enabled: bool = METRICS_ENABLED, namespace: str = METRICS_NAMESPACE):
+        """
+        Initialize the registry.
+
+        Args:
+            enabled: Record metrics; when False every call returns immediately
+            namespace: Prefix for metric names in the Prometheus output
+        """
+        self.enabled = enabled
+        self.namespace = namespace
+        self.started = time.time()
+        self._metrics: Dict[Tuple[str, LabelKey], Any] = {}
+        self._types: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, kind: str, factory, name: str, labels: Dict[str, Any]):
+        """Get or create a metric."""
+        return self._lookup(kind, factory, name, self._label_key(labels))
+
+    @staticmethod
+    def _label_key(labels: Dict[str, Any]) -> LabelKey:
+        if not labels:
+            return ()
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def _lookup(self, kind: str, factory, name: str, label_key: LabelKey):
+        """Get or create a metric by name and normalized labels."""
+        key = (name, label_key)
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = factory()
+                    self._metrics[key] = metric
+                    self._types[name] = kind
+        return metric
+
+    def counter(self, name: str, **labels) -> Counter:
+        return self._get("counter", Counter, name, labels)
+
+    def gauge(self, name: str, **labels) -> Gauge:
+        return self._get("gauge", Gauge, name, labels)
+
+    def histogram(self, name: str, **labels) -> Histogram:
+        return self._get("histogram", Histogram, name, labels)
+
+    def inc(self, name: str, amount: float = 1.0, **labels):
+        """Increment a counter if metrics are enabled."""
+        if self.enabled:
+            self.counter(name, **labels).inc(amount)
+
+    def observe(self, name: str, value: float, **labels):
+        """Record a histogram observation if metrics are enabled."""
+        if self.enabled:
+            self.histogram(name, **labels).observe(value)
+
+    def span(self, name: str, **labels):
+        """
+        Time a block as <name>_seconds, with <name>_in_flight and <name>_errors_total.
+
+        Usable with `with` in both sync and async code.
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name, self._label_key(labels))
+
+    def series(self, name: str) -> List[Tuple[Dict[str, str], Any]]:
+        """Get every (labels, metric) pair recorded under a name."""
+        return [(dict(label_key), metric) for (metric_name, label_key), metric in list(self._metrics.items())
+                if metric_name == name]
+
+    def reset(self):
+        """Drop all recorded metrics."""
+        with self._lock:
+            self._metrics.clear()
+            self._types.clear()
+            self.started = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get a JSON-serializable copy of all metrics.
+
+        Histograms include count, sum and estimated p50/p95/p99 in seconds.
+        """
+        series: Dict[str, list] = {}
+        for (name, label_key), metric in list(self._metrics.items()):
+            entry: Dict[str, Any] = {"labels": dict(label_key)}
+            if isinstance(metric, Histogram):
+                entry.update({
+                    "count": metric.count,
+                    "sum": metric.sum,
+                    "p50": metric.percentile(50),
+                    "p95": metric.percentile(95),
+                    "p99": metric.percentile(99)
+                })
+            else:
+                entry["value"] = metric.value
+            series.setdefault(name, []).append(entry)
+
+        return {
+            "enabled": self.enabled,
+            "started": self.started,
+            "uptime_seconds": time.time() - self.started,
+            "metrics": {name: {"type": self._types[name], "series": entries} for name, entries in series.items()}
+        }
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        def format_labels(label_key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = label_key + extra
+            if not pairs:
+                return ""
+            escaped = (
+                '{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+                for k, v in pairs
+            )
+            return "{" + ",".join(escaped) + "}"
+
+        by_name: Dict[str, list] = {}
+        for (name, label_key), metric in list(self._metrics.items()):
+            by_name.setdefault(name, []).append((label_key, metric))
+
+        lines = []
+        for name in sorted(by_name):
+            full_name = f"{self.namespace}_{name}" if self.namespace else name
+            lines.append(f"# TYPE {full_name} {self._types[name]}")
+            for label_key, metric in by_name[name]:
+                if isinstance(metric, Histogram):
+                    cumulative = 0
+                    for bound, bucket_count in zip(metric.buckets + (math.inf,), metric.counts):
+                        cumulative += bucket_count
+                        le = "+Inf" if bound == math.inf else f"{bound:g}"
+                        lines.append(f"{full_name}_bucket{format_labels(label_key, (('le', le),))} {cumulative}")
+                    lines.append(f"{full_name}_sum{format_labels(label_key)} {metric.sum:.6f}")
+                    lines.append(f"{full_name}_count{format_labels(label_key)} {metric.count}")
+                else:
+                    lines.append(f"{full_name}{format_labels(label_key)} {metric.value:g}")
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+
+def span(name: str, **labels):
+    """Time a block in the process-wide registry."""
+    return metrics.span(name, **labels)
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Serve /metrics (Prometheus text) and /metrics.json from a background thread.
+
+    Safe to call repeatedly and from concurrent Streamlit sessions; only the
+    first call starts a server.
+    """
+    global _server
+    if _server is not None:
+        return _server
+    with _server_lock:
+        if _server is None:
+            _server = _create_metrics_server(port, host)
+    return _server
+
+def _create_metrics_server(port: int, host: str) -> ThreadingHTTPServer:
+    """Bind the metrics server and start serving it from a daemon thread."""
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body = metrics.to_prometheus().encode("utf-8")
+                content_type = "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body = json.dumps(metrics.snapshot()).encode("utf-8")
+                content_type = "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,209 @@
+import socketserver
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+# Commands that modify their first key; WATCH on that key is invalidated by them
+WRITE_COMMANDS = {"SET", "DEL", "RPUSH", "ZADD", "ZREM"}
+
+class RespError(Exception):
+    """Error reply sent back to the client."""
+
+def read_command(rfile) -> Optional[List[bytes]]:
+    """Read one RESP array of bulk strings, or None when the client disconnects."""
+    line = rfile.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        # Inline command, e.g. typed into telnet
+        return line.split()
+    args = []
+    for _ in range(int(line[1:])):
+        length = int(rfile.readline()[1:])
+        args.append(rfile.read(length + 2)[:-2])
+    return args
+
+def encode_reply(value: Any) -> bytes:
+    """Encode a Python value as a RESP reply."""
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, RespError):
+        return f"-ERR {value}\r\n".encode("utf-8")
+    if isinstance(value, bool):
+        return b":1\r\n" if value else b":0\r\n"
+    if isinstance(value, int):
+        return f":{value}\r\n".encode("ascii")
+    if isinstance(value, str):
+        return f"+{value}\r\n".encode("utf-8")
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(encode_reply(item) for item in value)
+    raise TypeError(f"Cannot encode {type(value).__name__} as RESP")
+
+class RedisStandIn:
+    """
+    Minimal in-process server speaking the Redis protocol.
+
+    Implements the subset of commands RedisSessionStore uses (strings, lists,
+    sorted sets and WATCH/MULTI/EXEC transactions) so the Redis backend can be
+    exercised locally and in load tests without a Redis installation. Data is
+    kept in memory and lost when the server stops.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize the server.
+
+        Args:
+            host: Interface to listen on
+            port: Port to listen on, 0 picks a free one
+        """
+        self.host = host
+        self.port = port
+        self._data: Dict[bytes, Any] = {}
+        self._versions: Dict[bytes, int] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[socketserver.ThreadingTCPServer] = None
+
+    @property
+    def url(self) -> str:
+        """Connection URL for RedisSessionStore."""
+        return f"redis://{self.host}:{self.port}/0"
+
+    def start(self) -> "RedisStandIn":
+        """Start serving from a background thread."""
+        standin = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            disable_nagle_algorithm = True
+
+            def handle(self):
+                watched: Dict[bytes, int] = {}
+                queued: Optional[List[List[bytes]]] = None
+                while True:
+                    args = read_command(self.rfile)
+                    if not args:
+                        return
+                    name = args[0].decode("utf-8").upper()
+                    if name == "MULTI":
+                        queued = []
+                        reply: Any = "OK"
+                    elif name == "DISCARD":
+                        queued, reply = None, "OK"
+                        watched.clear()
+                    elif name == "EXEC":
+                        reply = standin._exec(watched, queued or [])
+                        queued = None
+                        watched.clear()
+                    elif name == "WATCH":
+                        with standin._lock:
+                            for key in args[1:]:
+                                watched[key] = standin._versions.get(key, 0)
+                        reply = "OK"
+                    elif name == "UNWATCH":
+                        watched.clear()
+                        reply = "OK"
+                    elif queued is not None:
+                        queued.append(args)
+                        reply = "QUEUED"
+                    else:
+                        with standin._lock:
+                            reply = standin._run(name, args[1:])
+                    self.wfile.write(encode_reply(reply))
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self._server = socketserver.ThreadingTCPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        """Stop the server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _exec(self, watched: Dict[bytes, int], queued: List[List[bytes]]) -> Optional[list]:
+        """Run a transaction atomically, or return None if a watched key changed."""
+        with self._lock:
+            if any(self._versions.get(key, 0) != version for key, version in watched.items()):
+                return None
+            return [self._run(args[0].decode("utf-8").upper(), args[1:]) for args in queued]
+
+    def _run(self, name: str, args: List[bytes]) -> Any:
+        """Execute a single command. Caller holds the lock."""
+        handler = getattr(self, f"_cmd_{name.lower()}", None)
+        if handler is None:
+            return RespError(f"unknown command '{name}'")
+        try:
+            reply = handler(*args)
+        except (TypeError, ValueError, IndexError) as e:
+            return RespError(f"wrong arguments for '{name}': {e}")
+        if name in WRITE_COMMANDS:
+            for key in args[:1] if name != "DEL" else args:
+                self._versions[key] = self._versions.get(key, 0) + 1
+        return reply
+
+    def _typed(self, key: bytes, kind: type):
+        value = self._data.get(key)
+        if value is not None and not isinstance(value, kind):
+            raise ValueError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+
+    def _cmd_ping(self, *args):
+        return args[0] if args else "PONG"
+
+    def _cmd_select(self, db):
+        return "OK"
+
+    def _cmd_auth(self, *args):
+        return "OK"
+
+    def _cmd_get(self, key):
+        return self._typed(key, bytes)
+
+    def _cmd_set(self, key, value):
+        self._data[key] = value
+        return "OK"
+
+    def _cmd_del(self, *keys):
+        return sum(1 for key in keys if self._data.pop(key, None) is not None)
+
+    def _cmd_rpush(self, key, *values):
+        items = self._typed(key, list)
+        if items is None:
+            items = self._data[key] = []
+        items.extend(values)
+        return len(items)
+
+    def _cmd_lrange(self, key, start, stop):
+        items = self._typed(key, list) or []
+        start, stop = int(start), int(stop)
+        stop = len(items) + stop if stop < 0 else stop
+        return items[start:stop + 1]
+
+    def _cmd_zadd(self, key, *pairs):
+        scores = self._typed(key, dict)
+        if scores is None:
+            scores = self._data[key] = {}
+        added = 0
+        for score, member in zip(pairs[::2], pairs[1::2]):
+            added += member not in scores
+            scores[member] = float(score)
+        return added
+
+    def _cmd_zrem(self, key, *members):
+        scores = self._typed(key, dict) or {}
+        return sum(1 for member in members if scores.pop(member, None) is not None)
+
+    def _cmd_zrevrange(self, key, start, stop, *options):
+        scores = self._typed(key, dict) or {}
+        ordered: List[Tuple[bytes, float]] = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        start, stop = int(start), int(stop)
+        stop = len(ordered) + stop if stop < 0 else stop
+        selected = ordered[start:stop + 1]
+        if options and options[0].upper() == b"WITHSCORES":
+            return [value for member, score in selected for value in (member, repr(score).encode("ascii"))]
+        return [member for member, _ in selected]
@@ -0,0 +1,152 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+from config.settings import RESEARCH_DATA_DIR, RESEARCH_CACHE_TTL, RESEARCH_MAX_ENTRIES_PER_KEY
+
+class ResearchStore:
+    """
+    Persistent store for localization research results.
+
+    Results are kept in a SQLite database indexed by normalized
+    (document_type, country), so the latest entry for a key is a single
+    indexed lookup instead of a directory scan.
+    """
+
+    def __init__(self,
+                 data_dir: str = RESEARCH_DATA_DIR,
+                 ttl: float = RESEARCH_CACHE_TTL,
+                 max_entries_per_key: int = RESEARCH_MAX_ENTRIES_PER_KEY):
+        """
+        Initialize the research store.
+
+        Args:
+            data_dir: Directory holding the index database
+            ttl: Seconds after which an entry is no longer considered fresh
+            max_entries_per_key: Number of entries retained per (document_type, country)
+        """
+        self.data_dir = data_dir
+        self.ttl = ttl
+        self.max_entries_per_key = max_entries_per_key
+        os.makedirs(data_dir, exist_ok=True)
+        self.db_path = os.path.join(data_dir, "research_index.sqlite3")
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS research (
+                    document_type TEXT NOT NULL,
+                    country TEXT NOT NULL,
+                    last_updated TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    payload TEXT NOT NULL,
+                    PRIMARY KEY (document_type, country, last_updated)
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS research_by_key
+                ON research (document_type, country, created_at)
+            """)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection to the index database, committing and closing it on exit."""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def normalize_key(document_type: str, country: str) -> tuple[str, str]:
+        """Normalize document type and country so equivalent spellings share an entry."""
+        doc_key = re.sub(r"[\s\-]+", "_", (document_type or "").strip().lower())
+        country_key = re.sub(r"\s+", " ", (country or "").strip().lower())
+        return doc_key, country_key
+
+    def get(self, document_type: str, country: str, max_age: Optional[float] = None) -> Optional[Dict]:
+        """
+        Get the latest research entry for a document type and country.
+
+        Args:
+            document_type: Type of document
+            country: Target country
+            max_age: Maximum entry age in seconds, or None to accept any age
+
+        Returns:
+            Research results or None if no matching entry exists
+        """
+        doc_key, country_key = self.normalize_key(document_type, country)
+        query = "SELECT payload FROM research WHERE document_type = ? AND country = ?"
+        params: List = [doc_key, country_key]
+        if max_age is not None:
+            query += " AND created_at >= ?"
+            params.append(time.time() - max_age)
+        query += " ORDER BY created_at DESC LIMIT 1"
+
+        with self._connect() as conn:
+            row = conn.execute(query, params).fetchone()
+
+        return json.loads(row[0]) if row else None
+
+    def get_fresh(self, document_type: str, country: str) -> Optional[Dict]:
+        """Get the latest entry if it is younger than the store's TTL."""
+        return self.get(document_type, country, max_age=self.ttl)
+
+    def put(self, research_results: Dict):
+        """
+        Store research results and prune old entries for the same key.
+
+        Storing the same results twice is a no-op, since entries are identified
+        by their key and last_updated timestamp.
+        """
+        doc_key, country_key = self.normalize_key(research_results["document_type"], research_results["country"])
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO research (document_type, country, last_updated, created_at, payload) VALUES (?, ?, ?, ?, ?)",
+                (doc_key, country_key, research_results.get("last_updated", ""), time.time(),
+                 json.dumps(research_results, ensure_ascii=False))
+            )
+            conn.execute("""
+                DELETE FROM research
+                WHERE document_type = ? AND country = ? AND rowid NOT IN (
+                    SELECT rowid FROM research
+                    WHERE document_type = ? AND country = ?
+                    ORDER BY created_at DESC LIMIT ?
+                )
+            """, (doc_key, country_key, doc_key, country_key, self.max_entries_per_key))
+
+    def purge_expired(self) -> int:
+        """Delete all entries older than the TTL and return how many were removed."""
+        with self._connect() as conn:
+            cursor = conn.execute("DELETE FROM research WHERE created_at < ?", (time.time() - self.ttl,))
+            return cursor.rowcount
+
+_research_store: Optional[ResearchStore] = None
+_research_store_lock = threading.Lock()
+
+def get_research_store() -> ResearchStore:
+    """Get the process-wide research store, creating it on first use."""
+    global _research_store
+    if _research_store is None:
+        with _research_store_lock:
+            if _research_store is None:
+                _research_store = ResearchStore()
+    return _research_store
+
+def set_research_store(store: Optional[ResearchStore]) -> Optional[ResearchStore]:
+    """
+    Replace the process-wide research store.
+
+    Returns:
+        The previous store, to restore afterwards
+    """
+    global _research_store
+    with _research_store_lock:
+        previous, _research_store = _research_store, store
+    return previous
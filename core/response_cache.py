@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+from config.settings import LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL, LLM_CACHE_DISK_PATH
+
+def _normalize(text: str) -> str:
+    """Collapse whitespace and case so trivially different prompts share a key."""
+    return re.sub(r"\s+", " ", text or "").strip().lower()
+
+def model_identity(llm: Any) -> str:
+    """
+    Describe a chat model by its type and identifying parameters (model name, temperature, ...).
+
+    Responses from differently configured models must not share cache entries.
+    """
+    params = getattr(llm, "_identifying_params", None) or {}
+    return json.dumps([getattr(llm, "_llm_type", type(llm).__name__), params], sort_keys=True, default=str)
+
+def make_cache_key(state: str, language: str, messages: List[Dict[str, str]], model: str = "") -> str:
+    """
+    Hash a request into a cache key.
+
+    Args:
+        state: Conversation state the request is made for
+        language: Response language
+        messages: Final prompt as {"role", "content"} dicts (system prompt,
+            trimmed history and user message)
+        model: Identity of the model answering it, see model_identity()
+
+    Returns:
+        Hex digest identifying the request
+    """
+    payload = [model, state, language] + [[m["role"], _normalize(m["content"])] for m in messages]
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """
+    LRU + TTL cache of LLM responses with an optional on-disk SQLite tier.
+
+    Entries evicted from memory stay on disk until they expire, and disk hits
+    are promoted back into memory.
+    """
+
+    def __init__(self,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES,
+                 ttl: float = LLM_CACHE_TTL,
+                 disk_path: Optional[str] = LLM_CACHE_DISK_PATH or None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum entries kept in memory
+            ttl: Seconds an entry stays valid
+            disk_path: SQLite file for the disk tier, or None for memory only
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_path = disk_path
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._entries: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        if disk_path:
+            directory = os.path.dirname(disk_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, expires_at REAL NOT NULL, response TEXT NOT NULL)"
+                )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection to the disk tier, committing and closing it on exit."""
+        conn = sqlite3.connect(self.disk_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached response, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                del self._entries[key]
+
+        if self.disk_path:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT expires_at, response FROM responses WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+            if row:
+                with self._lock:
+                    self._store_in_memory(key, row[0], row[1])
+                    self.hits += 1
+                    self.disk_hits += 1
+                return row[1]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, response: str):
+        """Store a response."""
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._store_in_memory(key, expires_at, response)
+
+        if self.disk_path:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, expires_at, response) VALUES (?, ?, ?)",
+                    (key, expires_at, response)
+                )
+                conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+
+    def _store_in_memory(self, key: str, expires_at: float, response: str):
+        """Insert into the memory tier, evicting the least recently used entries. Caller holds the lock."""
+        self._entries[key] = (expires_at, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.disk_hits = 0
+        if self.disk_path:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, float]:
+        """Get hit/miss counters and the current hit ratio."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "entries": len(self._entries),
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
+
+response_cache = ResponseCache()
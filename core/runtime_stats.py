@@ -0,0 +1,127 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from core.llm_limiter import llm_limiter
+from core.metrics import DEFAULT_BUCKETS, MetricsRegistry, bucket_percentile, metrics
+
+# Subsystems shown on the dashboard: the span they are timed by and the cache counter behind their hit ratio
+SUBSYSTEMS = {
+    "llm": {"name": "LLM Engine", "span": "llm_request", "cache": "llm_cache_requests_total"},
+    "research": {"name": "Research Engine", "span": "research_search", "cache": None},
+    "generator": {"name": "Document Generator", "span": "document_render", "cache": "template_cache_requests_total"},
+    "exporter": {"name": "Document Exporter", "span": "document_export", "cache": None}
+}
+
+class RuntimeStats:
+    """
+    Cheap, cached summary of the metrics registry for dashboards.
+
+    A snapshot aggregates each subsystem's span metrics across labels. It is
+    recomputed at most once per refresh interval, however often it is read,
+    and request rates are derived from the change since the previous one.
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None, refresh_interval: float = 2.0):
+        """
+        Initialize the summary.
+
+        Args:
+            registry: Metrics registry to read, defaults to the process-wide one
+            refresh_interval: Minimum seconds between recomputations
+        """
+        self.registry = registry or metrics
+        self.refresh_interval = refresh_interval
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._previous_counts: Dict[str, int] = {}
+        self._previous_time: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the latest snapshot, recomputing it if it is older than the refresh interval."""
+        now = time.monotonic()
+        snapshot = self._snapshot
+        if snapshot is not None and now - snapshot["monotonic"] < self.refresh_interval:
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is not None and now - self._snapshot["monotonic"] < self.refresh_interval:
+                return self._snapshot
+            self._snapshot = self._collect(now)
+            return self._snapshot
+
+    def _collect(self, now: float) -> Dict[str, Any]:
+        """Aggregate the registry into per-subsystem figures. Caller holds the lock."""
+        elapsed = now - self._previous_time if self._previous_time is not None else None
+        subsystems = {}
+
+        for key, config in SUBSYSTEMS.items():
+            counts = [0] * (len(DEFAULT_BUCKETS) + 1)
+            for _, histogram in self.registry.series(f"{config['span']}_seconds"):
+                counts = [a + b for a, b in zip(counts, histogram.bucket_counts())]
+            requests = sum(counts)
+            errors = sum(c.value for _, c in self.registry.series(f"{config['span']}_errors_total"))
+            in_flight = sum(g.value for _, g in self.registry.series(f"{config['span']}_in_flight"))
+
+            cache_hit_ratio = None
+            if config["cache"]:
+                hits = lookups = 0.0
+                for labels, counter in self.registry.series(config["cache"]):
+                    lookups += counter.value
+                    if labels.get("result") == "hit":
+                        hits += counter.value
+                cache_hit_ratio = hits / lookups if lookups else None
+
+            previous = self._previous_counts.get(key)
+            rate = (requests - previous) / elapsed if elapsed and previous is not None else 0.0
+            self._previous_counts[key] = requests
+
+            subsystems[key] = {
+                "name": config["name"],
+                "requests": requests,
+                "errors": int(errors),
+                "error_ratio": errors / requests if requests else 0.0,
+                "in_flight": int(in_flight),
+                "requests_per_second": rate,
+                "cache_hit_ratio": cache_hit_ratio,
+                "p50_ms": bucket_percentile(DEFAULT_BUCKETS, counts, 50) * 1000,
+                "p95_ms": bucket_percentile(DEFAULT_BUCKETS, counts, 95) * 1000,
+                "p99_ms": bucket_percentile(DEFAULT_BUCKETS, counts, 99) * 1000
+            }
+
+        subsystems["llm"]["queued"] = llm_limiter.waiting
+        self._previous_time = now
+
+        total = sum(s["requests"] for s in subsystems.values())
+        failed = sum(s["errors"] for s in subsystems.values())
+        return {
+            "monotonic": now,
+            "timestamp": time.time(),
+            "enabled": self.registry.enabled,
+            "uptime_seconds": time.time() - self.registry.started,
+            "success_ratio": (total - failed) / total if total else None,
+            "subsystems": subsystems
+        }
+
+runtime_stats = RuntimeStats()
+
+def get_runtime_snapshot() -> Dict[str, Any]:
+    """Get the process-wide runtime snapshot."""
+    return runtime_stats.snapshot()
+
+def subsystem_rows(snapshot: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Format a snapshot as one display row per subsystem."""
+    rows = []
+    for stats in snapshot["subsystems"].values():
+        ratio = stats["cache_hit_ratio"]
+        rows.append({
+            "Subsystem": stats["name"],
+            "Requests": stats["requests"],
+            "Req/s": round(stats["requests_per_second"], 2),
+            "In flight": stats["in_flight"],
+            "Errors": stats["errors"],
+            "Cache hit": f"{ratio:.0%}" if ratio is not None else "—",
+            "p50 ms": round(stats["p50_ms"], 1),
+            "p95 ms": round(stats["p95_ms"], 1),
+            "p99 ms": round(stats["p99_ms"], 1)
+        })
+    return rows
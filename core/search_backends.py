@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Protocol, Tuple, Union, runtime_checkable
+from config.settings import SEARCH_BACKEND, SEARCH_FIXTURE_PATH
+from core.latency import LatencyDistribution
+
+class SearchBackendError(Exception):
+    """Raised when a search backend fails to answer a query."""
+
+@runtime_checkable
+class SearchBackend(Protocol):
+    """
+    Interface for web search providers used by LocalizationResearchEngine.
+
+    Implementations return a list of dicts with 'title', 'body' and 'link' keys.
+    """
+
+    def search(self, query: str, max_results: int = 5) -> List[Dict]:
+        ...
+
+class DuckDuckGoBackend:
+    """Live web search through DuckDuckGo."""
+
+    def __init__(self):
+        import requests
+        from duckduckgo_search import DDGS
+
+        self.search_engine = DDGS()
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        })
+
+    def search(self, query: str, max_results: int = 5) -> List[Dict]:
+        """Search DuckDuckGo and normalize the result fields."""
+        results = []
+        for result in self.search_engine.text(query, max_results=max_results) or []:
+            results.append({
+                'title': result.get('title', ''),
+                'body': result.get('body', ''),
+                'link': result.get('href', result.get('link', ''))
+            })
+        return results
+
+class ReplaySearchBackend:
+    """
+    Offline search backend that replays canned results from a JSON fixture.
+
+    The fixture maps query strings to result lists. A "*" entry, if present,
+    answers any query without its own entry. Latency and failures can be
+    simulated to exercise the research pipeline under repeatable conditions.
+    """
+
+    def __init__(self,
+                 fixture_path: str,
+                 latency: Union[float, Tuple[float, float], LatencyDistribution] = 0.0,
+                 failure_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        """
+        Initialize the replay backend.
+
+        Args:
+            fixture_path: Path to a JSON fixture file
+            latency: Fixed delay in seconds, a (min, max) range sampled uniformly,
+                or a LatencyDistribution
+            failure_rate: Probability in [0, 1] that a query raises SearchBackendError
+            seed: Seed for latency and failure sampling
+        """
+        with open(fixture_path, 'r', encoding='utf-8') as f:
+            self.fixtures: Dict[str, List[Dict]] = json.load(f)
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _sample(self) -> Tuple[float, bool]:
+        """Draw a delay and a failure decision for one query."""
+        with self._lock:
+            if isinstance(self.latency, LatencyDistribution):
+                delay = self.latency.sample()
+            elif isinstance(self.latency, (tuple, list)):
+                delay = self._random.uniform(*self.latency)
+            else:
+                delay = float(self.latency)
+            fail = self._random.random() < self.failure_rate
+        return delay, fail
+
+    def search(self, query: str, max_results: int = 5) -> List[Dict]:
+        """Return the recorded results for a query."""
+        delay, fail = self._sample()
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            raise SearchBackendError(f"Simulated failure for query: {query}")
+
+        results = self.fixtures.get(query, self.fixtures.get("*", []))
+        return [dict(result) for result in results[:max_results]]
+
+class StubSearchBackend:
+    """
+    Offline search backend that synthesizes results without a fixture.
+
+    Each query gets the same results on every call, built from sentences that
+    contain the research indicators, so extraction has realistic work to do.
+    """
+
+    SENTENCES = [
+        "A written agreement is required and must include the full names of all parties.",
+        "Each section of the template should follow the structure set out in the civil code.",
+        "The clause on termination is a mandatory provision under national law.",
+        "Compliance with data protection regulation is necessary for every contract.",
+        "The liability clause must state the duty and obligation of each party.",
+        "Statutory notice periods apply and the format of the notice is regulated by statute.",
+        "An article on governing law and jurisdiction is an essential part of the outline.",
+        "The condition for renewal is a common term that regulatory guidance recommends."
+    ]
+
+    def __init__(self,
+                 latency: Union[float, LatencyDistribution] = 0.0,
+                 failure_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        """
+        Initialize the stub backend.
+
+        Args:
+            latency: Fixed delay in seconds or a LatencyDistribution
+            failure_rate: Probability in [0, 1] that a query raises SearchBackendError
+            seed: Seed for latency and failure sampling
+        """
+        if not isinstance(latency, LatencyDistribution):
+            latency = LatencyDistribution("fixed", (latency,))
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def search(self, query: str, max_results: int = 5) -> List[Dict]:
+        """Return synthetic results derived from the query."""
+        delay = self.latency.sample()
+        with self._lock:
+            fail = self._random.random() < self.failure_rate
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            raise SearchBackendError(f"Simulated failure for query: {query}")
+
+        offset = int(hashlib.sha256(query.encode("utf-8")).hexdigest()[:8], 16)
+        results = []
+        for i in range(max_results):
+            body = " ".join(self.SENTENCES[(offset + i + j) % len(self.SENTENCES)] for j in range(3))
+            results.append({
+                'title': f"{query} - result {i + 1}",
+                'body': body,
+                'link': f"https://example.org/{offset:08x}/{i + 1}"
+            })
+        return results
+
+class RecordingSearchBackend:
+    """Wraps another backend and records its answers into a replay fixture."""
+
+    def __init__(self, backend: SearchBackend, fixture_path: str):
+        self.backend = backend
+        self.fixture_path = fixture_path
+        self.recorded: Dict[str, List[Dict]] = {}
+        self._lock = threading.Lock()
+
+    def search(self, query: str, max_results: int = 5) -> List[Dict]:
+        """Forward the query and keep a copy of the results."""
+        results = self.backend.search(query, max_results=max_results)
+        with self._lock:
+            self.recorded[query] = results
+        return results
+
+    def save(self):
+        """Write all recorded results to the fixture file."""
+        directory = os.path.dirname(self.fixture_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            with open(self.fixture_path, 'w', encoding='utf-8') as f:
+                json.dump(self.recorded, f, indent=2, ensure_ascii=False)
+
+def create_search_backend(name: str = SEARCH_BACKEND, fixture_path: str = SEARCH_FIXTURE_PATH) -> SearchBackend:
+    """
+    Create a search backend by name.
+
+    Args:
+        name: Backend name ('duckduckgo', 'replay' or 'stub')
+        fixture_path: Fixture file used by the replay backend
+
+    Returns:
+        Search backend instance
+    """
+    if name == "replay":
+        return ReplaySearchBackend(fixture_path)
+    if name == "stub":
+        return StubSearchBackend()
+    if name == "duckduckgo":
+        return DuckDuckGoBackend()
+    raise ValueError(f"Unknown search backend: {name}")
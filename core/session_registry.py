@@ -0,0 +1,357 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+from config.settings import (
+    SESSION_IDLE_TIMEOUT, SESSION_MEMORY_LIMIT_MB, SESSION_PERSISTENCE_ENABLED, SESSION_REGISTRY_MAX_SESSIONS
+)
+from core.ai_engine import AIEngine
+from core.conversation import ConversationManager
+from core.document_store import get_document_store
+from core.metrics import metrics
+from core.session_store import InMemorySessionStore, SessionConflictError, SessionStore, create_session_store
+
+# Rough fixed cost of a ConversationManager and its history object, excluding messages
+SESSION_BASE_BYTES = 4096
+
+def estimate_session_bytes(manager: ConversationManager) -> int:
+    """
+    Approximate the memory a conversation holds in this process.
+
+    Counts the resident history, collected answers and the generated document
+    if it is in the document store's cache. Shared objects such as the AI
+    engine and the document question definitions are not counted.
+    """
+    size = SESSION_BASE_BYTES + manager.conversation_history.resident_bytes
+    size += sum(sys.getsizeof(key) + sys.getsizeof(value) for key, value in manager.collected_data.items())
+    if manager.generated_document_id:
+        size += get_document_store().cached_bytes(manager.generated_document_id)
+    return size
+
+class _Entry:
+    """A resident session with its bookkeeping."""
+
+    __slots__ = ("manager", "lock", "last_used", "size", "in_use")
+
+    def __init__(self, manager: ConversationManager):
+        self.manager = manager
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+        self.size = estimate_session_bytes(manager)
+        self.in_use = 0
+
+class SessionRegistry:
+    """
+    Bounded set of live conversations in one worker.
+
+    Sessions are kept in least-recently-used order. Sessions idle for longer
+    than idle_timeout, and the least recently used ones whenever the count
+    or the estimated memory exceeds its limit, are saved to the session
+    store and dropped. The next message for an evicted session rehydrates
+    it from the store. All sessions share one AI engine.
+    """
+
+    def __init__(self,
+                 session_store: Optional[SessionStore] = None,
+                 ai_engine: Optional[AIEngine] = None,
+                 max_sessions: int = SESSION_REGISTRY_MAX_SESSIONS,
+                 idle_timeout: float = SESSION_IDLE_TIMEOUT,
+                 memory_limit_mb: float = SESSION_MEMORY_LIMIT_MB,
+                 persist_turns: bool = SESSION_PERSISTENCE_ENABLED):
+        """
+        Initialize the registry.
+
+        Args:
+            session_store: Store evicted sessions are saved to; defaults to the
+                configured store, or an in-memory one if persist_turns is False
+            ai_engine: Engine shared by every session, created on first use if omitted
+            max_sessions: Maximum resident sessions, 0 for no limit
+            idle_timeout: Seconds without a message after which a session is evicted, 0 to disable
+            memory_limit_mb: Ceiling for the estimated memory of all resident sessions, 0 for no limit
+            persist_turns: Save sessions after every turn, not only on eviction
+        """
+        self.session_store = session_store or (create_session_store() if persist_turns else InMemorySessionStore())
+        self._ai_engine = ai_engine
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.memory_limit_bytes = int(memory_limit_mb * 1024 * 1024)
+        self.persist_turns = persist_turns
+        self._sessions: "OrderedDict[str, _Entry]" = OrderedDict()
+        # Evicted sessions not yet saved; saves run after the registry lock is released
+        self._unsaved: Dict[str, _Entry] = {}
+        self._pending_saves: List[tuple] = []
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.evictions: Dict[str, int] = {"idle": 0, "count": 0, "memory": 0}
+        self.rehydrations = 0
+
+    @property
+    def ai_engine(self) -> AIEngine:
+        if self._ai_engine is None:
+            self._ai_engine = AIEngine()
+        return self._ai_engine
+
+    def _attached_store(self) -> Optional[SessionStore]:
+        """Store given to managers for per-turn saves."""
+        return self.session_store if self.persist_turns else None
+
+    def create(self, language: str = "EN") -> ConversationManager:
+        """Start a new conversation and register it."""
+        manager = ConversationManager(language, self.ai_engine, self._attached_store())
+        with self._lock:
+            self._add(manager)
+            self._enforce_limits()
+        self._save_evicted()
+        return manager
+
+    def get(self, session_id: str, language: str = "EN", create: bool = True) -> Optional[ConversationManager]:
+        """
+        Get a conversation, rehydrating it from the session store if it was evicted.
+
+        Args:
+            session_id: Conversation id
+            language: Language if a new conversation has to be started
+            create: Start a new conversation under this id if none is stored
+
+        Returns:
+            Conversation manager, or None if it does not exist and create is False
+        """
+        with self._lock:
+            self._evict_idle()
+            entry = self._resident(session_id)
+        self._save_evicted()
+        if entry is not None:
+            return entry.manager
+
+        manager = ConversationManager.resume(session_id, self.session_store, self.ai_engine)
+        rehydrated = manager is not None
+        if rehydrated:
+            manager.session_store = self._attached_store()
+        elif create:
+            manager = ConversationManager(language, self.ai_engine, self._attached_store(), session_id)
+        else:
+            return None
+
+        with self._lock:
+            # Another thread may have rehydrated it meanwhile; keep the first one
+            entry = self._resident(session_id)
+            if entry is None:
+                if rehydrated:
+                    self.rehydrations += 1
+                    metrics.inc("sessions_rehydrated_total")
+                self._add(manager)
+                self._enforce_limits(keep=session_id)
+        self._save_evicted()
+        return entry.manager if entry is not None else manager
+
+    def process_user_message(self,
+                             session_id: str,
+                             user_message: str,
+                             on_token: Optional[Callable[[str], None]] = None,
+                             language: str = "EN") -> tuple[str, bool]:
+        """
+        Process one message for a conversation, loading it if needed.
+
+        The session cannot be evicted while the message is processed, and
+        messages for the same session are processed one at a time.
+
+        Returns:
+            Tuple of (AI response, is_conversation_complete)
+        """
+        manager = self.get(session_id, language)
+        with self._lock:
+            entry = self._resident(session_id)
+            if entry is None:
+                # Evicted and saved between get() and here; register it again
+                self._add(manager)
+                entry = self._sessions[session_id]
+            entry.in_use += 1
+
+        try:
+            with entry.lock:
+                return entry.manager.process_user_message(user_message, on_token=on_token)
+        finally:
+            with self._lock:
+                entry.in_use -= 1
+                # Skip the bookkeeping if the session was removed meanwhile
+                if self._sessions.get(session_id) is entry:
+                    self._resize(entry)
+                    self._touch(session_id, entry)
+                self._enforce_limits(keep=session_id)
+            self._save_evicted()
+
+    def remove(self, session_id: str, delete: bool = False):
+        """
+        Drop a conversation from memory without saving it.
+
+        Args:
+            session_id: Conversation id
+            delete: Also delete it from the session store
+        """
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            if entry is not None:
+                self._memory_bytes -= entry.size
+                self._update_gauges()
+            self._unsaved.pop(session_id, None)
+        if delete:
+            self.session_store.delete(session_id)
+
+    def evict(self, session_id: str, reason: str = "manual") -> bool:
+        """Save a conversation to the session store and drop it from memory."""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None or entry.in_use:
+                return False
+            self._evict(session_id, entry, reason)
+        self._save_evicted()
+        return True
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Evict every session idle for longer than the idle timeout, e.g. from a periodic job."""
+        with self._lock:
+            evicted = self._evict_idle(now)
+        self._save_evicted()
+        return evicted
+
+    def _evict_idle(self, now: Optional[float] = None) -> int:
+        """Evict idle sessions. Caller holds the lock."""
+        if not self.idle_timeout:
+            return 0
+        now = time.monotonic() if now is None else now
+        evicted = 0
+        # Sessions are in last-used order, so the idle ones are at the front
+        for session_id, entry in list(self._sessions.items()):
+            if now - entry.last_used <= self.idle_timeout:
+                break
+            if not entry.in_use:
+                self._evict(session_id, entry, "idle")
+                evicted += 1
+        return evicted
+
+    def _resident(self, session_id: str) -> Optional[_Entry]:
+        """
+        Get a session held in memory and mark it used. Caller holds the lock.
+
+        A session evicted but not yet saved is taken back instead of being
+        rehydrated from an outdated stored copy.
+        """
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            entry = self._unsaved.pop(session_id, None)
+            if entry is None:
+                return None
+            self._sessions[session_id] = entry
+            self._memory_bytes += entry.size
+            self._update_gauges()
+            self._touch(session_id, entry)
+            self._enforce_limits(keep=session_id)
+            return entry
+        self._touch(session_id, entry)
+        return entry
+
+    def _add(self, manager: ConversationManager):
+        entry = _Entry(manager)
+        self._sessions[manager.session_id] = entry
+        self._memory_bytes += entry.size
+        self._update_gauges()
+
+    def _touch(self, session_id: str, entry: _Entry):
+        entry.last_used = time.monotonic()
+        self._sessions.move_to_end(session_id)
+
+    def _resize(self, entry: _Entry):
+        size = estimate_session_bytes(entry.manager)
+        self._memory_bytes += size - entry.size
+        entry.size = size
+        self._update_gauges()
+
+    def _evict(self, session_id: str, entry: _Entry, reason: str):
+        """
+        Drop a session. Caller holds the lock.
+
+        Without per-turn persistence the session is queued for saving;
+        callers run _save_evicted() once they have released the lock.
+        """
+        del self._sessions[session_id]
+        self._memory_bytes -= entry.size
+        self.evictions[reason] = self.evictions.get(reason, 0) + 1
+        metrics.inc("sessions_evicted_total", reason=reason)
+        self._update_gauges()
+        # With per-turn persistence the store is already up to date
+        if not self.persist_turns:
+            self._unsaved[session_id] = entry
+            self._pending_saves.append((session_id, entry))
+
+    def _save_evicted(self):
+        """Save the sessions evicted since the last call. Caller does not hold the lock."""
+        if not self._pending_saves:
+            return
+        with self._lock:
+            pending, self._pending_saves = self._pending_saves, []
+
+        for session_id, entry in pending:
+            manager = entry.manager
+            try:
+                # The session lock keeps a turn from changing it mid-save if it was taken back meanwhile
+                with entry.lock:
+                    manager.revision = self.session_store.save(manager.to_snapshot(materialize=False))
+            except SessionConflictError:
+                # Another worker has a newer version; it is the one to keep
+                pass
+            except Exception as e:
+                print(f"Session eviction error: {e}")
+                with self._lock:
+                    # Keep it in memory rather than lose it
+                    if self._unsaved.pop(session_id, None) is entry:
+                        self._sessions[session_id] = entry
+                        self._memory_bytes += entry.size
+                        self._update_gauges()
+                continue
+
+            with self._lock:
+                if self._unsaved.get(session_id) is entry:
+                    del self._unsaved[session_id]
+
+    def _enforce_limits(self, keep: Optional[str] = None):
+        """Evict least recently used sessions until the count and memory limits hold. Caller holds the lock."""
+        for session_id, entry in list(self._sessions.items()):
+            over_count = self.max_sessions and len(self._sessions) > self.max_sessions
+            over_memory = self.memory_limit_bytes and self._memory_bytes > self.memory_limit_bytes
+            if not over_count and not over_memory:
+                return
+            if session_id == keep or entry.in_use:
+                continue
+            self._evict(session_id, entry, "count" if over_count else "memory")
+
+        if self.memory_limit_bytes and self._memory_bytes > self.memory_limit_bytes:
+            print(f"⚠️ Session memory {self._memory_bytes / 1048576:.1f} MB is above the "
+                  f"{self.memory_limit_bytes / 1048576:.1f} MB limit; remaining sessions are in use")
+
+    def _update_gauges(self):
+        if not metrics.enabled:
+            return
+        metrics.gauge("sessions_resident").set(len(self._sessions))
+        metrics.gauge("sessions_memory_bytes").set(self._memory_bytes)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get resident session count, memory use and eviction counts."""
+        with self._lock:
+            sizes = [entry.size for entry in self._sessions.values()]
+            return {
+                "sessions": len(sizes),
+                "max_sessions": self.max_sessions,
+                "memory_bytes": self._memory_bytes,
+                "memory_limit_bytes": self.memory_limit_bytes,
+                "largest_session_bytes": max(sizes, default=0),
+                "evictions": dict(self.evictions),
+                "rehydrations": self.rehydrations
+            }
+
+    def sessions(self) -> List[Dict[str, Any]]:
+        """List resident sessions, least recently used first."""
+        now = time.monotonic()
+        with self._lock:
+            return [{"session_id": session_id, "bytes": entry.size, "idle_seconds": round(now - entry.last_used, 1),
+                     "in_use": bool(entry.in_use)} for session_id, entry in self._sessions.items()]
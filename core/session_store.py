@@ -0,0 +1,532 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Protocol, Sequence, Tuple, runtime_checkable
+from urllib.parse import urlparse
+from config.settings import SESSION_DB_PATH, SESSION_REDIS_PREFIX, SESSION_REDIS_URL, SESSION_STORE_BACKEND
+
+# Bump when the snapshot layout changes; restore rejects versions it does not know
+SNAPSHOT_VERSION = 2
+# Version 1 stored the full generated document instead of its document store id
+SUPPORTED_SNAPSHOT_VERSIONS = (1, 2)
+
+def encode_snapshot(snapshot: Dict[str, Any]) -> str:
+    """Serialize a conversation snapshot as compact JSON."""
+    return json.dumps(snapshot, ensure_ascii=False, separators=(",", ":"), default=str)
+
+def decode_snapshot(data: str) -> Dict[str, Any]:
+    """Parse a conversation snapshot, checking its format version."""
+    snapshot = json.loads(data)
+    version = snapshot.get("version")
+    if version not in SUPPORTED_SNAPSHOT_VERSIONS:
+        raise ValueError(f"Unsupported conversation snapshot version: {version}")
+    return snapshot
+
+def split_snapshot(snapshot: Dict[str, Any]) -> Tuple[Dict[str, Any], Sequence[Dict[str, str]]]:
+    """Split a snapshot into its header (without revision) and its history."""
+    header = {key: value for key, value in snapshot.items() if key not in ("conversation_history", "revision")}
+    return header, snapshot.get("conversation_history", [])
+
+class SessionConflictError(Exception):
+    """Raised when a session was saved by another worker since it was loaded."""
+
+@runtime_checkable
+class SessionStore(Protocol):
+    """
+    Interface for conversation session backends.
+
+    Every saved session carries a revision that increases by one per save.
+    save() only succeeds if the snapshot's revision matches the stored one,
+    so two workers that load the same revision cannot both write it back.
+
+    load() with recent set returns only the last messages of the history and
+    the total in message_count; load_messages() pages in the older ones.
+    """
+
+    def load(self, session_id: str, recent: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        ...
+
+    def load_messages(self, session_id: str, start: int, stop: int) -> List[Dict[str, str]]:
+        ...
+
+    def save(self, snapshot: Dict[str, Any]) -> int:
+        ...
+
+    def delete(self, session_id: str):
+        ...
+
+    def list_sessions(self, limit: int = 100) -> List[Dict[str, Any]]:
+        ...
+
+def check_revision(session_id: str, expected: int, stored: int):
+    """Raise SessionConflictError unless the snapshot was taken from the stored revision."""
+    if expected != stored:
+        raise SessionConflictError(
+            f"Session {session_id} is at revision {stored}, snapshot was taken at revision {expected}"
+        )
+
+class InMemorySessionStore:
+    """
+    Session store kept in this process.
+
+    Only useful with a single worker, e.g. in tests and load tests.
+    Snapshots are stored encoded so callers never share mutable state.
+    """
+
+    def __init__(self):
+        self._sessions: Dict[str, Tuple[int, float, str]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, session_id: str, recent: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Load a conversation snapshot, or None if the session does not exist."""
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        snapshot = decode_snapshot(entry[2])
+        snapshot["revision"] = entry[0]
+        if recent is not None:
+            history = snapshot["conversation_history"]
+            snapshot["message_count"] = len(history)
+            snapshot["conversation_history"] = history[max(len(history) - recent, 0):]
+        return snapshot
+
+    def load_messages(self, session_id: str, start: int, stop: int) -> List[Dict[str, str]]:
+        """Load messages [start, stop) of a stored session."""
+        entry = self._sessions.get(session_id)
+        return decode_snapshot(entry[2])["conversation_history"][start:stop] if entry else []
+
+    def save(self, snapshot: Dict[str, Any]) -> int:
+        """
+        Persist a conversation snapshot.
+
+        Returns:
+            The new revision of the session
+        """
+        session_id = snapshot["session_id"]
+        header, history = split_snapshot(snapshot)
+        with self._lock:
+            stored = self._sessions.get(session_id, (0,))[0]
+            check_revision(session_id, snapshot.get("revision", 0), stored)
+            self._sessions[session_id] = (stored + 1, time.time(),
+                                          encode_snapshot({**header, "conversation_history": list(history)}))
+        return stored + 1
+
+    def delete(self, session_id: str):
+        """Remove a session."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def list_sessions(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """List the most recently updated sessions with their message counts."""
+        entries = sorted(self._sessions.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return [{"session_id": sid, "message_count": len(json.loads(data)["conversation_history"]),
+                 "updated_at": updated} for sid, (_, updated, data) in entries]
+
+class SQLiteSessionStore:
+    """
+    SQLite store for resumable conversation sessions.
+
+    A session is a header row holding the manager's state without its
+    history, plus one row per message. Saving after a turn rewrites the
+    small header and appends only the messages added since the last save.
+    Workers on the same host can share the database file.
+    """
+
+    def __init__(self, db_path: str = SESSION_DB_PATH):
+        """
+        Initialize the session store.
+
+        Args:
+            db_path: SQLite database file
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL,
+                    header TEXT NOT NULL,
+                    message_count INTEGER NOT NULL,
+                    updated_at REAL NOT NULL,
+                    revision INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+            if "revision" not in columns:
+                # Databases created before optimistic concurrency was added
+                conn.execute("ALTER TABLE sessions ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS messages (
+                    session_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    role TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    PRIMARY KEY (session_id, seq)
+                ) WITHOUT ROWID
+            """)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection to the session database, committing and closing it on exit."""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def save(self, snapshot: Dict[str, Any]) -> int:
+        """
+        Persist a conversation snapshot.
+
+        The history is append-only during a conversation, so only messages
+        beyond the stored count are written. A shorter history (after a
+        reset) replaces the stored messages.
+
+        Args:
+            snapshot: Snapshot from ConversationManager.to_snapshot()
+
+        Returns:
+            The new revision of the session
+
+        Raises:
+            SessionConflictError: If the session was saved since the snapshot was loaded
+        """
+        session_id = snapshot["session_id"]
+        header, history = split_snapshot(snapshot)
+
+        with self._connect() as conn:
+            # Take the write lock before reading so the revision check and the write are atomic
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT message_count, revision FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            stored, revision = row if row else (0, 0)
+            check_revision(session_id, snapshot.get("revision", 0), revision)
+            if len(history) < stored:
+                conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+                stored = 0
+
+            conn.executemany(
+                "INSERT OR REPLACE INTO messages (session_id, seq, role, content) VALUES (?, ?, ?, ?)",
+                [(session_id, seq, message["role"], message["content"])
+                 for seq, message in enumerate(history[stored:], start=stored)]
+            )
+            conn.execute(
+                """
+                INSERT INTO sessions (session_id, version, header, message_count, updated_at, revision)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (session_id) DO UPDATE SET
+                    version = excluded.version,
+                    header = excluded.header,
+                    message_count = excluded.message_count,
+                    updated_at = excluded.updated_at,
+                    revision = excluded.revision
+                """,
+                (session_id, snapshot["version"], encode_snapshot(header), len(history), time.time(), revision + 1)
+            )
+        return revision + 1
+
+    def load(self, session_id: str, recent: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Load a conversation snapshot.
+
+        Args:
+            session_id: Conversation id
+            recent: Load only this many of the latest messages and set message_count
+
+        Returns:
+            Snapshot, or None if the session does not exist
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT header, message_count, revision FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            start = 0 if recent is None else max(row[1] - recent, 0)
+            messages = conn.execute(
+                "SELECT role, content FROM messages WHERE session_id = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                (session_id, start, row[1])
+            ).fetchall()
+
+        snapshot = decode_snapshot(row[0])
+        snapshot["conversation_history"] = [{"role": role, "content": content} for role, content in messages]
+        snapshot["revision"] = row[2]
+        if recent is not None:
+            snapshot["message_count"] = row[1]
+        return snapshot
+
+    def load_messages(self, session_id: str, start: int, stop: int) -> List[Dict[str, str]]:
+        """Load messages [start, stop) of a stored session."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT role, content FROM messages WHERE session_id = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                (session_id, start, stop)
+            ).fetchall()
+        return [{"role": role, "content": content} for role, content in rows]
+
+    def delete(self, session_id: str):
+        """Remove a session and its messages."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def list_sessions(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """List the most recently updated sessions with their message counts."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT session_id, message_count, updated_at FROM sessions ORDER BY updated_at DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [{"session_id": sid, "message_count": count, "updated_at": updated} for sid, count, updated in rows]
+
+class RedisError(Exception):
+    """Error reply from a Redis server."""
+
+class RespConnection:
+    """Minimal blocking Redis protocol (RESP2) connection."""
+
+    def __init__(self, url: str):
+        """
+        Connect to a server.
+
+        Args:
+            url: Server URL, e.g. redis://:password@localhost:6379/0
+        """
+        parsed = urlparse(url)
+        self.sock = socket.create_connection((parsed.hostname or "127.0.0.1", parsed.port or 6379), timeout=10)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.rfile = self.sock.makefile("rb")
+        try:
+            if parsed.password:
+                self.execute("AUTH", parsed.password)
+            database = parsed.path.lstrip("/")
+            if database and database != "0":
+                self.execute("SELECT", database)
+        except Exception:
+            self.close()
+            raise
+
+    def execute(self, *args) -> Any:
+        """Send a command and return its decoded reply."""
+        self.sock.sendall(self._encode(args))
+        return self._read_reply()
+
+    def pipeline(self, commands: List[Tuple]) -> List[Any]:
+        """Send several commands in one round trip and return their replies."""
+        self.sock.sendall(b"".join(self._encode(args) for args in commands))
+        replies = [self._read_reply(raise_errors=False) for _ in commands]
+        # Raise only once every reply is read, so the connection stays usable
+        for reply in replies:
+            if isinstance(reply, RedisError):
+                raise reply
+        return replies
+
+    @staticmethod
+    def _encode(args) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+
+    def _read_reply(self, raise_errors: bool = True) -> Any:
+        line = self.rfile.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode("utf-8")
+        if kind == b"-":
+            error = RedisError(rest.decode("utf-8"))
+            if raise_errors:
+                raise error
+            return error
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            return None if length < 0 else self.rfile.read(length + 2)[:-2]
+        if kind == b"*":
+            length = int(rest)
+            return None if length < 0 else [self._read_reply(raise_errors=False) for _ in range(length)]
+        raise RedisError(f"Unexpected reply: {line!r}")
+
+    def close(self):
+        self.rfile.close()
+        self.sock.close()
+
+class RedisSessionStore:
+    """
+    Session store on a Redis-protocol server, shared by any number of workers.
+
+    Each session is a header string plus a message list; an index sorted set
+    orders sessions by last update. Saves WATCH the header and write inside
+    MULTI/EXEC, so a concurrent save by another worker aborts the transaction.
+    Runs against Redis or against core.redis_standin.RedisStandIn locally.
+    """
+
+    def __init__(self, url: str = SESSION_REDIS_URL, prefix: str = SESSION_REDIS_PREFIX):
+        """
+        Initialize the session store.
+
+        Args:
+            url: Server URL
+            prefix: Prefix for every key written by the store
+        """
+        self.url = url
+        self.prefix = prefix
+        # WATCH state is per connection, so each thread gets its own
+        self._local = threading.local()
+
+    def _connection(self) -> RespConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = RespConnection(self.url)
+        return conn
+
+    def _reset_connection(self):
+        """Close this thread's connection so the next call reconnects."""
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+    def _execute(self, *args) -> Any:
+        try:
+            return self._connection().execute(*args)
+        except Exception:
+            # The reply stream or WATCH state may be out of step; start over
+            self._reset_connection()
+            raise
+
+    def _pipeline(self, commands: List[Tuple]) -> List[Any]:
+        try:
+            return self._connection().pipeline(commands)
+        except Exception:
+            self._reset_connection()
+            raise
+
+    def _keys(self, session_id: str) -> Tuple[str, str]:
+        header_key = f"{self.prefix}:{session_id}"
+        return header_key, header_key + ":messages"
+
+    def load(self, session_id: str, recent: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Load a conversation snapshot.
+
+        Args:
+            session_id: Conversation id
+            recent: Load only this many of the latest messages and set message_count
+
+        Returns:
+            Snapshot, or None if the session does not exist
+        """
+        header_key, messages_key = self._keys(session_id)
+        # Header and list are written in one transaction, so the list holds exactly message_count messages
+        start = 0 if recent is None else -max(recent, 1)
+        _, _, _, (raw, messages) = self._pipeline([
+            ("MULTI",), ("GET", header_key), ("LRANGE", messages_key, start, -1), ("EXEC",)
+        ])
+        if raw is None:
+            return None
+
+        snapshot = decode_snapshot(raw.decode("utf-8"))
+        count = snapshot.pop("message_count")
+        snapshot["revision"] = snapshot.pop("stored_revision")
+        if recent is None:
+            messages = messages[:count]
+        else:
+            messages = messages[len(messages) - min(recent, count):] if count else []
+            snapshot["message_count"] = count
+        snapshot["conversation_history"] = [json.loads(message) for message in messages]
+        return snapshot
+
+    def load_messages(self, session_id: str, start: int, stop: int) -> List[Dict[str, str]]:
+        """Load messages [start, stop) of a stored session."""
+        if stop <= start:
+            return []
+        return [json.loads(message) for message in self._execute("LRANGE", self._keys(session_id)[1], start, stop - 1)]
+
+    def save(self, snapshot: Dict[str, Any]) -> int:
+        """
+        Persist a conversation snapshot, appending only new messages.
+
+        Returns:
+            The new revision of the session
+
+        Raises:
+            SessionConflictError: If the session was saved since the snapshot was loaded
+        """
+        session_id = snapshot["session_id"]
+        header, history = split_snapshot(snapshot)
+        header_key, messages_key = self._keys(session_id)
+
+        _, raw = self._pipeline([("WATCH", header_key), ("GET", header_key)])
+        current = json.loads(raw) if raw else {}
+        revision = current.get("stored_revision", 0)
+        stored = current.get("message_count", 0)
+        try:
+            check_revision(session_id, snapshot.get("revision", 0), revision)
+        except SessionConflictError:
+            self._execute("UNWATCH")
+            raise
+
+        commands: List[Tuple] = [("MULTI",)]
+        if len(history) < stored:
+            commands.append(("DEL", messages_key))
+            stored = 0
+        if len(history) > stored:
+            commands.append(("RPUSH", messages_key, *[encode_snapshot(message) for message in history[stored:]]))
+        header.update(message_count=len(history), stored_revision=revision + 1)
+        commands.append(("SET", header_key, encode_snapshot(header)))
+        commands.append(("ZADD", f"{self.prefix}:index", time.time(), session_id))
+        commands.append(("EXEC",))
+
+        if self._pipeline(commands)[-1] is None:
+            raise SessionConflictError(f"Session {session_id} was saved concurrently by another worker")
+        return revision + 1
+
+    def delete(self, session_id: str):
+        """Remove a session and its messages."""
+        header_key, messages_key = self._keys(session_id)
+        self._pipeline([("DEL", header_key, messages_key), ("ZREM", f"{self.prefix}:index", session_id)])
+
+    def list_sessions(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """List the most recently updated sessions with their message counts."""
+        flat = self._execute("ZREVRANGE", f"{self.prefix}:index", 0, limit - 1, "WITHSCORES") or []
+        ids = [member.decode("utf-8") for member in flat[::2]]
+        headers = self._pipeline([("GET", self._keys(sid)[0]) for sid in ids]) if ids else []
+        return [{"session_id": sid, "message_count": json.loads(raw)["message_count"], "updated_at": float(score)}
+                for sid, score, raw in zip(ids, flat[1::2], headers) if raw]
+
+def create_session_store(name: str = SESSION_STORE_BACKEND) -> SessionStore:
+    """
+    Create a session store by name.
+
+    Args:
+        name: Backend name ('sqlite', 'redis' or 'memory')
+
+    Returns:
+        Session store instance
+    """
+    if name == "sqlite":
+        return SQLiteSessionStore()
+    if name == "redis":
+        return RedisSessionStore()
+    if name == "memory":
+        return InMemorySessionStore()
+    raise ValueError(f"Unknown session store: {name}")
@@ -0,0 +1,83 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from core.latency import LatencyDistribution
+
+DEFAULT_STUB_REPLY = (
+    "I can help you create a Residential Lease Agreement, Non-Disclosure Agreement, "
+    "B2B Contract, Power of Attorney, Employment Contract or Meeting Minutes. "
+    "Which document would you like to generate?"
+)
+
+class StubChatModel(BaseChatModel):
+    """
+    Deterministic offline chat model for load tests and local development.
+
+    Every call waits for a delay drawn from the latency distribution and
+    answers with a fixed reply that quotes the start of the user's message.
+    Streaming yields the reply word by word after the same delay.
+    """
+
+    reply: str = DEFAULT_STUB_REPLY
+    latency: Any = None
+    calls: int = 0
+
+    @classmethod
+    def from_spec(cls, latency_spec: str = "0", seed: Optional[int] = None, **kwargs) -> "StubChatModel":
+        """Create a stub whose latency follows a spec such as 'lognormal:0.8,0.4'."""
+        return cls(latency=LatencyDistribution.parse(latency_spec, seed), **kwargs)
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub-chat"
+
+    def _delay(self) -> float:
+        """Draw the delay for one call."""
+        self.calls += 1
+        return self.latency.sample() if self.latency is not None else 0.0
+
+    def _reply_for(self, messages: List[BaseMessage]) -> str:
+        """Build the reply for a prompt."""
+        user_messages = [m for m in messages if isinstance(m, HumanMessage)]
+        if not user_messages:
+            return self.reply
+        quoted = str(user_messages[-1].content).split("\n", 1)[0][:60]
+        return f"You said: \"{quoted}\". {self.reply}"
+
+    def _generate(self,
+                  messages: List[BaseMessage],
+                  stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None,
+                  **kwargs: Any) -> ChatResult:
+        time.sleep(self._delay())
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._reply_for(messages)))])
+
+    async def _agenerate(self,
+                         messages: List[BaseMessage],
+                         stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                         **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self._delay())
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._reply_for(messages)))])
+
+    def _stream(self,
+                messages: List[BaseMessage],
+                stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None,
+                **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self._delay())
+        for word in self._reply_for(messages).split(" "):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+
+    async def _astream(self,
+                       messages: List[BaseMessage],
+                       stop: Optional[List[str]] = None,
+                       run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                       **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self._delay())
+        for word in self._reply_for(messages).split(" "):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
@@ -0,0 +1,70 @@
+import re
+from typing import Any, Dict, List
+
+DATE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+def validate_input(user_input: str, expected_type: str, language: str = "EN") -> tuple[bool, str]:
+    """
+    Validate user input based on expected type.
+    
+    Args:
+        user_input: User's input to validate
+        expected_type: Expected data type (text, number, date, boolean)
+        language: Language for error messages
+    
+    Returns:
+        Tuple of (is_valid, error_message)
+    """
+    if not user_input.strip():
+        return False, "Input cannot be empty."
+    
+    if expected_type == "number":
+        try:
+            float(user_input)
+            return True, ""
+        except ValueError:
+            return False, "Please enter a valid number."
+    
+    elif expected_type == "date":
+        # Simple date validation (YYYY-MM-DD format)
+        if not DATE_PATTERN.match(user_input):
+            return False, "Please enter date in YYYY-MM-DD format."
+        return True, ""
+    
+    elif expected_type == "boolean":
+        positive_responses = ["yes", "y", "ja", "j", "true", "1"] if language == "EN" else ["ja", "j", "yes", "y", "true", "1"]
+        negative_responses = ["no", "n", "nein", "false", "0"] if language == "EN" else ["nein", "n", "no", "false", "0"]
+        
+        user_input_lower = user_input.lower().strip()
+        if user_input_lower in positive_responses + negative_responses:
+            return True, ""
+        else:
+            return False, f"Please answer with {'yes/no' if language == 'EN' else 'ja/nein'}."
+    
+    # For text type, any non-empty input is valid
+    return True, ""
+
+def validate_record(record: Dict[str, Any], questions: List[Dict[str, Any]], language: str = "EN") -> List[str]:
+    """
+    Validate a complete set of answers against a document's questions.
+    
+    Args:
+        record: Answers keyed by question id
+        questions: Question definitions from DOCUMENT_QUESTIONS
+        language: Language for error messages
+    
+    Returns:
+        List of error messages, empty if the record is valid
+    """
+    errors = []
+    for question in questions:
+        value = record.get(question["id"])
+        if value is None or str(value).strip() == "":
+            if question.get("required", False):
+                errors.append(f"{question['id']}: Input cannot be empty.")
+            continue
+        
+        is_valid, error_message = validate_input(str(value), question["type"], language)
+        if not is_valid:
+            errors.append(f"{question['id']}: {error_message}")
+    return errors
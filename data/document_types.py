@@ -392,7 +392,11 @@ DOCUMENT_QUESTIONS = {
 def get_document_questions(document_type: str, language: str = "EN") -> List[Dict[str, Any]]:
     """Get questions for a specific document type and language."""
     # Now all document types use English questions by default
-    return DOCUMENT_QUESTIONS.get(document_type, [])
+    questions = DOCUMENT_QUESTIONS.get(document_type, [])
+    # Some document types define questions per language
+    if isinstance(questions, dict):
+        return questions.get(language, questions.get("EN", []))
+    return questions
 
 def get_document_type_info(document_type: str, language: str = "EN") -> Dict[str, str]:
     """Get document type information for a specific language."""
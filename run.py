@@ -3,6 +3,7 @@
 Quick start script for Legal Document AI Assistant
 """
 
+import argparse
 import os
 import sys
 import subprocess
@@ -26,8 +27,120 @@ def check_requirements():
     
     return True
 
+def run_batch_command(args):
+    """Generate documents in bulk from a CSV or JSONL file."""
+    from core.batch import run_batch
+    
+    summary = run_batch(
+        args.input,
+        args.type,
+        args.output,
+        language=args.language,
+        max_workers=args.workers,
+        errors_path=args.errors
+    )
+    if summary["failed"]:
+        sys.exit(2)
+
+def run_loadtest_command(args):
+    """Drive simulated users through full conversations against offline stubs."""
+    from core.loadtest import run_loadtest
+    
+    report = run_loadtest(
+        output_path=args.json,
+        users=args.users,
+        llm_latency=args.llm_latency,
+        search_latency=args.search_latency,
+        max_concurrency=args.concurrency,
+        research=not args.no_research,
+        seed=args.seed,
+        session_store=args.session_store,
+        workers=args.workers
+    )
+    if report["failed"]:
+        sys.exit(2)
+
+def run_bench_command(args):
+    """Run the micro-benchmarks and compare them against the stored baseline."""
+    from core.benchmarks import run_benchmarks, load_baseline, save_results, compare_to_baseline
+    
+    print("⏱️ Running benchmarks...")
+    results = run_benchmarks(args.filter, repeat=args.repeat)
+    
+    baseline = load_baseline(args.baseline)
+    if baseline:
+        results["comparison"] = compare_to_baseline(results, baseline, args.threshold)
+    
+    if args.json:
+        save_results(results, args.json)
+    if args.save_baseline:
+        save_results(results, args.baseline)
+        print(f"✅ Baseline saved to {args.baseline}")
+        return
+    
+    if not baseline:
+        # Without a baseline nothing was checked, which must not pass as "no regressions"
+        print(f"❌ No baseline at {args.baseline}; run with --save-baseline to create one")
+        sys.exit(2)
+    
+    regressions = [entry for entry in results["comparison"] if entry["regressed"]]
+    for entry in regressions:
+        print(f"❌ {entry['name']}: {entry['baseline_us']:.1f} µs -> {entry['current_us']:.1f} µs ({entry['ratio']:.2f}x)")
+    if regressions:
+        sys.exit(3)
+    print(f"✅ No regressions beyond {args.threshold:.0%} of baseline")
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Legal Document AI Assistant")
+    subparsers = parser.add_subparsers(dest="command")
+    
+    batch = subparsers.add_parser("batch", help="Generate documents in bulk from a CSV or JSONL file")
+    batch.add_argument("--type", required=True, help="Document type, e.g. nda or residential_lease")
+    batch.add_argument("--input", required=True, help="CSV or JSONL file keyed by question field ids")
+    batch.add_argument("--output", default="exports/batch", help="Directory for generated documents")
+    batch.add_argument("--language", default="EN", help="Document language")
+    batch.add_argument("--workers", type=int, default=None, help="Worker processes (0 renders in-process)")
+    batch.add_argument("--errors", default=None, help="Optional JSONL file for per-record errors")
+    
+    loadtest = subparsers.add_parser("loadtest", help="Load test the conversation flow with offline LLM and search stubs")
+    loadtest.add_argument("--users", type=int, default=50, help="Number of simulated users")
+    loadtest.add_argument("--llm-latency", default="lognormal:0.8,0.4", help="Stub LLM latency, e.g. 0.5, uniform:0.2,1.0 or lognormal:0.8,0.4")
+    loadtest.add_argument("--search-latency", default="uniform:0.2,1.0", help="Stub search latency spec")
+    loadtest.add_argument("--concurrency", type=int, default=8, help="Maximum concurrent LLM calls")
+    loadtest.add_argument("--no-research", action="store_true", help="Skip localization research")
+    loadtest.add_argument("--seed", type=int, default=42, help="Seed for latency sampling")
+    loadtest.add_argument("--session-store", choices=["memory", "sqlite", "redis"], default=None,
+                          help="Load and save every turn through this session store (redis uses a local stand-in)")
+    loadtest.add_argument("--workers", type=int, default=None,
+                          help="Serve turns in this many worker processes sharing the sqlite or redis session store")
+    loadtest.add_argument("--json", default=None, help="Optional JSON file for the report")
+    
+    from config.settings import BENCHMARK_BASELINE_PATH, BENCHMARK_REGRESSION_THRESHOLD
+    bench = subparsers.add_parser("bench", help="Run offline micro-benchmarks and check for regressions")
+    bench.add_argument("--filter", default=None, help="Only run benchmarks whose name contains this text")
+    bench.add_argument("--repeat", type=int, default=5, help="Timed repeats per benchmark")
+    bench.add_argument("--baseline", default=BENCHMARK_BASELINE_PATH, help="Baseline JSON file")
+    bench.add_argument("--threshold", type=float, default=BENCHMARK_REGRESSION_THRESHOLD, help="Allowed slowdown, e.g. 0.2 for 20%%")
+    bench.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    bench.add_argument("--json", default=None, help="Optional JSON file for the results")
+    
+    return parser.parse_args(argv)
+
 def main():
     """Main function to run the application."""
+    args = parse_args()
+    
+    if args.command == "batch":
+        run_batch_command(args)
+        return
+    if args.command == "loadtest":
+        run_loadtest_command(args)
+        return
+    if args.command == "bench":
+        run_bench_command(args)
+        return
+    
     print("🚀 Starting Legal Document AI Assistant...")
     
     if not check_requirements():
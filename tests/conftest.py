@@ -0,0 +1,13 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.loadtest import isolated_stores
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path):
+    """Keep the process-wide document, research and spill stores out of the working directory."""
+    with isolated_stores(str(tmp_path)):
+        yield tmp_path
@@ -0,0 +1,85 @@
+import asyncio
+from core.ai_engine import AIEngine, ReplacementChunk
+from core.conversation import ConversationManager
+from core.response_cache import ResponseCache
+from core.stub_llm import StubChatModel
+
+class FailingStreamModel(StubChatModel):
+    """Stub chat model whose stream breaks off after a few words."""
+
+    fail_after: int = 3
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        for i, chunk in enumerate(super()._stream(messages, stop, run_manager, **kwargs)):
+            if i == self.fail_after:
+                raise ConnectionError("stream interrupted")
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        i = 0
+        async for chunk in super()._astream(messages, stop, run_manager, **kwargs):
+            if i == self.fail_after:
+                raise ConnectionError("stream interrupted")
+            i += 1
+            yield chunk
+
+def new_engine(llm):
+    return AIEngine(llm=llm, response_cache=ResponseCache(disk_path=None))
+
+def render(chunks):
+    """Apply chunks the way the chat UI does."""
+    text = ""
+    for chunk in chunks:
+        text = chunk if isinstance(chunk, ReplacementChunk) else text + chunk
+    return text
+
+async def collect(stream):
+    return [chunk async for chunk in stream]
+
+def test_stream_yields_plain_chunks_that_add_up_to_the_response():
+    engine = new_engine(StubChatModel())
+    chunks = list(engine.stream_response("hello", [], "information_gathering"))
+
+    assert len(chunks) > 1
+    assert not any(isinstance(chunk, ReplacementChunk) for chunk in chunks)
+    assert render(chunks).rstrip() == engine.get_response("hello", [], "information_gathering")
+
+def test_mid_stream_error_replaces_the_partial_response():
+    engine = new_engine(FailingStreamModel())
+    chunks = list(engine.stream_response("hello", [], "greeting"))
+
+    assert len(chunks) == 4
+    assert isinstance(chunks[-1], ReplacementChunk)
+    assert render(chunks) == AIEngine._error_message(ConnectionError("stream interrupted"), "EN")
+    # The broken response is not cached
+    assert engine.response_cache.stats()["entries"] == 0
+
+def test_async_mid_stream_error_replaces_the_partial_response():
+    engine = new_engine(FailingStreamModel())
+    chunks = asyncio.run(collect(engine.astream_response("hello", [], "greeting", session_id="s1")))
+
+    assert len(chunks) == 4
+    assert isinstance(chunks[-1], ReplacementChunk)
+    assert render(chunks) == AIEngine._error_message(ConnectionError("stream interrupted"), "EN")
+    assert engine.response_cache.stats()["entries"] == 0
+    assert engine.limiter.active == 0
+
+def test_async_stream_serves_a_cached_response_in_one_chunk():
+    llm = StubChatModel()
+    engine = new_engine(llm)
+
+    first = asyncio.run(collect(engine.astream_response("hello", [], "greeting")))
+    second = asyncio.run(collect(engine.astream_response("hello", [], "greeting")))
+
+    assert second == ["".join(first)]
+    assert llm.calls == 1
+
+def test_conversation_keeps_only_the_replacement_after_a_stream_error():
+    manager = ConversationManager(ai_engine=new_engine(FailingStreamModel()))
+    tokens = []
+    response, _ = manager.process_user_message("hello there", on_token=tokens.append)
+
+    error = AIEngine._error_message(ConnectionError("stream interrupted"), "EN")
+    assert response == error
+    assert render(tokens) == error
+    assert manager.conversation_history.recent()[-1] == {"role": "assistant", "content": error}
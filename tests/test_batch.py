@@ -0,0 +1,63 @@
+import json
+import pytest
+from core.batch import output_record_id, run_batch
+from core.document_gen import DocumentGenerator
+from core.validation import validate_record
+from data.document_types import DOCUMENT_QUESTIONS, get_document_questions
+
+SAMPLE_VALUES = {"text": "Sample", "number": "1000", "date": "2025-01-01", "boolean": "yes"}
+
+def valid_record(document_type):
+    return {question["id"]: SAMPLE_VALUES[question["type"]]
+            for question in get_document_questions(document_type)}
+
+@pytest.mark.parametrize("document_type", sorted(DOCUMENT_QUESTIONS))
+def test_every_document_type_validates_a_complete_record(document_type):
+    questions = get_document_questions(document_type, "EN")
+    assert isinstance(questions, list) and questions
+
+    assert validate_record(valid_record(document_type), questions) == []
+
+    [result] = DocumentGenerator().generate_many([valid_record(document_type)], document_type, max_workers=0)
+    assert result["errors"] in ([], [f"Error generating document: Template not found for document type: {document_type}"])
+
+@pytest.mark.parametrize("document_type", sorted(DOCUMENT_QUESTIONS))
+def test_every_document_type_reports_missing_and_malformed_fields(document_type):
+    questions = get_document_questions(document_type, "EN")
+    record = valid_record(document_type)
+    required = next(q["id"] for q in questions if q.get("required"))
+    del record[required]
+    typed = [q["id"] for q in questions if q["type"] in ("number", "date")]
+    for field_id in typed:
+        record[field_id] = "not-a-value"
+
+    [result] = DocumentGenerator().generate_many([record], document_type, max_workers=0)
+    assert result["document"] is None
+    assert f"{required}: Input cannot be empty." in result["errors"]
+    for field_id in typed:
+        assert any(error.startswith(f"{field_id}: Please") for error in result["errors"])
+
+@pytest.mark.parametrize("document_type", ["residential_lease", "nda", "b2b_contract"])
+def test_templated_document_types_render(document_type):
+    [result] = DocumentGenerator().generate_many([valid_record(document_type)], document_type, max_workers=0)
+    assert result["errors"] == []
+    assert "Sample" in result["document"]
+
+def test_run_batch_writes_b2b_contracts(tmp_path):
+    input_path = tmp_path / "records.jsonl"
+    records = [dict(valid_record("b2b_contract"), id="a/../b"), dict(valid_record("b2b_contract"), id="a/../b"), {"id": "bad"}]
+    input_path.write_text("\n".join(json.dumps(record) for record in records), encoding="utf-8")
+
+    summary = run_batch(str(input_path), "b2b_contract", str(tmp_path / "out"), max_workers=0,
+                        errors_path=str(tmp_path / "errors.jsonl"))
+
+    assert (summary["total"], summary["succeeded"], summary["failed"]) == (3, 2, 1)
+    assert sorted(p.name for p in (tmp_path / "out").iterdir()) == [
+        "b2b_contract_EN_a____b.txt", "b2b_contract_EN_a____b_2.txt"]
+    [error] = [json.loads(line) for line in (tmp_path / "errors.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert error["id"] == "bad" and error["index"] == 2
+
+def test_output_record_id_numbers_records_without_ids():
+    used = set()
+    assert output_record_id({"index": 4, "record": {}}, used) == "000005"
+    assert output_record_id({"index": 5, "record": {"id": "000005"}}, used) == "000005_2"
@@ -0,0 +1,72 @@
+import pytest
+from core.context_builder import ContextBuilder, MESSAGE_OVERHEAD_TOKENS, TRUNCATION_MARKER, estimate_tokens
+
+SYSTEM_PROMPT = "You are a legal document assistant. " * 10
+
+def conversation(turns, words=40):
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "content": f"question {i} " + "word " * words})
+        history.append({"role": "assistant", "content": f"answer {i} " + "word " * words})
+    return history
+
+def prompt_tokens(messages):
+    return sum(estimate_tokens(m["content"]) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+@pytest.mark.parametrize("budget", [250, 400, 800, 3000])
+def test_prompt_stays_within_budget(budget):
+    builder = ContextBuilder(max_tokens=budget, max_message_tokens=60, summary_tokens=60)
+    messages, stats = builder.build(SYSTEM_PROMPT, conversation(50), "latest question")
+
+    assert prompt_tokens(messages) <= budget
+    assert stats["prompt_tokens"] == prompt_tokens(messages)
+
+def test_system_prompt_and_latest_user_turn_are_always_kept():
+    # The budget leaves no room for any history turn
+    builder = ContextBuilder(max_tokens=150, max_message_tokens=60, summary_tokens=40)
+    messages, stats = builder.build(SYSTEM_PROMPT, conversation(50), "latest question")
+
+    assert messages[0] == {"role": "system", "content": SYSTEM_PROMPT}
+    assert messages[-1] == {"role": "user", "content": "latest question"}
+    assert stats["history_messages"] == 0
+    assert stats["dropped_messages"] == 100
+
+def test_oldest_turns_are_dropped_first_and_summarized():
+    builder = ContextBuilder(max_tokens=500, max_message_tokens=100, summary_tokens=80)
+    history = conversation(20)
+    messages, stats = builder.build(SYSTEM_PROMPT, history, "latest question")
+
+    kept = messages[2:-1]
+    assert 0 < stats["history_messages"] < len(history)
+    assert kept == history[-len(kept):]
+    assert stats["dropped_messages"] == len(history) - len(kept)
+    assert messages[1]["role"] == "system"
+    assert messages[1]["content"].startswith(f"Summary of {stats['dropped_messages']} earlier messages:")
+    assert f"question {19 - len(kept) // 2}" in messages[1]["content"]
+
+def test_short_history_is_kept_whole():
+    builder = ContextBuilder(max_tokens=3000)
+    history = conversation(3, words=5)
+    messages, stats = builder.build(SYSTEM_PROMPT, history, "latest question")
+
+    assert messages == [{"role": "system", "content": SYSTEM_PROMPT}] + history + [{"role": "user", "content": "latest question"}]
+    assert stats["dropped_messages"] == 0
+
+def test_long_message_is_truncated_to_the_per_message_cap():
+    builder = ContextBuilder(max_tokens=3000, max_message_tokens=50)
+    history = [{"role": "assistant", "content": "clause " * 500}]
+    messages, _ = builder.build(SYSTEM_PROMPT, history, "latest question")
+
+    assert messages[1]["content"].endswith(TRUNCATION_MARKER)
+    assert estimate_tokens(messages[1]["content"]) <= 50
+
+def test_current_message_already_in_history_is_not_sent_twice():
+    builder = ContextBuilder()
+    history = conversation(1, words=5) + [{"role": "user", "content": "latest question"}]
+    messages, _ = builder.build(SYSTEM_PROMPT, history, "latest question")
+
+    assert [m["content"] for m in messages].count("latest question") == 1
+
+def test_non_ascii_text_counts_more_tokens_per_character():
+    assert estimate_tokens("abcd" * 10) == 10
+    assert estimate_tokens("абвг" * 10) == 20
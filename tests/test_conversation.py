@@ -0,0 +1,188 @@
+import asyncio
+import io
+import os
+import pytest
+from docx import Document
+from core.ai_engine import AIEngine
+from core.conversation import ConversationManager, ConversationState
+from core.document_store import document_reference, expand_document_references, get_document_store
+from core.response_cache import ResponseCache
+from core.session_store import decode_snapshot, encode_snapshot
+from core.stub_llm import StubChatModel
+from utils.export import DocumentExporter
+
+SAMPLE_ANSWERS = {"text": "Acme Corp", "number": "1000", "date": "2025-01-01", "boolean": "yes"}
+
+def new_manager():
+    llm = StubChatModel()
+    engine = AIEngine(llm=llm, response_cache=ResponseCache(disk_path=None))
+    return ConversationManager(ai_engine=engine), llm
+
+def answer_questions(manager, count=None):
+    """Answer the current document's questions, all of them by default."""
+    for question in manager.document_questions[manager.current_question_index:][:count]:
+        answer = "United States" if question["id"] == "target_country" else SAMPLE_ANSWERS[question["type"]]
+        response, complete = manager.process_user_message(answer)
+    return response, complete
+
+def complete_conversation(request="Can you draft an NDA?"):
+    manager, _ = new_manager()
+    manager.process_user_message(request)
+    answer_questions(manager)
+    response, complete = manager.process_user_message("go ahead")
+    assert complete and manager.state == ConversationState.COMPLETED
+    return manager, response
+
+GENERIC_GREETINGS = [
+    "Hi! Can you tell me about your service?",
+    "hello, what is a contract?",
+    "Who is the board?",
+    "Hello, I am at work right now",
+    "Hola, tengo una pregunta sobre mi trabajo",
+    "Merhaba, bir iş sorum var",
+]
+
+CLEAR_REQUESTS = [
+    ("I need a rental agreement for my apartment", "residential_lease"),
+    ("Can you draft an NDA?", "nda"),
+    ("I need an employment contract", "employment_contract"),
+    ("Ich brauche einen Mietvertrag für meine Wohnung", "residential_lease"),
+    ("Preciso de um contrato de arrendamento", "residential_lease"),
+]
+
+@pytest.mark.parametrize("message", GENERIC_GREETINGS)
+def test_generic_greeting_reaches_the_llm(message):
+    manager, llm = new_manager()
+    response, _ = manager.process_user_message(message)
+    assert llm.calls == 1
+    assert response.startswith("You said:")
+    assert manager.state == ConversationState.DOCUMENT_SELECTION
+    assert manager.current_document_type is None
+
+@pytest.mark.parametrize("message, document_type", CLEAR_REQUESTS)
+def test_clear_request_takes_the_fast_path(message, document_type):
+    manager, llm = new_manager()
+    response, _ = manager.process_user_message(message)
+    assert llm.calls == 0
+    assert manager.state == ConversationState.INFORMATION_GATHERING
+    assert manager.current_document_type == document_type
+    assert manager.document_questions[0]["question"] in response
+
+def test_async_greeting_uses_the_same_fast_path_rules():
+    async def run():
+        generic, generic_llm = new_manager()
+        await generic.aprocess_user_message(GENERIC_GREETINGS[0])
+        clear, clear_llm = new_manager()
+        await clear.aprocess_user_message(CLEAR_REQUESTS[0][0])
+        return generic, generic_llm, clear, clear_llm
+
+    generic, generic_llm, clear, clear_llm = asyncio.run(run())
+    assert generic_llm.calls == 1 and generic.state == ConversationState.DOCUMENT_SELECTION
+    assert clear_llm.calls == 0 and clear.current_document_type == "residential_lease"
+
+def test_document_selection_accepts_a_weaker_match_after_the_llm_asked():
+    manager, llm = new_manager()
+    manager.process_user_message("Hello")
+    manager.process_user_message("I want to hire someone")
+    assert llm.calls == 1
+    assert manager.current_document_type == "employment_contract"
+
+def test_generated_document_is_kept_by_reference():
+    manager, response = complete_conversation()
+    document = manager.generated_document
+    reference = document_reference(manager.generated_document_id)
+
+    assert "Acme Corp" in document
+    assert reference in response and document not in response
+    assert manager.conversation_history.recent()[-1]["content"] == response
+    assert expand_document_references(response) == response.replace(reference, document)
+
+    # The prompt for a follow-up question carries a short note instead of the document
+    prompt = manager.ai_engine._build_context_messages("thanks", manager.conversation_history.recent(), "greeting", "EN", None)
+    assert not any(reference in m["content"] or document in m["content"] for m in prompt)
+
+def test_export_expands_the_reference():
+    manager, _ = complete_conversation()
+    exported = DocumentExporter(None).export_bytes(manager.generated_document_ref, "nda", "docx")
+
+    text = "\n".join(paragraph.text for paragraph in Document(io.BytesIO(exported)).paragraphs)
+    assert "Acme Corp" in text
+    assert "[[document:" not in text
+
+def test_identical_documents_are_stored_once(data_dir):
+    first, _ = complete_conversation()
+    second, _ = complete_conversation()
+
+    assert first.generated_document_id == second.generated_document_id
+    store = get_document_store()
+    assert store.directory.startswith(str(data_dir))
+    assert sum(len(names) for _, _, names in os.walk(store.directory)) == 1
+
+def test_version_2_snapshot_round_trip_is_lossless():
+    manager, _ = new_manager()
+    manager.process_user_message("I need a rental agreement for my apartment")
+    answer_questions(manager, 3)
+
+    snapshot = decode_snapshot(encode_snapshot(manager.to_snapshot()))
+    assert snapshot["version"] == 2
+    restored = ConversationManager.from_snapshot(snapshot, manager.ai_engine)
+
+    assert restored.to_snapshot() == manager.to_snapshot()
+    assert restored.state == ConversationState.INFORMATION_GATHERING
+    assert restored.collected_data == manager.collected_data and len(restored.collected_data) == 3
+    assert restored.document_questions == manager.document_questions
+    assert len(restored.conversation_history) == len(manager.conversation_history) == 8
+
+    # The restored conversation carries on with the next question
+    answer_questions(restored)
+    response, complete = restored.process_user_message("go ahead")
+    assert complete and "Acme Corp" in restored.generated_document
+
+def test_completed_snapshot_keeps_the_document_reference():
+    manager, response = complete_conversation()
+    restored = ConversationManager.from_snapshot(decode_snapshot(encode_snapshot(manager.to_snapshot())), manager.ai_engine)
+
+    assert restored.state == ConversationState.COMPLETED
+    assert restored.generated_document_id == manager.generated_document_id
+    assert restored.generated_document == manager.generated_document
+    assert list(restored.conversation_history) == list(manager.conversation_history)
+    assert restored.conversation_history.recent()[-1]["content"] == response
+
+def test_version_1_snapshot_still_loads():
+    document = "NON-DISCLOSURE AGREEMENT\n\nBetween Acme Corp and Beta LLC"
+    history = [
+        {"role": "user", "content": "Can you draft an NDA?"},
+        {"role": "assistant", "content": "What is the name of the company/person sharing confidential information?"},
+        {"role": "assistant", "content": f"Here's your generated Non-Disclosure Agreement:\n\n{document}"},
+    ]
+    snapshot = {
+        "version": 1,
+        "session_id": "legacy",
+        "language": "EN",
+        "state": "completed",
+        "current_document_type": "nda",
+        "current_question_index": 7,
+        "collected_data": {"disclosing_party": "Acme Corp", "receiving_party": "Beta LLC"},
+        "generated_document": document,
+        "conversation_history": history
+    }
+
+    restored = ConversationManager.from_snapshot(decode_snapshot(encode_snapshot(snapshot)), new_manager()[0].ai_engine)
+
+    assert restored.session_id == "legacy" and restored.revision == 0
+    assert restored.state == ConversationState.COMPLETED
+    assert restored.collected_data == snapshot["collected_data"]
+    assert restored.current_question_index == 7
+    assert restored.document_questions[0]["id"] == "disclosing_party"
+    assert list(restored.conversation_history) == history
+    # The inline document moves into the document store and is saved by reference from now on
+    assert restored.generated_document == document
+    assert restored.generated_document_id == get_document_store().put(document)
+    assert restored.to_snapshot()["version"] == 2
+    assert "generated_document" not in restored.to_snapshot()
+
+def test_unknown_snapshot_version_is_rejected():
+    manager, _ = new_manager()
+    snapshot = dict(manager.to_snapshot(), version=99)
+    with pytest.raises(ValueError):
+        ConversationManager.from_snapshot(snapshot, manager.ai_engine)
@@ -0,0 +1,87 @@
+import pytest
+from config.settings import DOC_CLASSIFIER_THRESHOLD
+from core.doc_classifier import DOCUMENT_KEYWORDS, DocumentTypeClassifier
+
+# (language, message, expected document type)
+POSITIVE = [
+    ("EN", "I need a rental agreement for my apartment", "residential_lease"),
+    ("EN", "Can you draft an NDA?", "nda"),
+    ("EN", "I need a service agreement with a supplier", "b2b_contract"),
+    ("EN", "I need a power of attorney", "power_of_attorney"),
+    ("EN", "I need an employment contract", "employment_contract"),
+    ("EN", "We need minutes of the board meeting", "meeting_minutes"),
+    ("DE", "Ich brauche einen Mietvertrag für meine Wohnung", "residential_lease"),
+    ("DE", "Wir brauchen eine Geheimhaltungsvereinbarung", "nda"),
+    ("DE", "Ich brauche einen Arbeitsvertrag für einen neuen Mitarbeiter", "employment_contract"),
+    ("ES", "Necesito un contrato de alquiler", "residential_lease"),
+    ("ES", "Necesito un acuerdo de confidencialidad", "nda"),
+    ("PT", "Preciso de um contrato de arrendamento", "residential_lease"),
+    ("PT", "Preciso de uma procuração", "power_of_attorney"),
+    ("PL", "Potrzebuję umowy najmu mieszkania", "residential_lease"),
+    ("PL", "Potrzebuję pełnomocnictwa", "power_of_attorney"),
+    ("UK", "Мені потрібен договір оренди квартири", "residential_lease"),
+    ("UK", "Потрібна довіреність", "power_of_attorney"),
+    ("AR", "أحتاج عقد إيجار لشقة", "residential_lease"),
+    ("AR", "أحتاج اتفاقية عدم الإفصاح", "nda"),
+    ("TR", "Kira sözleşmesi hazırlamak istiyorum", "residential_lease"),
+    ("TR", "Gizlilik sözleşmesi lazım", "nda"),
+]
+
+# Greetings and general questions that name no document, some with one generic keyword
+NEGATIVE = [
+    ("EN", "Hello"),
+    ("EN", "Hi! Can you tell me about your service?"),
+    ("EN", "hello, what is a contract?"),
+    ("EN", "Who is the board?"),
+    ("EN", "Hello, I am at work right now"),
+    ("DE", "Guten Tag, wie geht es Ihnen?"),
+    ("DE", "Hallo, was ist ein Vertrag?"),
+    ("ES", "Hola, ¿cómo estás?"),
+    ("ES", "Hola, ¿qué es un contrato?"),
+    ("PT", "Olá, tudo bem?"),
+    ("PT", "Olá, o que é um contrato?"),
+    ("PL", "Dzień dobry, jak się masz?"),
+    ("UK", "Привіт, як справи?"),
+    ("AR", "مرحبا، كيف حالك؟"),
+    ("TR", "Merhaba, nasılsın?"),
+]
+
+@pytest.fixture(scope="module")
+def classifier():
+    return DocumentTypeClassifier()
+
+@pytest.mark.parametrize("language, message, expected", POSITIVE)
+def test_classifies_document_requests(classifier, language, message, expected):
+    assert classifier.predict(message) == expected
+
+@pytest.mark.parametrize("language, message", NEGATIVE)
+def test_rejects_greetings_and_generic_questions(classifier, language, message):
+    assert classifier.predict(message) is None
+
+def test_examples_cover_every_keyword_language():
+    languages = {language for keywords in DOCUMENT_KEYWORDS.values() for language in keywords}
+    assert {language for language, _, _ in POSITIVE} == languages
+    assert {language for language, _ in NEGATIVE} == languages
+
+def test_single_weight_one_keyword_is_never_enough(classifier):
+    generic = [keyword for keywords in DOCUMENT_KEYWORDS.values()
+               for language_keywords in keywords.values()
+               for keyword, weight in language_keywords.items()
+               if weight == 1 and not keyword.endswith("*")]
+    for keyword in generic:
+        label, confidence = classifier.classify(keyword)
+        assert confidence <= DOC_CLASSIFIER_THRESHOLD, keyword
+        assert classifier.predict(keyword) is None, keyword
+
+def test_prefix_keywords_match_inflections(classifier):
+    assert classifier.scores("Mietverträge")["residential_lease"] == 3
+    assert classifier.scores("Vollmachten")["power_of_attorney"] == 4
+
+def test_no_features_gives_zero_confidence(classifier):
+    assert classifier.classify("Good morning") == (None, 0.0)
+
+def test_min_score_and_margin_reject_weak_or_ambiguous_matches(classifier):
+    assert classifier.predict("I want to hire someone") == "employment_contract"
+    assert classifier.predict("I want to hire someone", min_score=3) is None
+    assert classifier.predict("Necesito un contrato de alquiler", min_score=3, min_margin=2) == "residential_lease"
+    assert classifier.predict("Necesito un contrato de alquiler", min_margin=6) is None
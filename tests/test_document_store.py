@@ -0,0 +1,57 @@
+import gzip
+import os
+from core.document_store import (DocumentStore, abbreviate_document_references, document_reference,
+                                 expand_document_references, has_document_references)
+
+def stored_files(store):
+    return sorted(name for _, _, names in os.walk(store.directory) for name in names)
+
+def test_identical_content_is_stored_once(tmp_path):
+    store = DocumentStore(str(tmp_path / "documents"))
+    first = store.put("LEASE AGREEMENT\n\nRent: 1000")
+    second = store.put("LEASE AGREEMENT\n\nRent: 1000")
+    other = store.put("LEASE AGREEMENT\n\nRent: 1200")
+
+    assert first == second != other
+    assert len(first) == 64
+    assert stored_files(store) == sorted([f"{first}.txt.gz", f"{other}.txt.gz"])
+
+def test_documents_are_read_back_from_disk(tmp_path):
+    directory = str(tmp_path / "documents")
+    document_id = DocumentStore(directory).put("Confidential — Vertraulich")
+    with open(os.path.join(directory, document_id[:2], f"{document_id}.txt.gz"), "rb") as f:
+        assert gzip.decompress(f.read()).decode("utf-8") == "Confidential — Vertraulich"
+
+    # A fresh store in another process has nothing cached
+    fresh = DocumentStore(directory, cache_size=1)
+    assert fresh.cached_bytes(document_id) == 0
+    assert fresh.get(document_id) == "Confidential — Vertraulich"
+    assert fresh.cached_bytes(document_id) > 0
+    assert fresh.get("0" * 64) is None
+
+def test_cache_keeps_only_the_most_recent_documents(tmp_path):
+    store = DocumentStore(str(tmp_path / "documents"), cache_size=1)
+    first = store.put("first")
+    second = store.put("second")
+
+    assert store.cached_bytes(first) == 0 and store.cached_bytes(second) > 0
+    assert store.get(first) == "first"
+
+def test_references_expand_and_abbreviate(tmp_path):
+    store = DocumentStore(str(tmp_path / "documents"))
+    document_id = store.put("FULL DOCUMENT TEXT")
+    message = f"Here it is:\n\n{document_reference(document_id)}\n\nExport it from the sidebar."
+
+    assert has_document_references(message)
+    assert not has_document_references("[[document:not-a-hash]]")
+    assert expand_document_references(message, store) == "Here it is:\n\nFULL DOCUMENT TEXT\n\nExport it from the sidebar."
+    assert "FULL DOCUMENT TEXT" not in abbreviate_document_references(message)
+    assert document_reference(document_id) not in abbreviate_document_references(message)
+
+def test_reference_to_a_missing_document_is_left_as_is(tmp_path):
+    store = DocumentStore(str(tmp_path / "documents"))
+    document_id = store.put("gone")
+    store.delete(document_id)
+
+    assert not store.exists(document_id)
+    assert expand_document_references(document_reference(document_id), store) == document_reference(document_id)
@@ -0,0 +1,56 @@
+import io
+import os
+import pytest
+from docx import Document
+from utils.export import DocumentExporter
+
+CONTENT = "NON-DISCLOSURE AGREEMENT\n\n1. Parties\n\nAcme Corp and Beta LLC agree to keep information confidential."
+
+@pytest.fixture
+def export_folder(tmp_path):
+    return tmp_path / "exports"
+
+def test_pdf_bytes_are_a_pdf(export_folder):
+    data = DocumentExporter(str(export_folder)).export_bytes(CONTENT, "nda", "pdf")
+    assert data.startswith(b"%PDF-")
+    assert data.rstrip().endswith(b"%%EOF")
+    assert os.listdir(export_folder) == []
+
+def test_docx_bytes_are_a_docx(export_folder):
+    data = DocumentExporter(str(export_folder)).export_bytes(CONTENT, "nda", "DOCX")
+    assert data.startswith(b"PK")
+    text = [paragraph.text for paragraph in Document(io.BytesIO(data)).paragraphs]
+    assert text[0] == "Non-Disclosure Agreement"
+    assert "Acme Corp and Beta LLC agree to keep information confidential." in text
+    assert os.listdir(export_folder) == []
+
+def test_in_memory_exporter_needs_no_folder(tmp_path, monkeypatch):
+    workdir = tmp_path / "workdir"
+    workdir.mkdir()
+    monkeypatch.chdir(workdir)
+    exporter = DocumentExporter(None)
+    assert exporter.export_bytes(CONTENT, "nda", "pdf").startswith(b"%PDF")
+    assert exporter.export_to_pdf(CONTENT, "nda") is None
+    assert os.listdir(workdir) == []
+
+def test_unsupported_format_returns_none_and_writes_nothing(export_folder):
+    exporter = DocumentExporter(str(export_folder))
+    stream = io.BytesIO()
+
+    assert exporter.export_bytes(CONTENT, "nda", "rtf") is None
+    assert exporter.export_to_stream(CONTENT, "nda", "rtf", stream) is False
+    assert stream.getvalue() == b""
+    assert exporter._export_to_file(CONTENT, "nda", "rtf", "EN", None) is None
+    assert os.listdir(export_folder) == []
+
+def test_export_to_stream_writes_into_the_given_stream(export_folder):
+    stream = io.BytesIO()
+    assert DocumentExporter(str(export_folder)).export_to_stream(CONTENT, "nda", "pdf", stream, "DE")
+    assert stream.getvalue().startswith(b"%PDF")
+
+def test_file_exports_in_the_same_second_get_distinct_names(export_folder):
+    exporter = DocumentExporter(str(export_folder))
+    paths = [exporter.export_to_docx(CONTENT, "nda") for _ in range(3)]
+
+    assert len(set(paths)) == 3
+    assert sorted(os.listdir(export_folder)) == sorted(os.path.basename(path) for path in paths)
@@ -0,0 +1,75 @@
+import random
+import re
+from core.extraction import EXTRACTION_INDICATORS, MAX_ITEMS_PER_CATEGORY, SentenceExtractor, default_extractor
+
+RESULTS = [
+    {"body": "A written contract is required for every tenancy. Too short. The lease must include the rent and "
+             "the deposit! Each section follows the statutory format? Compliance with local law is mandatory for landlords."},
+    {"body": "The lease must include the rent and the deposit. Tenants have a right to privacy under the civil code"},
+    {"body": ""},
+    {"title": "no body"},
+]
+
+EXPECTED = {
+    "legal_requirements": [
+        "A written contract is required for every tenancy",
+        "Compliance with local law is mandatory for landlords",
+        "The lease must include the rent and the deposit",
+    ],
+    "template_structure": [
+        "Each section follows the statutory format",
+    ],
+    "key_clauses": [
+        "Tenants have a right to privacy under the civil code",
+    ],
+    "compliance_notes": [
+        "Compliance with local law is mandatory for landlords",
+        "Each section follows the statutory format",
+        "Tenants have a right to privacy under the civil code",
+    ],
+}
+
+def per_indicator_extract(search_results, indicators):
+    """The original per-indicator scan, with duplicates removed in first-seen order."""
+    found = []
+    for result in search_results:
+        body = result.get("body", "")
+        for indicator in indicators:
+            if indicator in body.lower():
+                for sentence in re.split(r"[.!?]", body):
+                    if indicator in sentence.lower() and len(sentence.strip()) > 20:
+                        found.append(sentence.strip())
+                        break
+    return list(dict.fromkeys(found))[:MAX_ITEMS_PER_CATEGORY]
+
+def test_fixture_output_per_category():
+    assert default_extractor.extract(RESULTS) == EXPECTED
+
+def test_single_category_matches_full_extraction():
+    for category, expected in EXPECTED.items():
+        assert default_extractor.extract(RESULTS, [category]) == {category: expected}
+
+def test_output_is_limited_per_category():
+    results = [{"body": f"Clause {i} of this agreement is mandatory for both parties."} for i in range(25)]
+    extracted = default_extractor.extract(results)
+    assert extracted["legal_requirements"] == [f"Clause {i} of this agreement is mandatory for both parties" for i in range(10)]
+
+def test_matches_the_per_indicator_scan():
+    words = ["the", "tenant", "Landlord", "shall", "pay", "within", "days", "notice", "LAW", "Clause", "must include",
+             "structure", "right", "terms", "statutory", "legal standard", "obligatory", "section", "code", "X"]
+    rng = random.Random(11)
+    results = []
+    for _ in range(200):
+        sentences = [" ".join(rng.choice(words) for _ in range(rng.randint(1, 9))) for _ in range(rng.randint(0, 6))]
+        results.append({"body": "".join(s + rng.choice(".!?") for s in sentences)})
+
+    for start in range(0, len(results), 5):
+        chunk = results[start:start + 5]
+        extracted = default_extractor.extract(chunk)
+        for category, indicators in EXTRACTION_INDICATORS.items():
+            assert extracted[category] == per_indicator_extract(chunk, indicators)
+
+def test_custom_indicators():
+    extractor = SentenceExtractor({"fees": ["fee", "fees due"]})
+    results = [{"body": "All fees due are payable monthly. A late fee applies after ten days"}]
+    assert extractor.extract(results) == {"fees": ["All fees due are payable monthly"]}
@@ -0,0 +1,103 @@
+import gc
+import pytest
+from core.conversation import ConversationManager
+from core.history import ConversationHistory, HistorySpillStore
+from core.session_store import InMemorySessionStore, SQLiteSessionStore
+from core.stub_llm import StubChatModel
+from core.ai_engine import AIEngine
+
+def messages(count, start=0):
+    return [{"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i}"} for i in range(start, start + count)]
+
+@pytest.fixture
+def spill_store(tmp_path):
+    return HistorySpillStore(str(tmp_path / "spill.sqlite3"))
+
+def spilled_count(store, history):
+    return len(store.get_range(history.history_id, 0, len(history)))
+
+def test_old_messages_spill_and_page_back(spill_store):
+    history = ConversationHistory(max_resident=4, spill_store=spill_store)
+    for message in messages(10):
+        history.append(message)
+
+    assert len(history) == 10
+    assert history.resident_start == 6
+    assert spilled_count(spill_store, history) == 6
+    assert list(history) == messages(10)
+    assert list(reversed(history)) == messages(10)[::-1]
+    assert history[0] == messages(1)[0]
+    assert history[-1] == messages(1, start=9)[0]
+    assert history.page(2, 7) == messages(5, start=2)
+    assert history.recent(3) == messages(3, start=7)
+    assert history[::3] == messages(10)[::3]
+    with pytest.raises(IndexError):
+        history[10]
+
+def test_long_messages_are_kept_on_disk_only(spill_store):
+    history = ConversationHistory(max_resident=10, inline_max_chars=20, spill_store=spill_store)
+    document = {"role": "assistant", "content": "x" * 1000}
+    history.extend(messages(2) + [document])
+
+    assert history.resident_bytes < 1000
+    assert history[2] == document
+    assert spilled_count(spill_store, history) == 1
+
+def test_clear_drops_spilled_messages(spill_store):
+    history = ConversationHistory(messages(10), max_resident=3, spill_store=spill_store)
+    old_id = history.history_id
+    history.clear()
+
+    assert len(history) == 0
+    assert list(history) == []
+    assert spill_store.get_range(old_id, 0, 10) == {}
+    history.append(messages(1)[0])
+    assert list(history) == messages(1)
+
+def test_spilled_messages_are_removed_when_history_is_collected(spill_store):
+    history = ConversationHistory(messages(10), max_resident=3, spill_store=spill_store)
+    history_id = history.history_id
+    del history
+    gc.collect()
+    assert spill_store.get_range(history_id, 0, 10) == {}
+
+def test_paged_history_reads_old_messages_through_the_pager(spill_store):
+    stored = messages(20)
+    calls = []
+
+    def pager(start, stop):
+        calls.append((start, stop))
+        return stored[start:stop]
+
+    history = ConversationHistory.from_pager(stored[-4:], len(stored), pager, max_resident=4, spill_store=spill_store)
+    assert len(history) == 20
+    assert history.recent(4) == stored[-4:]
+    assert calls == []
+
+    assert history.page(0, 5) == stored[:5]
+    assert calls == [(0, 5)]
+    assert list(history) == stored
+
+    # New messages push the paged window out without copying it to the spill store
+    history.extend(messages(6, start=20))
+    assert spilled_count(spill_store, history) == 2
+    assert list(history) == stored + messages(6, start=20)
+
+@pytest.mark.parametrize("store_name", ["memory", "sqlite"])
+def test_resumed_conversation_loads_only_the_recent_window(store_name, tmp_path):
+    store = InMemorySessionStore() if store_name == "memory" else SQLiteSessionStore(str(tmp_path / "sessions.db"))
+    engine = AIEngine(llm=StubChatModel())
+    manager = ConversationManager(ai_engine=engine, session_store=store)
+    manager.conversation_history.extend(messages(120))
+    manager.save_session()
+
+    resumed = ConversationManager.resume(manager.session_id, store, engine)
+    history = resumed.conversation_history
+    assert len(history) == 120
+    assert history.resident_start == 120 - history.max_resident
+    assert list(history) == messages(120)
+
+    # Saving appends only the new messages; nothing is re-spilled or rewritten
+    history.extend(messages(2, start=120))
+    resumed.save_session()
+    assert list(store.load(manager.session_id)["conversation_history"]) == messages(122)
@@ -0,0 +1,41 @@
+import asyncio
+import httpx
+from core.llm_clients import LLMClientRegistry, LoopBoundAsyncClient
+
+def make_client():
+    return httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, text="ok")))
+
+def test_each_event_loop_gets_its_own_client():
+    client = LoopBoundAsyncClient(make_client)
+
+    async def request():
+        response = await client.get("http://llm.test/v1")
+        return response.text, client.for_running_loop()
+
+    first_text, first = asyncio.run(request())
+    second_text, second = asyncio.run(request())
+    assert first_text == second_text == "ok"
+    assert first is not second
+    # The first loop is closed, so its client was dropped
+    assert client.loop_count == 1
+
+def test_requests_in_one_loop_share_a_client():
+    client = LoopBoundAsyncClient(make_client)
+
+    async def scenario():
+        await asyncio.gather(*[client.get("http://llm.test/v1") for _ in range(5)])
+        pool = client.for_running_loop()
+        await client.aclose()
+        return pool
+
+    pool = asyncio.run(scenario())
+    assert pool.is_closed
+    assert client.loop_count == 0
+
+def test_registry_reuses_chat_clients():
+    registry = LLMClientRegistry()
+    first = registry.get("gpt-test", 0.2, "key")
+    assert registry.get("gpt-test", 0.2, "key") is first
+    assert registry.get("gpt-test", 0.7, "key") is not first
+    assert isinstance(registry.http_async_client, LoopBoundAsyncClient)
+    registry.close()
@@ -0,0 +1,77 @@
+import asyncio
+from core.llm_limiter import LLMConcurrencyLimiter
+
+def run(coro):
+    return asyncio.run(coro)
+
+def test_requests_are_admitted_round_robin_across_sessions():
+    async def scenario():
+        limiter = LLMConcurrencyLimiter(1)
+        order = []
+
+        async def call(session_id, label):
+            async with limiter.slot(session_id):
+                order.append(label)
+                await asyncio.sleep(0)
+
+        await limiter.acquire("blocker")
+        tasks = [asyncio.create_task(call("busy", f"busy{i}")) for i in range(3)]
+        tasks.append(asyncio.create_task(call("quiet", "quiet0")))
+        await asyncio.sleep(0)
+        limiter.release()
+        await asyncio.gather(*tasks)
+        return order, limiter
+
+    order, limiter = run(scenario())
+    assert order == ["busy0", "quiet0", "busy1", "busy2"]
+    assert limiter.active == 0
+    assert limiter.waiting == 0
+
+def test_concurrency_never_exceeds_the_limit():
+    async def scenario():
+        limiter = LLMConcurrencyLimiter(3)
+
+        async def call(i):
+            async with limiter.slot(f"s{i % 5}"):
+                await asyncio.sleep(0.001)
+
+        await asyncio.gather(*[call(i) for i in range(40)])
+        return limiter
+
+    limiter = run(scenario())
+    assert limiter.peak_active == 3
+    assert limiter.active == 0
+
+def test_cancelled_waiter_is_removed_from_queue():
+    async def scenario():
+        limiter = LLMConcurrencyLimiter(1)
+        await limiter.acquire("a")
+        waiter = asyncio.create_task(limiter.acquire("b"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert limiter.waiting == 0
+        limiter.release()
+        return limiter
+
+    assert run(scenario()).active == 0
+
+def test_release_after_cancel_before_cleanup_keeps_the_slot():
+    async def scenario():
+        limiter = LLMConcurrencyLimiter(1)
+        await limiter.acquire("a")
+        waiter = asyncio.create_task(limiter.acquire("b"))
+        await asyncio.sleep(0)
+        # Cancel and release before the waiter's task runs its cleanup
+        waiter.cancel()
+        limiter.release()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert limiter.active == 0
+        assert limiter.waiting == 0
+
+        # The slot is usable again
+        await asyncio.wait_for(limiter.acquire("c"), timeout=1)
+        limiter.release()
+        return limiter
+
+    assert run(scenario()).active == 0
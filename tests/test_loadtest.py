@@ -0,0 +1,15 @@
+import asyncio
+import pytest
+from core.loadtest import run_loadtest_async
+
+def test_worker_processes_share_the_session_store():
+    report = asyncio.run(run_loadtest_async(users=6, llm_latency="0", search_latency="0", research=False,
+                                            session_store="sqlite", workers=2))
+
+    assert report["failed"] == 0 and report["completed"] == 6
+    assert report["worker_processes"] == 2
+    assert report["llm_calls"] > 0
+
+def test_worker_processes_need_a_shared_session_store():
+    with pytest.raises(ValueError):
+        asyncio.run(run_loadtest_async(users=1, llm_latency="0", research=False, session_store="memory", workers=2))
@@ -0,0 +1,126 @@
+import json
+import threading
+import time
+import pytest
+from core.localization_research import LocalizationResearchEngine, ResearchSession
+from core.research_store import ResearchStore
+from core.search_backends import ReplaySearchBackend, StubSearchBackend
+
+class ScriptedBackend:
+    """Search backend with a fixed delay (or failure) per query keyword."""
+
+    def __init__(self, delays=None, failing=()):
+        self.delays = delays or {}
+        self.failing = failing
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def search(self, query, max_results=5):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            for keyword, delay in self.delays.items():
+                if keyword in query:
+                    time.sleep(delay)
+            if any(keyword in query for keyword in self.failing):
+                raise RuntimeError("search failed")
+            slug = query.replace(" ", "-")
+            return [{"title": query, "body": f"The {query} must include a signature.", "link": f"https://example.test/{slug}/{i}"}
+                    for i in range(2)]
+        finally:
+            with self._lock:
+                self.active -= 1
+
+def make_engine(tmp_path, backend, max_workers=4, query_timeout=2.0):
+    return LocalizationResearchEngine(max_workers=max_workers, query_timeout=query_timeout,
+                                      store=ResearchStore(str(tmp_path / "research")), search_backend=backend)
+
+def source_queries(results):
+    return [source["title"] for source in results["sources"]]
+
+def test_results_are_merged_in_query_order_regardless_of_completion(tmp_path):
+    # The first query finishes last
+    backend = ScriptedBackend({"legal requirements": 0.2, "template": 0.1})
+    results = make_engine(tmp_path / "parallel", backend).research_country_requirements("nda", "Germany")
+    sequential = make_engine(tmp_path / "sequential", ScriptedBackend(), max_workers=1).research_country_requirements("nda", "Germany")
+
+    assert backend.peak > 1
+    assert source_queries(results) == source_queries(sequential)
+    for key in ("legal_requirements", "template_structure", "key_clauses", "compliance_notes", "sources"):
+        assert results[key] == sequential[key]
+
+def test_slow_query_times_out_without_holding_up_the_others(tmp_path):
+    backend = ScriptedBackend({"mandatory clauses": 1.0})
+    engine = make_engine(tmp_path, backend, query_timeout=0.3)
+    queries = engine._generate_search_queries("nda", "Germany")
+
+    start = time.monotonic()
+    results = engine._run_searches(queries)
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 0.8
+    assert results["key_clauses"] == []
+    assert all(results[query_type] for query_type in queries if query_type != "key_clauses")
+
+def test_timeout_starts_when_a_queued_query_starts_running(tmp_path):
+    # One worker: each query waits for the previous ones, longer than the timeout in total
+    backend = ScriptedBackend({"Germany": 0.1})
+    engine = make_engine(tmp_path, backend, max_workers=1, query_timeout=0.25)
+    results = engine._run_searches(engine._generate_search_queries("nda", "Germany"))
+
+    assert backend.peak == 1
+    assert len(results) == 4
+    assert all(results.values())
+
+def test_failed_query_yields_no_results(tmp_path, capsys):
+    engine = make_engine(tmp_path, ScriptedBackend(failing=("compliance",)))
+    results = engine._run_searches(engine._generate_search_queries("nda", "Germany"))
+
+    assert results["compliance"] == []
+    assert results["legal_requirements"]
+    assert "Search error" in capsys.readouterr().out
+
+def test_fresh_results_are_served_from_the_store(tmp_path):
+    backend = ScriptedBackend()
+    engine = make_engine(tmp_path, backend)
+    first = engine.research_country_requirements("nda", "Germany")
+    engine.query_trace.clear()
+
+    assert engine.research_country_requirements("NDA", " germany ") == first
+    assert engine.query_trace == []
+
+def test_research_from_failed_searches_is_not_cached(tmp_path):
+    fixture = tmp_path / "fixture.json"
+    fixture.write_text(json.dumps({"*": [{"title": "Law", "body": "A signature is required.", "link": "https://example.test/law"}]}), encoding="utf-8")
+    backend = ReplaySearchBackend(str(fixture), failure_rate=1.0)
+    engine = make_engine(tmp_path, backend)
+
+    failed = engine.research_country_requirements("nda", "Germany")
+    ResearchSession(engine, "nda", "Germany").save()
+    assert failed["sources"] == []
+    assert engine.store.get_fresh("nda", "Germany") is None
+
+    # The backend recovers: the next request searches again instead of serving the empty result
+    backend.failure_rate = 0.0
+    engine.query_trace.clear()
+    recovered = engine.research_country_requirements("nda", "Germany")
+    assert len(engine.query_trace) == 4
+    assert recovered["sources"] == [{"url": "https://example.test/law", "title": "Law", "snippet": "A signature is required...."}]
+    assert engine.store.get_fresh("nda", "Germany") == recovered
+
+def test_research_session_runs_each_query_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # the JSON export goes to RESEARCH_DATA_DIR under the working directory
+    engine = LocalizationResearchEngine(store=ResearchStore(str(tmp_path / "research")), search_backend=StubSearchBackend())
+    session = ResearchSession(engine, "employment_contract", "Germany")
+
+    guidance = session.get_guidance()
+    session.save()
+    session.save("employment_contract_germany.json")
+
+    assert "GERMANY" in guidance
+    assert (tmp_path / "research_data" / "employment_contract_germany.json").exists()
+    counts = session.query_counts()
+    assert sorted(counts) == sorted(engine._generate_search_queries("employment_contract", "Germany").values())
+    assert set(counts.values()) == {1}
@@ -0,0 +1,108 @@
+import asyncio
+import sqlite3
+import time
+import pytest
+import core.response_cache as response_cache_module
+from config.settings import LLM_CACHEABLE_STATES
+from core.ai_engine import AIEngine
+from core.response_cache import ResponseCache, make_cache_key
+from core.stub_llm import StubChatModel
+
+def new_engine(cache=None):
+    llm = StubChatModel()
+    return AIEngine(llm=llm, response_cache=cache or ResponseCache(disk_path=None)), llm
+
+def test_cacheable_states_are_greeting_and_document_selection():
+    assert set(LLM_CACHEABLE_STATES) == {"greeting", "document_selection"}
+
+@pytest.mark.parametrize("state", ["greeting", "document_selection"])
+def test_cacheable_state_is_served_from_cache(state):
+    engine, llm = new_engine()
+    first = engine.get_response("What can you do?", [], state)
+    assert engine.get_response("what  can you DO?", [], state) == first
+    assert llm.calls == 1
+    assert engine.response_cache.stats()["hits"] == 1
+
+@pytest.mark.parametrize("state", ["information_gathering", "localization_research", "document_generation"])
+def test_questionnaire_and_generation_turns_are_never_cached(state):
+    engine, llm = new_engine()
+    context = {"document_type": "nda", "collected_data": {"disclosing_party": "Acme"}}
+    engine.get_response("Acme Corp", [], state, context=context)
+    engine.get_response("Acme Corp", [], state, context=context)
+    list(engine.stream_response("Acme Corp", [], state, context=context))
+    asyncio.run(engine.aget_response("Acme Corp", [], state, context=context))
+
+    assert llm.calls == 4
+    assert engine.response_cache.stats() == {"hits": 0, "misses": 0, "disk_hits": 0, "entries": 0, "hit_ratio": 0.0}
+
+def test_streamed_response_is_cached_whole():
+    engine, llm = new_engine()
+    streamed = "".join(engine.stream_response("hello", [], "greeting"))
+    assert list(engine.stream_response("hello", [], "greeting")) == [streamed]
+    assert engine.get_response("hello", [], "greeting") == streamed
+    assert llm.calls == 1
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2, disk_path=None)
+    cache.set("a", "A")
+    cache.set("b", "B")
+    assert cache.get("a") == "A"  # "b" is now least recently used
+    cache.set("c", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A" and cache.get("c") == "C"
+    assert cache.stats()["entries"] == 2
+
+def test_entries_expire_after_the_ttl(tmp_path):
+    cache = ResponseCache(ttl=0.05, disk_path=str(tmp_path / "cache.sqlite3"))
+    cache.set("a", "A")
+    assert cache.get("a") == "A"
+    time.sleep(0.1)
+
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+def test_disk_tier_serves_evicted_entries_and_other_processes(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = ResponseCache(max_entries=1, disk_path=path)
+    cache.set("a", "A")
+    cache.set("b", "B")  # evicts "a" from memory
+
+    assert cache.get("a") == "A"
+    assert cache.stats()["disk_hits"] == 1
+    assert cache.get("a") == "A"  # promoted back into memory
+    assert cache.stats()["disk_hits"] == 1
+
+    restarted = ResponseCache(disk_path=path)
+    assert restarted.get("b") == "B"
+    assert restarted.stats()["disk_hits"] == 1
+
+def test_disk_tier_closes_its_connections(tmp_path, monkeypatch):
+    opened = []
+    connect = sqlite3.connect
+
+    def tracking_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(response_cache_module.sqlite3, "connect", tracking_connect)
+    cache = ResponseCache(max_entries=1, disk_path=str(tmp_path / "cache.sqlite3"))
+    cache.set("a", "A")
+    cache.set("b", "B")
+    assert cache.get("a") == "A"
+    cache.clear()
+    assert cache.get("a") is None
+
+    assert len(opened) == 6
+    for conn in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+def test_cache_key_depends_on_model_state_and_language():
+    messages = [{"role": "user", "content": "Hello"}]
+    key = make_cache_key("greeting", "EN", messages, "model-a")
+    assert key == make_cache_key("greeting", "EN", [{"role": "user", "content": " hello "}], "model-a")
+    assert key != make_cache_key("greeting", "EN", messages, "model-b")
+    assert key != make_cache_key("document_selection", "EN", messages, "model-a")
+    assert key != make_cache_key("greeting", "DE", messages, "model-a")
@@ -0,0 +1,85 @@
+import json
+import time
+import pytest
+from core.latency import LatencyDistribution
+from core.localization_research import LocalizationResearchEngine
+from core.research_store import ResearchStore
+from core.search_backends import (RecordingSearchBackend, ReplaySearchBackend, SearchBackendError,
+                                  StubSearchBackend, create_search_backend)
+
+RESULTS = [{"title": f"Result {i}", "body": "A signature is required.", "link": f"https://example.test/{i}"} for i in range(3)]
+
+@pytest.fixture
+def fixture_path(tmp_path):
+    path = tmp_path / "fixture.json"
+    path.write_text(json.dumps({"nda law": RESULTS, "*": RESULTS[:1]}), encoding="utf-8")
+    return str(path)
+
+def make_engine(tmp_path, backend, query_timeout=2.0):
+    return LocalizationResearchEngine(query_timeout=query_timeout, store=ResearchStore(str(tmp_path / "research")),
+                                      search_backend=backend)
+
+def test_replay_returns_recorded_results_for_the_query(fixture_path):
+    backend = ReplaySearchBackend(fixture_path)
+    assert backend.search("nda law") == RESULTS
+    assert backend.search("nda law", max_results=2) == RESULTS[:2]
+    assert backend.search("anything else") == RESULTS[:1]
+
+def test_replay_failure_raises_and_search_web_returns_nothing(fixture_path, tmp_path, capsys):
+    backend = ReplaySearchBackend(fixture_path, failure_rate=1.0)
+    with pytest.raises(SearchBackendError):
+        backend.search("nda law")
+
+    engine = make_engine(tmp_path, backend)
+    assert engine._search_web("nda law") == []
+    assert engine.query_trace == ["nda law"]
+    assert "Search error: Simulated failure for query: nda law" in capsys.readouterr().out
+
+def test_replay_failures_follow_the_seeded_rate(fixture_path):
+    def outcomes(seed):
+        backend = ReplaySearchBackend(fixture_path, failure_rate=0.5, seed=seed)
+        results = []
+        for _ in range(40):
+            try:
+                backend.search("nda law")
+                results.append(True)
+            except SearchBackendError:
+                results.append(False)
+        return results
+
+    assert outcomes(3) == outcomes(3)
+    assert 0 < outcomes(3).count(False) < 40
+
+def test_replay_latency_is_applied(fixture_path):
+    for latency in (0.1, (0.1, 0.12), LatencyDistribution("fixed", (0.1,))):
+        start = time.monotonic()
+        ReplaySearchBackend(fixture_path, latency=latency).search("nda law")
+        assert time.monotonic() - start >= 0.1
+
+def test_replay_latency_beyond_the_query_timeout_is_cut_off(fixture_path, tmp_path):
+    engine = make_engine(tmp_path, ReplaySearchBackend(fixture_path, latency=1.0), query_timeout=0.2)
+    queries = engine._generate_search_queries("nda", "Germany")
+
+    start = time.monotonic()
+    results = engine._run_searches(queries)
+
+    assert time.monotonic() - start < 0.6
+    assert results == {query_type: [] for query_type in queries}
+
+def test_stub_results_are_repeatable():
+    backend = StubSearchBackend()
+    assert backend.search("nda law", max_results=3) == StubSearchBackend().search("nda law", max_results=3)
+    assert backend.search("nda law") != backend.search("lease law")
+
+def test_recording_backend_writes_a_replayable_fixture(tmp_path):
+    path = str(tmp_path / "recorded" / "fixture.json")
+    recorder = RecordingSearchBackend(StubSearchBackend(), path)
+    recorded = recorder.search("nda law", max_results=2)
+    recorder.save()
+
+    assert ReplaySearchBackend(path).search("nda law") == recorded
+
+def test_unknown_backend_name_is_rejected(fixture_path):
+    assert isinstance(create_search_backend("replay", fixture_path), ReplaySearchBackend)
+    with pytest.raises(ValueError):
+        create_search_backend("bing")
@@ -0,0 +1,125 @@
+import threading
+import pytest
+from core.ai_engine import AIEngine
+from core.response_cache import ResponseCache
+from core.session_registry import SessionRegistry
+from core.session_store import InMemorySessionStore
+from core.stub_llm import StubChatModel
+
+@pytest.fixture
+def engine():
+    return AIEngine(llm=StubChatModel(), response_cache=ResponseCache(disk_path=None))
+
+class RecordingStore(InMemorySessionStore):
+    """In-memory store that records saves and checks the registry lock is not held."""
+
+    def __init__(self):
+        super().__init__()
+        self.registry = None
+        self.saved = []
+        self.fail = False
+
+    def save(self, snapshot):
+        assert not self.registry._lock.locked(), "session saved while holding the registry lock"
+        if self.fail:
+            raise OSError("store unavailable")
+        self.saved.append(snapshot["session_id"])
+        return super().save(snapshot)
+
+def make_registry(engine, **kwargs):
+    store = RecordingStore()
+    registry = SessionRegistry(store, engine, persist_turns=False, **kwargs)
+    store.registry = registry
+    return registry, store
+
+def test_least_recently_used_session_is_evicted_and_saved(engine):
+    registry, store = make_registry(engine, max_sessions=2, idle_timeout=0, memory_limit_mb=0)
+    first, second = registry.create(), registry.create()
+    registry.get(first.session_id)
+    third = registry.create()
+
+    assert [s["session_id"] for s in registry.sessions()] == [first.session_id, third.session_id]
+    assert store.saved == [second.session_id]
+    assert registry.stats()["evictions"]["count"] == 1
+
+def test_evicted_session_is_rehydrated_with_its_history(engine):
+    registry, store = make_registry(engine, max_sessions=1, idle_timeout=0, memory_limit_mb=0)
+    session_id = registry.create().session_id
+    response, _ = registry.process_user_message(session_id, "Hello")
+    registry.create()
+
+    manager = registry.get(session_id, create=False)
+    assert registry.rehydrations == 1
+    assert [m["content"] for m in manager.conversation_history] == ["Hello", response]
+    assert manager.revision == 1
+    assert registry.get("unknown", create=False) is None
+
+def test_idle_sessions_are_evicted(engine):
+    registry, store = make_registry(engine, max_sessions=0, idle_timeout=60, memory_limit_mb=0)
+    manager = registry.create()
+    last_used = registry._sessions[manager.session_id].last_used
+
+    assert registry.evict_idle(now=last_used + 30) == 0
+    assert registry.evict_idle(now=last_used + 61) == 1
+    assert registry.stats()["sessions"] == 0
+    assert store.saved == [manager.session_id]
+
+def test_memory_limit_evicts_large_sessions(engine):
+    registry, store = make_registry(engine, max_sessions=0, idle_timeout=0, memory_limit_mb=0.05)
+    big = registry.create()
+    big.conversation_history.extend([{"role": "user", "content": "x" * 1500}] * 40)
+    registry.process_user_message(big.session_id, "more")
+    registry.create()
+
+    assert store.saved == [big.session_id]
+    assert registry.stats()["memory_bytes"] <= registry.memory_limit_bytes
+    assert registry.stats()["evictions"]["memory"] == 1
+    assert len(registry.get(big.session_id, create=False).conversation_history) == 42
+
+def test_session_in_use_is_not_evicted(engine):
+    registry, store = make_registry(engine, max_sessions=1, idle_timeout=0, memory_limit_mb=0)
+    busy = registry.create()
+    registry._sessions[busy.session_id].in_use += 1
+    assert not registry.evict(busy.session_id)
+    registry._sessions[busy.session_id].in_use -= 1
+    assert registry.evict(busy.session_id)
+
+def test_failed_eviction_save_keeps_the_session(engine, capsys):
+    registry, store = make_registry(engine, max_sessions=0, idle_timeout=0, memory_limit_mb=0)
+    manager = registry.create()
+    store.fail = True
+    assert registry.evict(manager.session_id)
+    assert registry.stats()["sessions"] == 1
+    assert registry.get(manager.session_id, create=False) is manager
+    assert "Session eviction error" in capsys.readouterr().out
+
+def test_unsaved_evicted_session_is_taken_back_instead_of_reloaded(engine):
+    registry, store = make_registry(engine, max_sessions=0, idle_timeout=0, memory_limit_mb=0)
+    manager = registry.create()
+    with registry._lock:
+        registry._evict(manager.session_id, registry._sessions[manager.session_id], "manual")
+    # Not saved yet: get() must return the live manager, not a stale stored copy
+    assert registry.get(manager.session_id, create=False) is manager
+    assert registry.rehydrations == 0
+    assert store.saved == [manager.session_id]
+
+def test_concurrent_turns_for_many_sessions(engine):
+    registry, store = make_registry(engine, max_sessions=3, idle_timeout=0, memory_limit_mb=0)
+    session_ids = [registry.create().session_id for _ in range(6)]
+    errors = []
+
+    def converse(session_id):
+        try:
+            for message in ("Hello", "I need an NDA"):
+                registry.process_user_message(session_id, message)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=converse, args=(sid,)) for sid in session_ids]
+    [t.start() for t in threads]
+    [t.join() for t in threads]
+
+    assert errors == []
+    assert registry.stats()["sessions"] <= 3
+    for session_id in session_ids:
+        assert len(registry.get(session_id, create=False).conversation_history) == 4
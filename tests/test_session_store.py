@@ -0,0 +1,117 @@
+import socket
+import pytest
+from core.redis_standin import RedisStandIn
+from core.session_store import (
+    SNAPSHOT_VERSION, InMemorySessionStore, RedisSessionStore, SessionConflictError, SQLiteSessionStore
+)
+
+def make_snapshot(session_id, messages, revision=0):
+    return {
+        "version": SNAPSHOT_VERSION,
+        "session_id": session_id,
+        "state": "greeting",
+        "conversation_history": [{"role": "user", "content": text} for text in messages],
+        "revision": revision
+    }
+
+@pytest.fixture
+def redis_url():
+    standin = RedisStandIn().start()
+    try:
+        yield standin.url
+    finally:
+        standin.stop()
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return InMemorySessionStore()
+    if request.param == "sqlite":
+        return SQLiteSessionStore(str(tmp_path / "sessions.db"))
+    return RedisSessionStore(request.getfixturevalue("redis_url"), prefix="test")
+
+def test_save_and_load_round_trip(store):
+    assert store.save(make_snapshot("s1", ["a", "b"])) == 1
+    snapshot = store.load("s1")
+    assert snapshot["revision"] == 1
+    assert [m["content"] for m in snapshot["conversation_history"]] == ["a", "b"]
+    assert store.load("missing") is None
+
+def test_appends_and_truncates_history(store):
+    store.save(make_snapshot("s1", ["a", "b"]))
+    store.save(make_snapshot("s1", ["a", "b", "c"], revision=1))
+    assert [m["content"] for m in store.load("s1")["conversation_history"]] == ["a", "b", "c"]
+    store.save(make_snapshot("s1", ["x"], revision=2))
+    assert [m["content"] for m in store.load("s1")["conversation_history"]] == ["x"]
+
+def test_stale_revision_is_rejected(store):
+    store.save(make_snapshot("s1", ["a"]))
+    first = store.load("s1")
+    second = store.load("s1")
+
+    first["conversation_history"].append({"role": "user", "content": "from first"})
+    assert store.save(first) == 2
+
+    second["conversation_history"].append({"role": "user", "content": "from second"})
+    with pytest.raises(SessionConflictError):
+        store.save(second)
+
+    # The losing save left the stored session untouched and the store usable
+    snapshot = store.load("s1")
+    assert snapshot["revision"] == 2
+    assert [m["content"] for m in snapshot["conversation_history"]] == ["a", "from first"]
+    assert store.save(snapshot) == 3
+
+def test_creating_an_existing_session_conflicts(store):
+    store.save(make_snapshot("s1", ["a"]))
+    with pytest.raises(SessionConflictError):
+        store.save(make_snapshot("s1", ["b"]))
+
+def test_delete_and_list_sessions(store):
+    store.save(make_snapshot("s1", ["a"]))
+    store.save(make_snapshot("s2", ["a", "b"]))
+    assert {s["session_id"]: s["message_count"] for s in store.list_sessions()} == {"s1": 1, "s2": 2}
+    store.delete("s1")
+    assert store.load("s1") is None
+    assert [s["session_id"] for s in store.list_sessions()] == ["s2"]
+
+def test_redis_transaction_aborts_when_another_client_writes(redis_url):
+    store = RedisSessionStore(redis_url, prefix="test")
+    other = RedisSessionStore(redis_url, prefix="test")
+    store.save(make_snapshot("s1", ["a"]))
+
+    # Another worker writes between this worker's WATCH and EXEC
+    conn = store._connection()
+    original_pipeline = conn.pipeline
+
+    def pipeline(commands):
+        if commands[0] == ("MULTI",) and commands[-1] == ("EXEC",) and len(commands) > 4:
+            other.save(make_snapshot("s1", ["a", "other"], revision=1))
+        return original_pipeline(commands)
+
+    conn.pipeline = pipeline
+    with pytest.raises(SessionConflictError):
+        store.save(make_snapshot("s1", ["a", "mine"], revision=1))
+    conn.pipeline = original_pipeline
+
+    assert [m["content"] for m in store.load("s1")["conversation_history"]] == ["a", "other"]
+
+def test_redis_reconnects_after_a_connection_error(redis_url):
+    store = RedisSessionStore(redis_url, prefix="test")
+    store.save(make_snapshot("s1", ["a"]))
+    broken = store._connection()
+    broken.sock.shutdown(socket.SHUT_RDWR)
+
+    with pytest.raises(OSError):
+        store.load("s1")
+    assert store._connection() is not broken
+    assert store.load("s1")["revision"] == 1
+
+def test_load_recent_window_and_page_older_messages(store):
+    store.save(make_snapshot("s1", [f"m{i}" for i in range(10)]))
+    snapshot = store.load("s1", recent=3)
+    assert snapshot["message_count"] == 10
+    assert snapshot["revision"] == 1
+    assert [m["content"] for m in snapshot["conversation_history"]] == ["m7", "m8", "m9"]
+    assert [m["content"] for m in store.load_messages("s1", 2, 5)] == ["m2", "m3", "m4"]
+    assert [m["content"] for m in store.load("s1", recent=50)["conversation_history"]] == [f"m{i}" for i in range(10)]
@@ -0,0 +1,35 @@
+import os
+from core.document_gen import TemplateCache
+
+def write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+def test_file_templates_can_include_and_extend(tmp_path):
+    write(tmp_path / "base.j2", "HEADER\n{% block body %}{% endblock %}\n{% include 'footer.j2' %}")
+    write(tmp_path / "footer.j2", "Signed: {{ party }}")
+    write(tmp_path / "nda_en.j2", "{% extends 'base.j2' %}{% block body %}NDA for {{ party }}{% endblock %}")
+
+    cache = TemplateCache(str(tmp_path))
+    template = cache.get("nda", "EN", lambda: "")
+    assert template.render(party="Acme") == "HEADER\nNDA for Acme\nSigned: Acme"
+
+def test_builtin_templates_can_include_files(tmp_path):
+    write(tmp_path / "signature.j2", "-- {{ party }}")
+    cache = TemplateCache(str(tmp_path))
+    template = cache.get("lease", "EN", lambda: "Lease\n{% include 'signature.j2' %}")
+    assert template.render(party="Jane") == "Lease\n-- Jane"
+
+def test_changed_template_file_is_recompiled(tmp_path):
+    path = tmp_path / "nda_en.j2"
+    write(path, "v1")
+    cache = TemplateCache(str(tmp_path))
+    assert cache.get("nda", "EN", lambda: "").render() == "v1"
+    assert cache.get("nda", "EN", lambda: "") is cache.get("nda", "EN", lambda: "")
+
+    write(path, "version 2")
+    os.utime(path, ns=(0, 10 ** 18))
+    assert cache.get("nda", "EN", lambda: "").render() == "version 2"
+
+def test_missing_template_returns_none(tmp_path):
+    assert TemplateCache(str(tmp_path)).get("unknown", "EN", lambda: "") is None
@@ -2,6 +2,15 @@ import streamlit as st
 import streamlit.components.v1 as components
 from typing import Dict, List, Optional, Any
 import json
+from core.runtime_stats import get_runtime_snapshot, subsystem_rows
+
+# Card styling for each monitored subsystem
+SUBSYSTEM_STYLES = {
+    "llm": {"icon": "🧠", "description": "Language model requests for the conversation flow", "gradient_start": "#667eea", "gradient_end": "#764ba2"},
+    "research": {"icon": "🔍", "description": "Web searches for country-specific legal research", "gradient_start": "#4facfe", "gradient_end": "#00f2fe"},
+    "generator": {"icon": "📋", "description": "Template loading and document rendering", "gradient_start": "#f093fb", "gradient_end": "#f5576c"},
+    "exporter": {"icon": "📤", "description": "PDF and DOCX export", "gradient_start": "#43e97b", "gradient_end": "#38f9d7"}
+}
 
 class AdvancedAgentPanel:
     """Advanced agent panel with custom components and layouts."""
@@ -112,8 +121,16 @@ class AdvancedAgentPanel:
                 html_content = self.create_custom_agent_card(agent['id'], agent)
                 components.html(html_content, height=400, scrolling=False)
     
-    def create_agent_dashboard(self, agents: List[Dict[str, Any]]) -> None:
-        """Create a comprehensive agent dashboard."""
+    def create_agent_dashboard(self, agents: Optional[List[Dict[str, Any]]] = None) -> None:
+        """
+        Create a comprehensive agent dashboard.
+        
+        Args:
+            agents: Agents to show; defaults to the live subsystems from the runtime metrics snapshot
+        """
+        snapshot = get_runtime_snapshot()
+        if agents is None:
+            agents = create_live_agents(snapshot)
         
         # Header
         st.markdown("""
@@ -139,13 +156,23 @@ class AdvancedAgentPanel:
             total_tasks = sum(agent.get('tasks', 0) for agent in agents)
             st.metric("Total Tasks", total_tasks, "Processing")
         with col4:
-            system_health = "98.5%"
-            st.metric("System Health", system_health, "Optimal")
+            success_ratio = snapshot["success_ratio"]
+            if success_ratio is None:
+                st.metric("System Health", "—", "No traffic yet", delta_color="off")
+            else:
+                st.metric("System Health", f"{success_ratio:.1%}", "Optimal" if success_ratio >= 0.99 else "Degraded",
+                          delta_color="normal" if success_ratio >= 0.99 else "inverse")
         
         # Agent Grid
         st.subheader("🤖 Agent Fleet Overview")
         self.create_agent_grid_layout(agents, 3)
         
+        # Live subsystem metrics
+        st.subheader("📈 Live Subsystem Metrics")
+        if not snapshot["enabled"]:
+            st.info("Metrics are disabled (METRICS_ENABLED=false).")
+        st.table(subsystem_rows(snapshot))
+        
         # Real-time Activity Feed
         st.subheader("📊 Real-time Activity Feed")
         
@@ -233,6 +260,44 @@ class AdvancedAgentPanel:
         if st.button("💾 Save Configuration", key=f"save_{agent_id}", use_container_width=True):
             st.success("Configuration saved successfully!")
 
+def create_live_agents(snapshot: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Create agent cards for the app's subsystems from a runtime metrics snapshot."""
+    snapshot = snapshot or get_runtime_snapshot()
+    agents = []
+    
+    for key, stats in snapshot["subsystems"].items():
+        style = SUBSYSTEM_STYLES.get(key, {})
+        if stats["requests"] and stats["error_ratio"] > 0.05:
+            status, status_color = "degraded", "#ef4444"
+        elif stats["in_flight"]:
+            status, status_color = "active", "#10b981"
+        else:
+            status, status_color = "idle", "#9ca3af"
+        
+        cache_ratio = stats["cache_hit_ratio"]
+        current_task = f"{stats['requests_per_second']:.2f} req/s · p95 {stats['p95_ms']:.0f} ms"
+        if key == "llm" and stats.get("queued"):
+            current_task += f" · {stats['queued']} queued"
+        
+        agents.append({
+            "id": key,
+            "name": stats["name"],
+            "description": style.get("description", ""),
+            "icon": style.get("icon", "🤖"),
+            "status": status,
+            "status_color": status_color,
+            "efficiency": round((1 - stats["error_ratio"]) * 100, 1),
+            "tasks": stats["in_flight"],
+            "gradient_start": style.get("gradient_start", "#667eea"),
+            "gradient_end": style.get("gradient_end", "#764ba2"),
+            "current_task": current_task,
+            # Progress bar shows the cache hit ratio where the subsystem has a cache
+            "progress": round(cache_ratio * 100) if cache_ratio is not None else 0,
+            "last_update": f"{stats['requests']} requests, p50 {stats['p50_ms']:.0f} ms, p99 {stats['p99_ms']:.0f} ms"
+        })
+    
+    return agents
+
 def create_sample_agents() -> List[Dict[str, Any]]:
     """Create sample agent data for demonstration."""
     
@@ -296,8 +361,8 @@ def demo_advanced_agent_panel():
     
     st.title("🚀 Advanced Agent Panel Demo")
     
-    # Create sample agents
-    agents = create_sample_agents()
+    # Create agents for the live subsystems
+    agents = create_live_agents()
     
     # Initialize the advanced panel
     panel = AdvancedAgentPanel()
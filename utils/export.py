@@ -1,132 +1,240 @@
+import io
 import os
-from typing import Optional
+import threading
+from functools import lru_cache
+from typing import BinaryIO, Dict, Iterable, Iterator, Optional, Any, Tuple
 from datetime import datetime
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
 from docx import Document
 from docx.shared import Inches
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
+from core.metrics import span
+from core.document_store import expand_document_references
+
+HEADING_PREFIXES = ('1.', '2.', '3.', '4.', '5.', '6.', '7.', '8.', '9.')
+
+def _get_page_size(language: str):
+    """Get the PDF page size used for a language."""
+    return A4 if language == "DE" else letter
+
+@lru_cache(maxsize=None)
+def get_pdf_styles(language: str, pagesize: tuple) -> Dict[str, ParagraphStyle]:
+    """
+    Get the PDF paragraph styles for a language and page size.
+    
+    Styles are built once per process and reused by every export.
+    """
+    styles = getSampleStyleSheet()
+    return {
+        "title": ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=16,
+            spaceAfter=30,
+            alignment=1  # Center alignment
+        ),
+        "normal": ParagraphStyle(
+            'CustomNormal',
+            parent=styles['Normal'],
+            fontSize=11,
+            spaceAfter=12
+        ),
+        "heading": styles['Heading2']
+    }
 
 class DocumentExporter:
     """Handles export of generated documents to PDF and DOCX formats."""
     
-    def __init__(self, export_folder: str = "exports"):
-        """Initialize exporter with export folder."""
+    def __init__(self, export_folder: Optional[str] = "exports"):
+        """
+        Initialize exporter with export folder.
+        
+        Args:
+            export_folder: Folder for file exports, or None for in-memory exports only
+        """
         self.export_folder = export_folder
-        self._ensure_export_folder()
+        if export_folder:
+            self._ensure_export_folder()
     
     def _ensure_export_folder(self):
         """Ensure export folder exists."""
         if not os.path.exists(self.export_folder):
             os.makedirs(self.export_folder)
     
-    def export_to_docx(self, content: str, document_type: str, language: str = "EN") -> Optional[str]:
+    def _write_docx(self, content: str, document_type: str, language: str, stream: BinaryIO):
+        """Render document content as DOCX into a writable binary stream."""
+        # Create document
+        doc = Document()
+        
+        # Add title
+        title = self._get_document_title(document_type, language)
+        doc.add_heading(title, 0)
+        
+        # Add content
+        paragraphs = content.split('\n\n')
+        for paragraph in paragraphs:
+            if paragraph.strip():
+                # Handle headers (lines starting with numbers)
+                if paragraph.strip().startswith(HEADING_PREFIXES):
+                    doc.add_heading(paragraph.strip(), level=1)
+                else:
+                    doc.add_paragraph(paragraph.strip())
+        
+        doc.save(stream)
+    
+    def _write_pdf(self, content: str, document_type: str, language: str, stream: BinaryIO):
+        """Render document content as PDF into a writable binary stream."""
+        # Create PDF document
+        pagesize = _get_page_size(language)
+        doc = SimpleDocTemplate(stream, pagesize=pagesize)
+        styles = get_pdf_styles(language, pagesize)
+        title_style = styles["title"]
+        normal_style = styles["normal"]
+        
+        # Build story (content)
+        story = []
+        
+        # Add title
+        title = self._get_document_title(document_type, language)
+        story.append(Paragraph(title, title_style))
+        story.append(Spacer(1, 20))
+        
+        # Add content
+        paragraphs = content.split('\n\n')
+        for paragraph in paragraphs:
+            if paragraph.strip():
+                # Handle headers (lines starting with numbers)
+                if paragraph.strip().startswith(HEADING_PREFIXES):
+                    story.append(Paragraph(paragraph.strip(), styles["heading"]))
+                else:
+                    story.append(Paragraph(paragraph.strip(), normal_style))
+        
+        # Build PDF
+        doc.build(story)
+    
+    def _writer_for(self, format_type: str):
+        """Get the stream writer for an export format."""
+        writers = {"docx": self._write_docx, "pdf": self._write_pdf}
+        writer = writers.get(format_type.lower())
+        if writer is None:
+            raise ValueError(f"Unsupported export format: {format_type}")
+        return writer
+    
+    def export_to_stream(self, content: str, document_type: str, format_type: str, stream: BinaryIO, language: str = "EN") -> bool:
         """
-        Export document content to DOCX format.
+        Export document content into a caller-provided writable binary stream.
         
         Args:
-            content: Document content as string
+            content: Document content as string, or a document store reference
             document_type: Type of document
+            format_type: Export format (docx or pdf)
+            stream: Writable binary stream
             language: Language of document
             
         Returns:
-            Path to exported file or None if failed
+            True if the export succeeded
         """
         try:
-            # Create document
-            doc = Document()
-            
-            # Add title
-            title = self._get_document_title(document_type, language)
-            doc.add_heading(title, 0)
-            
-            # Add content
-            paragraphs = content.split('\n\n')
-            for paragraph in paragraphs:
-                if paragraph.strip():
-                    # Handle headers (lines starting with numbers)
-                    if paragraph.strip().startswith(('1.', '2.', '3.', '4.', '5.', '6.', '7.', '8.', '9.')):
-                        doc.add_heading(paragraph.strip(), level=1)
-                    else:
-                        doc.add_paragraph(paragraph.strip())
-            
-            # Generate filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{document_type}_{language}_{timestamp}.docx"
-            filepath = os.path.join(self.export_folder, filename)
+            writer = self._writer_for(format_type)
+            with span("document_export", format=format_type.lower()):
+                writer(expand_document_references(content), document_type, language, stream)
+            return True
+        except Exception as e:
+            print(f"Error exporting to {format_type.upper()}: {str(e)}")
+            return False
+    
+    def export_bytes(self, content: str, document_type: str, format_type: str, language: str = "EN") -> Optional[bytes]:
+        """
+        Export document content to an in-memory buffer without touching the disk.
+        
+        Args:
+            content: Document content as string
+            document_type: Type of document
+            format_type: Export format (docx or pdf)
+            language: Language of document
             
-            # Save document
-            doc.save(filepath)
+        Returns:
+            Exported file contents or None if failed
+        """
+        buffer = io.BytesIO()
+        if not self.export_to_stream(content, document_type, format_type, buffer, language):
+            return None
+        return buffer.getvalue()
+    
+    def _export_to_file(self, content: str, document_type: str, format_type: str, language: str, filename: Optional[str]) -> Optional[str]:
+        """Export document content to a file in the export folder."""
+        if not self.export_folder:
+            print("Error exporting: no export folder configured")
+            return None
+        
+        filepath = None
+        try:
+            writer = self._writer_for(format_type)
+            if filename:
+                filepath = os.path.join(self.export_folder, filename)
+                f = open(filepath, 'wb')
+            else:
+                f, filepath = self._create_unique_file(document_type, language, format_type)
+            with f, span("document_export", format=format_type.lower()):
+                writer(expand_document_references(content), document_type, language, f)
             return filepath
-            
         except Exception as e:
-            print(f"Error exporting to DOCX: {str(e)}")
+            print(f"Error exporting to {format_type.upper()}: {str(e)}")
+            # Do not leave a partially written file behind
+            if filepath and os.path.exists(filepath):
+                os.remove(filepath)
             return None
     
-    def export_to_pdf(self, content: str, document_type: str, language: str = "EN") -> Optional[str]:
+    def _create_unique_file(self, document_type: str, language: str, extension: str) -> Tuple[BinaryIO, str]:
         """
-        Export document content to PDF format.
+        Create a new export file whose name is not yet taken.
+        
+        Files are opened in exclusive-create mode, so two exports in the same
+        second get distinct names instead of overwriting each other.
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        base = f"{document_type}_{language}_{timestamp}"
+        suffix = 0
+        while True:
+            name = f"{base}.{extension}" if suffix == 0 else f"{base}_{suffix}.{extension}"
+            filepath = os.path.join(self.export_folder, name)
+            try:
+                return open(filepath, 'xb'), filepath
+            except FileExistsError:
+                suffix += 1
+    
+    def export_to_docx(self, content: str, document_type: str, language: str = "EN", filename: Optional[str] = None) -> Optional[str]:
+        """
+        Export document content to DOCX format.
         
         Args:
             content: Document content as string
             document_type: Type of document
             language: Language of document
+            filename: File name inside the export folder, generated if omitted
             
         Returns:
             Path to exported file or None if failed
         """
-        try:
-            # Generate filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{document_type}_{language}_{timestamp}.pdf"
-            filepath = os.path.join(self.export_folder, filename)
-            
-            # Create PDF document
-            doc = SimpleDocTemplate(filepath, pagesize=A4 if language == "DE" else letter)
-            styles = getSampleStyleSheet()
-            
-            # Create custom styles
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=16,
-                spaceAfter=30,
-                alignment=1  # Center alignment
-            )
-            
-            normal_style = ParagraphStyle(
-                'CustomNormal',
-                parent=styles['Normal'],
-                fontSize=11,
-                spaceAfter=12
-            )
-            
-            # Build story (content)
-            story = []
-            
-            # Add title
-            title = self._get_document_title(document_type, language)
-            story.append(Paragraph(title, title_style))
-            story.append(Spacer(1, 20))
-            
-            # Add content
-            paragraphs = content.split('\n\n')
-            for paragraph in paragraphs:
-                if paragraph.strip():
-                    # Handle headers (lines starting with numbers)
-                    if paragraph.strip().startswith(('1.', '2.', '3.', '4.', '5.', '6.', '7.', '8.', '9.')):
-                        story.append(Paragraph(paragraph.strip(), styles['Heading2']))
-                    else:
-                        story.append(Paragraph(paragraph.strip(), normal_style))
-            
-            # Build PDF
-            doc.build(story)
-            return filepath
+        return self._export_to_file(content, document_type, "docx", language, filename)
+    
+    def export_to_pdf(self, content: str, document_type: str, language: str = "EN", filename: Optional[str] = None) -> Optional[str]:
+        """
+        Export document content to PDF format.
+        
+        Args:
+            content: Document content as string
+            document_type: Type of document
+            language: Language of document
+            filename: File name inside the export folder, generated if omitted
             
-        except Exception as e:
-            print(f"Error exporting to PDF: {str(e)}")
-            return None
+        Returns:
+            Path to exported file or None if failed
+        """
+        return self._export_to_file(content, document_type, "pdf", language, filename)
     
     def _get_document_title(self, document_type: str, language: str) -> str:
         """Get document title based on type and language."""
@@ -183,3 +291,91 @@ class DocumentExporter:
         else:
             print(f"Unsupported export format: {format_type}")
             return None
+
+
+_worker_exporters: Dict[str, DocumentExporter] = {}
+
+def _export_in_worker(export_folder: str, content: str, document_type: str, format_type: str, language: str, filename: str) -> Optional[str]:
+    """Export one document inside a pool worker, reusing the worker's exporter."""
+    exporter = _worker_exporters.get(export_folder)
+    if exporter is None:
+        exporter = _worker_exporters[export_folder] = DocumentExporter(export_folder)
+    if format_type == "docx":
+        return exporter.export_to_docx(content, document_type, language, filename)
+    return exporter.export_to_pdf(content, document_type, language, filename)
+
+class ExportService:
+    """Exports many documents concurrently on a process pool."""
+    
+    def __init__(self, export_folder: str = "exports", max_workers: Optional[int] = None):
+        """
+        Initialize the export service.
+        
+        Args:
+            export_folder: Folder for exported files
+            max_workers: Worker processes, defaults to the number of CPUs
+        """
+        self.export_folder = export_folder
+        self.formats = DocumentExporter(export_folder).get_export_formats()
+        self.executor = ProcessPoolExecutor(max_workers=max_workers)
+        self._batch_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        self._submitted = 0
+        self._lock = threading.Lock()
+    
+    def submit(self, content: str, document_type: str, format_type: str, language: str = "EN") -> Future:
+        """
+        Schedule one export.
+        
+        Returns:
+            Future resolving to the exported file path, or None if the export failed
+        """
+        format_type = format_type.lower()
+        if format_type not in self.formats:
+            raise ValueError(f"Unsupported export format: {format_type}")
+        
+        # Unique per service, so concurrent exports never overwrite each other
+        with self._lock:
+            self._submitted += 1
+            sequence = self._submitted
+        filename = f"{document_type}_{language}_{self._batch_id}_{sequence:06d}.{format_type}"
+        return self.executor.submit(_export_in_worker, self.export_folder, content, document_type, format_type, language, filename)
+    
+    def export_many(self, documents: Iterable[Dict[str, Any]], formats: Iterable[str] = ("pdf", "docx")) -> Iterator[Dict[str, Any]]:
+        """
+        Export documents in every requested format.
+        
+        A failed export is reported in its result and never aborts the others.
+        
+        Args:
+            documents: Dicts with content, document_type and optional language
+            formats: Export formats for every document
+            
+        Returns:
+            Iterator of results in completion order, each a dict with index
+            (position in documents), format, path (None on failure) and error
+        """
+        formats = list(formats)
+        futures: Dict[Future, Tuple[int, str]] = {
+            self.submit(document["content"], document["document_type"], format_type, document.get("language", "EN")):
+                (index, format_type)
+            for index, document in enumerate(documents)
+            for format_type in formats
+        }
+        for future in as_completed(futures):
+            index, format_type = futures[future]
+            try:
+                path = future.result()
+                error = None if path else f"Export to {format_type} failed"
+            except Exception as e:
+                path, error = None, f"Export to {format_type} failed: {e}"
+            yield {"index": index, "format": format_type, "path": path, "error": error}
+    
+    def shutdown(self, wait: bool = True):
+        """Shut down the worker pool."""
+        self.executor.shutdown(wait=wait)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()